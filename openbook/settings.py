@@ -334,17 +334,19 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'openbook_auth.authentication.CachedTokenAuthentication',
     )
 }
 
 # AWS Translate
 AWS_TRANSLATE_REGION = os.environ.get('AWS_TRANSLATE_REGION', '')
 AWS_TRANSLATE_MAX_LENGTH = os.environ.get('AWS_TRANSLATE_MAX_LENGTH', 10000)
+TRANSLATIONS_TTL = int(os.environ.get('TRANSLATIONS_TTL', '604800'))
+TRANSLATE_MAX_ITEMS = int(os.environ.get('TRANSLATE_MAX_ITEMS', '20'))
 if TESTING:
     OS_TRANSLATION_STRATEGY_NAME = 'testing'
 else:
-    OS_TRANSLATION_STRATEGY_NAME = 'default'
+    OS_TRANSLATION_STRATEGY_NAME = os.environ.get('OS_TRANSLATION_STRATEGY_NAME', 'default')
 
 OS_TRANSLATION_CONFIG = {
     'default': {
@@ -356,6 +358,12 @@ OS_TRANSLATION_CONFIG = {
         'STRATEGY': 'openbook_translation.strategies.tests.MockAmazonTranslate',
         'TEXT_MAX_LENGTH': 40,
         'DEFAULT_TRANSLATION_LANGUAGE_CODE': 'en'
+    },
+    'local': {
+        'STRATEGY': 'openbook_translation.strategies.local.LocalTranslate',
+        'TEXT_MAX_LENGTH': AWS_TRANSLATE_MAX_LENGTH,
+        'DEFAULT_TRANSLATION_LANGUAGE_CODE': 'en',
+        'LATENCY': os.environ.get('LOCAL_TRANSLATE_LATENCY', 0)
     }
 }
 
@@ -450,6 +458,24 @@ POST_COMMENT_MAX_LENGTH = int(os.environ.get('POST_MAX_LENGTH', '1500'))
 POST_MEDIA_MAX_SIZE = int(os.environ.get('POST_MEDIA_MAX_SIZE', '10485760'))
 POST_LINK_MAX_DOMAIN_LENGTH = int(os.environ.get('POST_LINK_MAX_DOMAIN_LENGTH', '126'))
 POST_MEDIA_MAX_ITEMS = int(os.environ.get('POST_MEDIA_MAX_ITEMS', '1'))
+USER_TIMELINE_MAX_LENGTH = int(os.environ.get('USER_TIMELINE_MAX_LENGTH', '800'))
+USER_TIMELINE_TTL = int(os.environ.get('USER_TIMELINE_TTL', '604800'))
+USER_RELATIONSHIPS_TTL = int(os.environ.get('USER_RELATIONSHIPS_TTL', '3600'))
+USER_COMMUNITIES_ROLES_TTL = int(os.environ.get('USER_COMMUNITIES_ROLES_TTL', '3600'))
+USER_SUSPENSION_TTL = int(os.environ.get('USER_SUSPENSION_TTL', '3600'))
+UNREAD_NOTIFICATIONS_COUNT_TTL = int(os.environ.get('UNREAD_NOTIFICATIONS_COUNT_TTL', '300'))
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get('AUTH_TOKEN_CACHE_TTL', '3600'))
+AUTH_TOKEN_LOCAL_CACHE_TTL = int(os.environ.get('AUTH_TOKEN_LOCAL_CACHE_TTL', '10'))
+AUTH_TOKEN_LOCAL_CACHE_SIZE = int(os.environ.get('AUTH_TOKEN_LOCAL_CACHE_SIZE', '10000'))
+SOFT_DELETE_POSTS_BATCH_SIZE = int(os.environ.get('SOFT_DELETE_POSTS_BATCH_SIZE', '500'))
+TRENDING_POSTS_MAX_AGE_HOURS = int(os.environ.get('TRENDING_POSTS_MAX_AGE_HOURS', '12'))
+TRENDING_POSTS_HALF_LIFE_HOURS = int(os.environ.get('TRENDING_POSTS_HALF_LIFE_HOURS', '3'))
+LANGUAGE_DETECTION_CACHE_SIZE = int(os.environ.get('LANGUAGE_DETECTION_CACHE_SIZE', '10000'))
+URL_PREVIEW_TTL = int(os.environ.get('URL_PREVIEW_TTL', '86400'))
+URL_PREVIEW_ERROR_TTL = int(os.environ.get('URL_PREVIEW_ERROR_TTL', '3600'))
+URL_PREVIEW_TIMEOUT = int(os.environ.get('URL_PREVIEW_TIMEOUT', '5'))
+ARCHIVE_IMPORT_STATUS_TTL = int(os.environ.get('ARCHIVE_IMPORT_STATUS_TTL', '86400'))
+ARCHIVE_IMPORT_JOB_TIMEOUT = int(os.environ.get('ARCHIVE_IMPORT_JOB_TIMEOUT', '3600'))
 PASSWORD_MIN_LENGTH = 10
 PASSWORD_MAX_LENGTH = 100
 CIRCLE_MAX_LENGTH = 100
@@ -472,6 +498,7 @@ COMMUNITY_CATEGORIES_MAX_AMOUNT = 3
 COMMUNITY_CATEGORIES_MIN_AMOUNT = 1
 COMMUNITY_AVATAR_MAX_SIZE = int(os.environ.get('COMMUNITY_AVATAR_MAX_SIZE', '10485760'))
 COMMUNITY_COVER_MAX_SIZE = int(os.environ.get('COMMUNITY_COVER_MAX_SIZE', '10485760'))
+COMMUNITY_ID_TTL = int(os.environ.get('COMMUNITY_ID_TTL', '86400'))
 TAG_NAME_MAX_LENGTH = 32
 CATEGORY_NAME_MAX_LENGTH = 32
 CATEGORY_TITLE_MAX_LENGTH = 64
@@ -479,6 +506,7 @@ CATEGORY_DESCRIPTION_MAX_LENGTH = 64
 DEVICE_NAME_MAX_LENGTH = 32
 DEVICE_UUID_MAX_LENGTH = 64
 SEARCH_QUERIES_MAX_LENGTH = 120
+SEARCH_TERM_MAX_LENGTH = 64
 FEATURE_IMPORTER_ENABLED = os.environ.get('FEATURE_IMPORTER_ENABLED', 'True') == 'True'
 MODERATION_REPORT_DESCRIPTION_MAX_LENGTH = 1000
 MODERATED_OBJECT_DESCRIPTION_MAX_LENGTH = 1000
@@ -537,3 +565,27 @@ if IS_PRODUCTION:
 # ONE SIGNAL
 ONE_SIGNAL_APP_ID = os.environ.get('ONE_SIGNAL_APP_ID')
 ONE_SIGNAL_API_KEY = os.environ.get('ONE_SIGNAL_API_KEY')
+
+# PUSH NOTIFICATIONS
+if TESTING:
+    PUSH_NOTIFICATIONS_TRANSPORT_NAME = 'local'
+else:
+    PUSH_NOTIFICATIONS_TRANSPORT_NAME = os.environ.get('PUSH_NOTIFICATIONS_TRANSPORT_NAME', 'default')
+
+PUSH_NOTIFICATIONS_TRANSPORTS_CONFIG = {
+    'default': {
+        'TRANSPORT': 'openbook_notifications.push_transports.OneSignalTransport',
+        'APP_ID': ONE_SIGNAL_APP_ID,
+        'API_KEY': ONE_SIGNAL_API_KEY,
+        'TIMEOUT': int(os.environ.get('ONE_SIGNAL_TIMEOUT', '10')),
+        'POOL_SIZE': int(os.environ.get('ONE_SIGNAL_POOL_SIZE', '10')),
+    },
+    'local': {
+        'TRANSPORT': 'openbook_notifications.push_transports.LocalTransport',
+        'LATENCY': os.environ.get('LOCAL_PUSH_NOTIFICATIONS_LATENCY', 0)
+    }
+}
+
+# OneSignal accepts up to 200 filters per notification, every device takes 3 of them
+PUSH_NOTIFICATIONS_MAX_DEVICES_PER_REQUEST = 60
+PUSH_NOTIFICATIONS_QUEUE_TTL = int(os.environ.get('PUSH_NOTIFICATIONS_QUEUE_TTL', '86400'))
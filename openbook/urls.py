@@ -62,7 +62,8 @@ from openbook_moderation.views.moderation_categories.views import ModerationCate
 from openbook_moderation.views.report.views import ReportUser, ReportPost, ReportCommunity, \
     ReportPostComment
 from openbook_moderation.views.user.views import UserModerationPenalties, UserPendingModeratedObjectsCommunities
-from openbook_notifications.views import Notifications, NotificationItem, ReadNotifications, ReadNotification
+from openbook_notifications.views import Notifications, NotificationItem, ReadNotifications, ReadNotification, \
+    UnreadNotificationsCount
 from openbook_posts.views.post.views import PostItem, PostOpen, PostClose, MutePost, UnmutePost, TranslatePost, \
     PostPreviewLinkData, SearchPostParticipants, GetPostParticipants, PublishPost, PostStatus
 from openbook_posts.views.post_comment.post_comment_reaction.views import PostCommentReactionItem
@@ -71,12 +72,13 @@ from openbook_posts.views.post_comment.post_comment_reactions.views import PostC
 from openbook_posts.views.post_comment.post_comment_replies.views import PostCommentReplies
 from openbook_posts.views.post_comment.views import PostCommentItem, MutePostComment, UnmutePostComment, \
     TranslatePostComment
-from openbook_posts.views.post_comments.views import PostComments, PostCommentsDisable, PostCommentsEnable
+from openbook_posts.views.post_comments.views import PostComments, PostCommentsDisable, PostCommentsEnable, \
+    TranslatePostComments
 from openbook_posts.views.post_media.views import PostMedia
 from openbook_posts.views.post_reaction.views import PostReactionItem
 from openbook_posts.views.post_reactions.views import PostReactions, PostReactionsEmojiCount, PostReactionEmojiGroups
-from openbook_posts.views.posts.views import Posts, TrendingPosts
-from openbook_importer.views import ImportItem
+from openbook_posts.views.posts.views import Posts, TrendingPosts, TranslatePosts
+from openbook_importer.views import ImportItem, ImportItemStatus
 
 auth_auth_patterns = [
     path('register/', Register.as_view(), name='register-user'),
@@ -181,6 +183,7 @@ post_patterns = [
     path('comments/', PostComments.as_view(), name='post-comments'),
     path('comments/disable/', PostCommentsDisable.as_view(), name='disable-post-comments'),
     path('comments/enable/', PostCommentsEnable.as_view(), name='enable-post-comments'),
+    path('comments/translate/', TranslatePostComments.as_view(), name='translate-post-comments'),
     path('comments/<int:post_comment_id>/', include(post_comment_patterns)),
     path('reactions/', PostReactions.as_view(), name='post-reactions'),
     path('reactions/emoji-count/', PostReactionsEmojiCount.as_view(), name='post-reactions-emoji-count'),
@@ -200,6 +203,7 @@ posts_patterns = [
     path('<uuid:post_uuid>/', include(post_patterns)),
     path('', Posts.as_view(), name='posts'),
     path('trending/', TrendingPosts.as_view(), name='trending-posts'),
+    path('translate/', TranslatePosts.as_view(), name='translate-posts'),
     path('emojis/groups/', PostReactionEmojiGroups.as_view(), name='posts-emoji-groups'),
 ]
 
@@ -303,7 +307,8 @@ follows_patterns = [
 ]
 
 importer_patterns = [
-    path('upload/', ImportItem.as_view(), name='uploads')
+    path('upload/', ImportItem.as_view(), name='uploads'),
+    path('upload/<uuid:import_uuid>/', ImportItemStatus.as_view(), name='upload-status'),
 ]
 
 categories_patterns = [
@@ -318,6 +323,7 @@ notification_patterns = [
 notifications_patterns = [
     path('', Notifications.as_view(), name='notifications'),
     path('read/', ReadNotifications.as_view(), name='read-notifications'),
+    path('unread/count/', UnreadNotificationsCount.as_view(), name='unread-notifications-count'),
     path('<int:notification_id>/', include(notification_patterns)),
 ]
 
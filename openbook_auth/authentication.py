@@ -0,0 +1,97 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import ugettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from openbook_common.utils.model_loaders import get_user_model
+
+TOKEN_USER_ID_CACHE_KEY = 'token-user-id-%s'
+
+_local_tokens_users_ids = {}
+_local_tokens_users_ids_lock = threading.Lock()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication which resolves the user of a token from a cache and preloads the relations of the user
+    nearly every request uses
+    """
+
+    user_related_fields = ('profile', 'notifications_settings', 'translation_language')
+
+    def authenticate_credentials(self, key):
+        user_id = get_cached_token_user_id(key=key)
+
+        if user_id is None:
+            related_fields = ['user__%s' % related_field for related_field in self.user_related_fields]
+            try:
+                token = Token.objects.select_related('user', *related_fields).get(key=key)
+            except Token.DoesNotExist:
+                raise AuthenticationFailed(_('Invalid token.'))
+
+            cache_token_user_id(key=key, user_id=token.user_id)
+            user = token.user
+        else:
+            User = get_user_model()
+            try:
+                user = User.objects.select_related(*self.user_related_fields).get(pk=user_id)
+            except User.DoesNotExist:
+                delete_cached_token_user_id(key=key)
+                raise AuthenticationFailed(_('Invalid token.'))
+            token = Token(key=key, user=user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+
+        return user, token
+
+
+def get_cached_token_user_id(key):
+    """
+    Looks the user id up in this process first, it's cached there for AUTH_TOKEN_LOCAL_CACHE_TTL only as
+    deleting a token can't reach other processes
+    """
+    local_token_user_id = _local_tokens_users_ids.get(key)
+
+    if local_token_user_id is not None:
+        user_id, expires_at = local_token_user_id
+        if expires_at > time.monotonic():
+            return user_id
+
+    user_id = cache.get(_make_token_user_id_cache_key(key))
+
+    if user_id is not None:
+        _cache_local_token_user_id(key=key, user_id=user_id)
+
+    return user_id
+
+
+def cache_token_user_id(key, user_id):
+    cache.set(_make_token_user_id_cache_key(key), user_id, settings.AUTH_TOKEN_CACHE_TTL)
+    _cache_local_token_user_id(key=key, user_id=user_id)
+
+
+def delete_cached_token_user_id(key):
+    cache.delete(_make_token_user_id_cache_key(key))
+
+    with _local_tokens_users_ids_lock:
+        _local_tokens_users_ids.pop(key, None)
+
+
+def _cache_local_token_user_id(key, user_id):
+    with _local_tokens_users_ids_lock:
+        if len(_local_tokens_users_ids) >= settings.AUTH_TOKEN_LOCAL_CACHE_SIZE:
+            _local_tokens_users_ids.clear()
+
+        _local_tokens_users_ids[key] = (user_id, time.monotonic() + settings.AUTH_TOKEN_LOCAL_CACHE_TTL)
+
+
+def _make_token_user_id_cache_key(key):
+    # Keep the tokens themselves out of the cache
+    return TOKEN_USER_ID_CACHE_KEY % hashlib.sha256(key.encode('utf-8')).hexdigest()
@@ -21,7 +21,7 @@ def check_follow_list_id(user, list_id):
 def check_can_update_post(user, post):
     check_has_post(user=user, post=post)
     if post.is_closed and post.community_id:
-        if not user.is_staff_of_community_with_name(post.community.name):
+        if not user.is_staff_of_community_with_id(post.community_id):
             raise ValidationError(
                 _('You cannot edit a closed post'),
             )
@@ -54,7 +54,7 @@ def check_comments_enabled_for_post_with_id(user, post_id):
     Post = get_post_model()
     post = Post.objects.select_related('community').get(id=post_id)
     if post.community_id is not None:
-        if not user.is_staff_of_community_with_name(post.community.name) and not post.comments_enabled:
+        if not user.is_staff_of_community_with_id(post.community_id) and not post.comments_enabled:
             raise ValidationError(
                 _('Comments are disabled for this post')
             )
@@ -89,7 +89,7 @@ def check_can_open_post_with_id(user, post_id):
             _('Only community posts can be opened/closed')
         )
 
-    if not user.is_staff_of_community_with_name(post.community.name):
+    if not user.is_staff_of_community_with_id(post.community_id):
         raise ValidationError(
             _('Only administrators/moderators can open this post')
         )
@@ -101,7 +101,7 @@ def check_can_close_post(user, post):
             _('Only community posts can be opened/closed')
         )
 
-    if not user.is_staff_of_community_with_name(post.community.name):
+    if not user.is_staff_of_community_with_id(post.community_id):
         raise ValidationError(
             _('Only administrators/moderators can close this post')
         )
@@ -242,8 +242,8 @@ def check_can_delete_post(user, post):
     if not user.has_post(post=post):
         if Post.is_post_with_id_a_community_post(post.pk):
             # If the comment is in a community, check if we're moderators
-            if not user.is_moderator_of_community_with_name(
-                    post.community.name) and not user.is_administrator_of_community_with_name(post.community.name):
+            if not user.is_moderator_of_community_with_id(
+                    post.community_id) and not user.is_administrator_of_community_with_id(post.community_id):
                 raise ValidationError(
                     _('Only moderators/administrators can remove community posts.'),
                 )
@@ -715,6 +715,17 @@ def check_can_translate_comment_with_id(user, post_comment_id):
         )
 
 
+def check_can_translate_comments_with_ids_for_post_with_id(user, post_id, post_comments_ids):
+    PostComment = get_post_comment_model()
+    if PostComment.objects.filter(post_id=post_id, pk__in=post_comments_ids).count() != len(post_comments_ids):
+        raise ValidationError(
+            _('The post comments to translate must belong to the post')
+        )
+
+    for post_comment_id in post_comments_ids:
+        check_can_translate_comment_with_id(user=user, post_comment_id=post_comment_id)
+
+
 def check_has_post(user, post):
     if not user.has_post(post=post):
         raise PermissionDenied(
@@ -958,8 +969,8 @@ def check_can_edit_comment_with_id_for_post(user, post_comment_id, post):
         )
 
     if post.community and post.is_closed:
-        is_administrator = user.is_administrator_of_community_with_name(post.community.name)
-        is_moderator = user.is_moderator_of_community_with_name(post.community.name)
+        is_administrator = user.is_administrator_of_community_with_id(post.community_id)
+        is_moderator = user.is_moderator_of_community_with_id(post.community_id)
         if not is_moderator and not is_administrator:
             raise ValidationError(
                 _('Only administrators/moderators can edit a closed post.')
@@ -988,8 +999,8 @@ def check_can_delete_comment_with_id_for_post(user, post_comment_id, post):
     is_comment_creator = user.posts_comments.filter(id=post_comment_id).exists()
 
     if post.community:
-        is_moderator = user.is_moderator_of_community_with_name(post.community.name)
-        is_administrator = user.is_administrator_of_community_with_name(post.community.name)
+        is_moderator = user.is_moderator_of_community_with_id(post.community_id)
+        is_administrator = user.is_administrator_of_community_with_id(post.community_id)
         if not is_administrator and not is_moderator:
             if post.is_closed:
                 raise ValidationError(
@@ -1206,13 +1217,13 @@ def check_can_moderate_moderated_object(user, moderated_object):
 
     if isinstance(content_object, Post):
         if content_object.community:
-            if not user.is_staff_of_community_with_name(community_name=content_object.community.name):
+            if not user.is_staff_of_community_with_id(community_id=content_object.community_id):
                 raise ValidationError(_('Only community staff can moderate community posts'))
         else:
             raise ValidationError(_('Only global moderators can moderate non-community posts'))
     elif isinstance(content_object, PostComment):
         if content_object.post.community:
-            if not user.is_staff_of_community_with_name(community_name=content_object.post.community.name):
+            if not user.is_staff_of_community_with_id(community_id=content_object.post.community_id):
                 raise ValidationError(_('Only community staff can moderate community post comments'))
         else:
             raise ValidationError(_('Only global moderators can moderate non-community post comments'))
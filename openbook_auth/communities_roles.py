@@ -0,0 +1,76 @@
+import itertools
+
+from django.conf import settings
+from django.core.cache import cache
+
+COMMUNITIES_ROLES_CACHE_KEY = 'communities-roles-%d'
+
+# Bumped on every change to memberships or bans, so the roles loaded by user instances in this process are not reused
+# after the change even though they are not refreshed from the cache on every check
+_communities_roles_generations = itertools.count()
+_communities_roles_generation = next(_communities_roles_generations)
+
+
+class UserCommunitiesRoles:
+    """
+    A snapshot of the communities someone is a member, administrator or moderator of or is banned from
+    """
+
+    def __init__(self, member_communities_ids, administrated_communities_ids, moderated_communities_ids,
+                 banned_communities_ids):
+        self.member_communities_ids = frozenset(member_communities_ids)
+        self.administrated_communities_ids = frozenset(administrated_communities_ids)
+        self.moderated_communities_ids = frozenset(moderated_communities_ids)
+        self.banned_communities_ids = frozenset(banned_communities_ids)
+
+    def is_member_of_community_with_id(self, community_id):
+        return community_id in self.member_communities_ids
+
+    def is_administrator_of_community_with_id(self, community_id):
+        return community_id in self.administrated_communities_ids
+
+    def is_moderator_of_community_with_id(self, community_id):
+        return community_id in self.moderated_communities_ids
+
+    def is_staff_of_community_with_id(self, community_id):
+        return community_id in self.administrated_communities_ids or community_id in self.moderated_communities_ids
+
+    def is_banned_from_community_with_id(self, community_id):
+        return community_id in self.banned_communities_ids
+
+    def to_dict(self):
+        return {
+            'member_communities_ids': self.member_communities_ids,
+            'administrated_communities_ids': self.administrated_communities_ids,
+            'moderated_communities_ids': self.moderated_communities_ids,
+            'banned_communities_ids': self.banned_communities_ids,
+        }
+
+
+def get_communities_roles_generation():
+    return _communities_roles_generation
+
+
+def get_cached_communities_roles(user_id):
+    communities_roles = cache.get(COMMUNITIES_ROLES_CACHE_KEY % user_id)
+
+    if communities_roles is None:
+        return None
+
+    return UserCommunitiesRoles(**communities_roles)
+
+
+def cache_communities_roles(user_id, communities_roles):
+    cache.set(COMMUNITIES_ROLES_CACHE_KEY % user_id, communities_roles.to_dict(), settings.USER_COMMUNITIES_ROLES_TTL)
+
+
+def delete_cached_communities_roles(users_ids):
+    global _communities_roles_generation
+    _communities_roles_generation = next(_communities_roles_generations)
+
+    cache.delete_many([COMMUNITIES_ROLES_CACHE_KEY % user_id for user_id in users_ids])
+
+
+def delete_cached_communities_roles_of_new_user(user_id):
+    # A new user has no roles loaded in this process, there is no need to bump the generation
+    cache.delete(COMMUNITIES_ROLES_CACHE_KEY % user_id)
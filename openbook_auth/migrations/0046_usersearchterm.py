@@ -0,0 +1,27 @@
+# Generated by Django 2.2.5 on 2026-10-18 05:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_auth', '0045_userprofile_community_posts_visible'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(db_index=True, max_length=64, verbose_name='term')),
+                ('source', models.CharField(choices=[('U', 'Username'), ('N', 'Name')], max_length=2)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'source', 'term')},
+            },
+        ),
+    ]
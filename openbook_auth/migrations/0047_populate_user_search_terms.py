@@ -0,0 +1,61 @@
+import re
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+# Frozen copy of openbook_common.search.make_search_terms and the SEARCH_TERM_MAX_LENGTH setting as of this migration
+SEARCH_TERM_WORD_REGEX = re.compile(r'[^\s_.\-]+')
+SEARCH_TERM_MAX_LENGTH = 64
+
+
+def make_search_terms(value):
+    if not value:
+        return set()
+
+    value = value.lower()
+    terms = {value[:SEARCH_TERM_MAX_LENGTH]}
+
+    for word_match in SEARCH_TERM_WORD_REGEX.finditer(value):
+        terms.add(value[word_match.start():][:SEARCH_TERM_MAX_LENGTH])
+
+    return terms
+
+
+def forwards_func(apps, schema_editor):
+    # We get the models from the versioned app registry;
+    # if we directly import them, they'll be the wrong version
+    User = apps.get_model('openbook_auth', 'User')
+    UserSearchTerm = apps.get_model('openbook_auth', 'UserSearchTerm')
+    db_alias = schema_editor.connection.alias
+
+    users_search_terms = []
+
+    for user_id, username, name in User.objects.using(db_alias).values_list('id', 'username',
+                                                                             'profile__name').iterator():
+        users_search_terms.extend(
+            [UserSearchTerm(user_id=user_id, term=term, source='U') for term in make_search_terms(username)])
+        users_search_terms.extend(
+            [UserSearchTerm(user_id=user_id, term=term, source='N') for term in make_search_terms(name)])
+
+        if len(users_search_terms) >= BATCH_SIZE:
+            UserSearchTerm.objects.using(db_alias).bulk_create(users_search_terms)
+            users_search_terms = []
+
+    UserSearchTerm.objects.using(db_alias).bulk_create(users_search_terms)
+
+
+def reverse_func(apps, schema_editor):
+    UserSearchTerm = apps.get_model('openbook_auth', 'UserSearchTerm')
+    db_alias = schema_editor.connection.alias
+    UserSearchTerm.objects.using(db_alias).all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('openbook_auth', '0046_usersearchterm'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards_func, reverse_func),
+    ]
@@ -4,9 +4,9 @@ import re
 import uuid
 from django.contrib.auth.validators import UnicodeUsernameValidator, ASCIIUsernameValidator
 from django.contrib.contenttypes.fields import GenericRelation
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import six, timezone, translation
 from django.template.loader import render_to_string
@@ -14,26 +14,44 @@ from django.utils.translation import ugettext_lazy as _
 from imagekit.models import ProcessedImageField
 from pilkit.processors import ResizeToFill, ResizeToFit
 from rest_framework.authtoken.models import Token
-from django.db.models import Q, F, Count
+from django.db.models import Q, F, Count, Max, Case, When, Value, IntegerField
 from django.core.mail import EmailMultiAlternatives
 
 from openbook.settings import USERNAME_MAX_LENGTH
 from openbook_auth.helpers import upload_to_user_cover_directory, upload_to_user_avatar_directory
 from openbook_notifications.helpers import get_notification_language_code_for_target_user
-from openbook_translation import translation_strategy
-from openbook_common.helpers import get_supported_translation_language, normalise_url, get_url_metadata
+from openbook_notifications.unread_counts import get_cached_unread_notifications_count, \
+    cache_unread_notifications_count, increment_cached_unread_notifications_counts, \
+    delete_cached_unread_notifications_count
+from openbook_translation.translations import translate_post, translate_posts, translate_post_comment, \
+    translate_post_comments
+from openbook_common.helpers import get_supported_translation_language, normalise_url
+from openbook_common.url_previews import get_url_preview
 from openbook_common.models import Badge, Language
+from openbook_common.search import make_search_terms, normalise_search_query
 from openbook_common.utils.helpers import delete_file_field
 from openbook_common.utils.model_loaders import get_connection_model, get_circle_model, get_follow_model, \
     get_list_model, get_community_invite_model, \
     get_post_comment_notification_model, get_follow_notification_model, get_connection_confirmed_notification_model, \
     get_connection_request_notification_model, get_post_reaction_notification_model, get_device_model, \
-    get_post_mute_model, get_community_invite_notification_model, get_user_block_model, get_emoji_model, \
+    get_post_mute_model, get_community_invite_notification_model, get_user_block_model, \
     get_post_comment_reply_notification_model, get_moderated_object_model, get_moderation_report_model, \
     get_moderation_penalty_model, get_post_comment_mute_model, get_post_comment_reaction_model, \
-    get_post_comment_reaction_notification_model
+    get_post_comment_reaction_notification_model, get_connection_circle_model, \
+    get_community_search_term_model, get_post_reaction_emoji_count_model, \
+    get_post_comment_reaction_emoji_count_model
 from openbook_common.validators import name_characters_validator
 from openbook_notifications import helpers
+from openbook_posts.jobs import soft_delete_posts, unsoft_delete_posts
+from openbook_posts.timelines import timeline_exists, fill_timeline, get_timeline_posts_ids, timeline_is_truncated, \
+    delete_timeline, delete_timelines
+from openbook_auth.communities_roles import UserCommunitiesRoles, get_communities_roles_generation, \
+    get_cached_communities_roles, cache_communities_roles, delete_cached_communities_roles_of_new_user
+from openbook_auth.relationships import UserRelationships, get_cached_relationships, cache_relationships, \
+    delete_cached_relationships
+from openbook_auth.suspensions import get_cached_suspension_expiration, cache_suspension_expiration, \
+    delete_cached_suspension_expiration
+from openbook_auth.authentication import delete_cached_token_user_id
 from openbook_auth.checkers import *
 
 
@@ -212,7 +230,13 @@ class User(AbstractUser):
             moderated_object__category__severity=moderation_severity).count()
 
     def count_unread_notifications(self):
-        return self.notifications.filter(read=False).count()
+        count = get_cached_unread_notifications_count(user_id=self.pk)
+
+        if count is None:
+            count = self.notifications.filter(read=False).count()
+            cache_unread_notifications_count(user_id=self.pk, count=count)
+
+        return count
 
     def count_public_posts(self):
         """
@@ -248,32 +272,129 @@ class User(AbstractUser):
 
     def delete_with_password(self, password):
         check_password_matches(user=self, password=password)
-        self.delete()
+
+        with transaction.atomic():
+            # The reactions and comments of the user get deleted by cascade, without going through their own delete
+            self._update_counters_for_deleted_reactions_and_comments()
+            self.delete()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super(User, cls).from_db(db, field_names, values)
+        user._indexed_username = user.__dict__.get('username')
+        return user
 
     def save(self, *args, **kwargs):
         self.full_clean(exclude=['invite_count'])
-        return super(User, self).save(*args, **kwargs)
+        username_needs_indexing = self.__dict__.get('username') != getattr(self, '_indexed_username', None)
+
+        saved = super(User, self).save(*args, **kwargs)
+
+        if username_needs_indexing:
+            UserSearchTerm.index_username_for_user_with_id(user_id=self.pk, username=self.username)
+            self._indexed_username = self.username
+
+        return saved
 
     def soft_delete(self):
-        for post in self.posts.all().iterator():
-            post.soft_delete()
+        self.created_communities.update(is_deleted=True)
+        self._update_created_communities_trending_communities()
 
-        for community in self.created_communities.all().iterator():
-            community.soft_delete()
+        if not self.is_deleted:
+            self._update_reactions_counts(amount=-1)
 
         self.is_deleted = True
         self.save()
 
+        # Spam accounts can have too many posts to soft delete them within the request
+        posts_query = self._make_created_posts_and_created_communities_posts_query()
+        transaction.on_commit(lambda: soft_delete_posts.delay(posts_query=posts_query))
+
     def unsoft_delete(self):
-        for post in self.posts.all.iterator():
-            post.unsoft_delete()
+        # Communities soft deleted by their own verified moderated object stay deleted
+        self.created_communities.exclude(moderated_object__verified=True).update(is_deleted=False)
+        self._update_created_communities_trending_communities()
 
-        for community in self.created_communities.all().iterator():
-            community.unsoft_delete()
+        if self.is_deleted:
+            self._update_reactions_counts(amount=1)
 
         self.is_deleted = False
         self.save()
 
+        posts_query = self._make_created_posts_and_created_communities_posts_query()
+        transaction.on_commit(lambda: unsoft_delete_posts.delay(posts_query=posts_query))
+
+    def _update_created_communities_trending_communities(self):
+        # The communities were updated in bulk, without going through their own soft deletion
+        for community in self.created_communities.all():
+            community.update_trending_communities()
+
+    def _make_created_posts_and_created_communities_posts_query(self):
+        return Q(creator_id=self.pk) | Q(community__creator_id=self.pk)
+
+    def _update_reactions_counts(self, amount):
+        # The reactions of soft deleted users are not counted
+        Post = get_post_model()
+        posts_queryset = Post.objects.filter(reactions__reactor_id=self.pk)
+
+        PostComment = get_post_comment_model()
+        post_comments_queryset = PostComment.objects.filter(reactions__reactor_id=self.pk)
+
+        if amount < 0:
+            posts_queryset = posts_queryset.filter(reactions_count__gte=-amount)
+            post_comments_queryset = post_comments_queryset.filter(reactions_count__gte=-amount)
+
+        posts_queryset.update(reactions_count=F('reactions_count') + amount)
+        post_comments_queryset.update(reactions_count=F('reactions_count') + amount)
+
+    def _update_counters_for_deleted_reactions_and_comments(self):
+        if not self.is_deleted:
+            self._update_reactions_counts(amount=-1)
+
+        PostReaction = get_post_reaction_model()
+        PostReactionEmojiCount = get_post_reaction_emoji_count_model()
+        post_reactions = PostReaction.objects.filter(reactor_id=self.pk)
+
+        # A user reacts at most once to a post or post comment, a query per emoji they reacted with
+        for emoji_id in post_reactions.order_by().values_list('emoji_id', flat=True).distinct():
+            PostReactionEmojiCount.objects.filter(
+                emoji_id=emoji_id, count__gte=1,
+                post_id__in=post_reactions.filter(emoji_id=emoji_id).values('post_id')).update(count=F('count') - 1)
+
+        PostCommentReaction = get_post_comment_reaction_model()
+        PostCommentReactionEmojiCount = get_post_comment_reaction_emoji_count_model()
+        post_comment_reactions = PostCommentReaction.objects.filter(reactor_id=self.pk)
+
+        for emoji_id in post_comment_reactions.order_by().values_list('emoji_id', flat=True).distinct():
+            PostCommentReactionEmojiCount.objects.filter(
+                emoji_id=emoji_id, count__gte=1,
+                post_comment_id__in=post_comment_reactions.filter(emoji_id=emoji_id).values(
+                    'post_comment_id')).update(count=F('count') - 1)
+
+        Post = get_post_model()
+        PostComment = get_post_comment_model()
+        post_comments = PostComment.objects.filter(commenter_id=self.pk, is_deleted=False)
+
+        comments_counts = post_comments.filter(parent_comment__isnull=True).order_by().values(
+            'post_id').annotate(count=Count('id'))
+        self._decrement_counter(queryset=Post.objects.all(), counter_field='comments_count',
+                                counts={count['post_id']: count['count'] for count in comments_counts})
+
+        replies_counts = post_comments.filter(parent_comment__isnull=False).order_by().values(
+            'parent_comment_id').annotate(count=Count('id'))
+        self._decrement_counter(queryset=PostComment.objects.all(), counter_field='replies_count',
+                                counts={count['parent_comment_id']: count['count'] for count in replies_counts})
+
+    def _decrement_counter(self, queryset, counter_field, counts):
+        # Rows are grouped by count as MySQL can't update a table from a subquery on that same table
+        ids_by_count = {}
+        for pk, count in counts.items():
+            ids_by_count.setdefault(count, []).append(pk)
+
+        for count, ids in ids_by_count.items():
+            queryset.filter(**{'pk__in': ids, '%s__gte' % counter_field: count}).update(
+                **{counter_field: F(counter_field) - count})
+
     def update_profile_cover(self, cover, save=True):
         if cover is None:
             self.delete_profile_cover(save=False)
@@ -509,9 +630,54 @@ class User(AbstractUser):
     def has_muted_post_comment_with_id(self, post_comment_id):
         return self.post_comment_mutes.filter(post_comment_id=post_comment_id).exists()
 
+    def get_muted_post_comments_ids(self):
+        return self.post_comment_mutes.values_list('post_comment_id', flat=True)
+
     def has_blocked_user_with_id(self, user_id):
         return self.user_blocks.filter(blocked_user_id=user_id).exists()
 
+    def get_relationships(self):
+        """
+        Returns a snapshot of the users self follows, is connected with or is blocked with.
+        Meant for rendering and deciding who can see posts, checks guarding changes to the relationships themselves
+        should keep asking the database.
+        """
+        relationships = getattr(self, '_relationships', None)
+
+        if relationships is None:
+            relationships = get_cached_relationships(self.pk)
+
+            if relationships is None:
+                relationships = self._make_relationships()
+                cache_relationships(self.pk, relationships)
+
+            self._relationships = relationships
+
+        return relationships
+
+    def _make_relationships(self):
+        Follow = get_follow_model()
+        Connection = get_connection_model()
+        ConnectionCircle = get_connection_circle_model()
+        UserBlock = get_user_block_model()
+
+        return UserRelationships(
+            followed_users_ids=Follow.objects.filter(user_id=self.pk).values_list('followed_user_id', flat=True),
+            connected_users_ids=Connection.objects.filter(user_id=self.pk).values_list('target_user_id', flat=True),
+            confirmed_connection_users_ids=ConnectionCircle.objects.filter(connection__user_id=self.pk).values_list(
+                'connection__target_user_id', flat=True),
+            confirming_connection_users_ids=ConnectionCircle.objects.filter(
+                connection__target_user_id=self.pk).values_list('connection__user_id', flat=True),
+            blocked_users_ids=UserBlock.objects.filter(blocker_id=self.pk).values_list('blocked_user_id', flat=True),
+            blocking_users_ids=UserBlock.objects.filter(blocked_user_id=self.pk).values_list('blocker_id', flat=True),
+            in_circles_ids=ConnectionCircle.objects.filter(connection__target_user_id=self.pk).values_list(
+                'circle_id', flat=True),
+        )
+
+    def _clear_relationships_with_users_with_ids(self, users_ids):
+        delete_cached_relationships(users_ids=[self.pk] + list(users_ids))
+        self._relationships = None
+
     def is_blocked_with_user_with_id(self, user_id):
         UserBlock = get_user_block_model()
         return UserBlock.users_are_blocked(user_a_id=self.pk, user_b_id=user_id)
@@ -527,31 +693,103 @@ class User(AbstractUser):
                                                        community__name=community_name).exists()
 
     def is_administrator_of_community_with_name(self, community_name):
-        return self.communities_memberships.filter(community__name=community_name, is_administrator=True).exists()
+        community_id = self._get_community_id_with_name(community_name=community_name)
+        return community_id is not None and self.is_administrator_of_community_with_id(community_id)
+
+    def is_administrator_of_community_with_id(self, community_id):
+        return self.get_communities_roles().is_administrator_of_community_with_id(community_id)
 
     def is_staff_of_community_with_name(self, community_name):
-        return self.is_administrator_of_community_with_name(
-            community_name=community_name) or self.is_moderator_of_community_with_name(community_name=community_name)
+        community_id = self._get_community_id_with_name(community_name=community_name)
+        return community_id is not None and self.is_staff_of_community_with_id(community_id)
+
+    def is_staff_of_community_with_id(self, community_id):
+        return self.get_communities_roles().is_staff_of_community_with_id(community_id)
 
     def is_member_of_communities(self):
         return self.communities_memberships.all().exists()
 
     def is_member_of_community_with_name(self, community_name):
-        return self.communities_memberships.filter(community__name=community_name).exists()
+        community_id = self._get_community_id_with_name(community_name=community_name)
+        return community_id is not None and self.is_member_of_community_with_id(community_id)
+
+    def is_member_of_community_with_id(self, community_id):
+        return self.get_communities_roles().is_member_of_community_with_id(community_id)
 
     def is_banned_from_community_with_name(self, community_name):
-        return self.banned_of_communities.filter(name=community_name).exists()
+        community_id = self._get_community_id_with_name(community_name=community_name)
+        return community_id is not None and self.is_banned_from_community_with_id(community_id)
+
+    def is_banned_from_community_with_id(self, community_id):
+        return self.get_communities_roles().is_banned_from_community_with_id(community_id)
 
     def is_creator_of_community_with_name(self, community_name):
         return self.created_communities.filter(name=community_name).exists()
 
     def is_moderator_of_community_with_name(self, community_name):
-        return self.communities_memberships.filter(community__name=community_name, is_moderator=True).exists()
+        community_id = self._get_community_id_with_name(community_name=community_name)
+        return community_id is not None and self.is_moderator_of_community_with_id(community_id)
+
+    def is_moderator_of_community_with_id(self, community_id):
+        return self.get_communities_roles().is_moderator_of_community_with_id(community_id)
+
+    def _get_community_id_with_name(self, community_name):
+        Community = get_community_model()
+        return Community.get_community_id_with_name(community_name=community_name)
+
+    def get_communities_roles(self):
+        """
+        Returns a snapshot of the communities self is a member, administrator or moderator of or is banned from.
+        It is loaded once per instance, and again only after memberships or bans changed.
+        """
+        communities_roles_generation = get_communities_roles_generation()
+        communities_roles = getattr(self, '_communities_roles', None)
+
+        if communities_roles is None or self._communities_roles_generation != communities_roles_generation:
+            communities_roles = get_cached_communities_roles(self.pk)
+
+            if communities_roles is None:
+                communities_roles = self._make_communities_roles()
+                cache_communities_roles(self.pk, communities_roles)
+
+            self._communities_roles = communities_roles
+            self._communities_roles_generation = communities_roles_generation
+
+        return communities_roles
+
+    def _make_communities_roles(self):
+        memberships = list(self.communities_memberships.values_list('community_id', 'is_administrator', 'is_moderator'))
+
+        return UserCommunitiesRoles(
+            member_communities_ids=[community_id for community_id, _, _ in memberships],
+            administrated_communities_ids=[community_id for community_id, is_administrator, _ in memberships if
+                                           is_administrator],
+            moderated_communities_ids=[community_id for community_id, _, is_moderator in memberships if is_moderator],
+            banned_communities_ids=self.banned_of_communities.values_list('id', flat=True),
+        )
 
     def is_suspended(self):
-        ModerationPenalty = get_moderation_penalty_model()
-        return self.moderation_penalties.filter(type=ModerationPenalty.TYPE_SUSPENSION,
-                                                expiration__gt=timezone.now()).exists()
+        return self.get_suspension_expiration() is not None
+
+    def get_suspension_expiration(self):
+        """
+        Returns when the longest active suspension of the user expires, None if the user is not suspended
+        """
+        cached_suspension = get_cached_suspension_expiration(user_id=self.pk)
+
+        if cached_suspension is None:
+            ModerationPenalty = get_moderation_penalty_model()
+            expiration = self.moderation_penalties.filter(type=ModerationPenalty.TYPE_SUSPENSION,
+                                                          expiration__gt=timezone.now()).aggregate(
+                Max('expiration'))['expiration__max']
+            cache_suspension_expiration(user_id=self.pk, expiration=expiration)
+        else:
+            expiration = cached_suspension['expiration']
+
+        if expiration is None or expiration <= timezone.now():
+            return None
+
+        return expiration
 
     def get_longest_moderation_suspension(self):
         return self.moderation_penalties.order_by('expiration')[0:1][0]
@@ -679,18 +917,16 @@ class User(AbstractUser):
         return self.profile.community_posts_visible
 
     def can_see_post(self, post):
-        # Check if post is public
-        if post.community:
-            if self._can_see_community_post(community=post.community, post=post):
-                return True
-        elif post.creator_id == self.pk and not post.is_deleted:
-            return True
-        else:
-            # Check if we can retrieve the post
-            if self._can_see_post(post=post):
-                return True
+        """
+        Decided in memory from the audience of the post and our relationships. The database is only asked about our
+        role in the community of a community post and, when blocked with its creator, about theirs.
+        """
+        audience = post.get_audience()
 
-        return False
+        if audience.is_community_audience():
+            return self._can_see_community_post(post=post, audience=audience)
+
+        return self._can_see_circles_post(post=post, audience=audience)
 
     def can_see_post_comment(self, post_comment):
         post = post_comment.post
@@ -737,38 +973,26 @@ class User(AbstractUser):
     def get_emoji_counts_for_post(self, post, emoji_id=None):
         check_can_get_reactions_for_post(user=self, post=post)
 
-        Emoji = get_emoji_model()
+        Post = get_post_model()
+        emoji_counts = Post.get_emoji_counts_for_post_with_id(post_id=post.pk, emoji_id=emoji_id)
 
-        emoji_query = Q(post_reactions__post_id=post.pk, )
+        hidden_reactors_query = self._make_hidden_reactors_query(community=post.community)
 
-        if emoji_id:
-            emoji_query.add(Q(post_reactions__emoji_id=emoji_id), Q.AND)
+        if not hidden_reactors_query:
+            return emoji_counts
 
-        post_community = post.community
+        hidden_reactions_query = Q(post_id=post.pk)
 
-        if post_community:
-            if not self.is_staff_of_community_with_name(community_name=post_community.name):
-                # Exclude blocked users reactions
-                blocked_users_query = ~Q(Q(post_reactions__reactor__blocked_by_users__blocker_id=self.pk) | Q(
-                    post_reactions__reactor__user_blocks__blocked_user_id=self.pk))
-                blocked_users_query_staff_members = Q(
-                    post_reactions__reactor__communities_memberships__community_id=post_community.pk)
-                blocked_users_query_staff_members.add(
-                    Q(post_reactions__reactor__communities_memberships__is_administrator=True) | Q(
-                        post_reactions__reactor__communities_memberships__is_moderator=True), Q.AND)
+        if emoji_id:
+            hidden_reactions_query.add(Q(emoji_id=emoji_id), Q.AND)
 
-                blocked_users_query.add(~blocked_users_query_staff_members, Q.AND)
-                emoji_query.add(blocked_users_query, Q.AND)
-        else:
-            # Show all, even blocked users reactions
-            blocked_users_query = ~Q(Q(post_reactions__reactor__blocked_by_users__blocker_id=self.pk) | Q(
-                post_reactions__reactor__user_blocks__blocked_user_id=self.pk))
-            emoji_query.add(blocked_users_query, Q.AND)
+        hidden_reactions_query.add(hidden_reactors_query, Q.AND)
 
-        emojis = Emoji.objects.filter(emoji_query).annotate(Count('post_reactions')).distinct().order_by(
-            '-post_reactions__count').cache().all()
+        PostReaction = get_post_reaction_model()
+        hidden_emoji_counts = PostReaction.objects.filter(hidden_reactions_query).values('emoji_id').annotate(
+            count=Count('id', distinct=True))
 
-        return [{'emoji': emoji, 'count': emoji.post_reactions__count} for emoji in emojis]
+        return self._subtract_hidden_emoji_counts(emoji_counts=emoji_counts, hidden_emoji_counts=hidden_emoji_counts)
 
     def get_emoji_counts_for_post_comment_with_id(self, post_comment_id, emoji_id=None):
         PostComment = get_post_comment_model()
@@ -778,38 +1002,63 @@ class User(AbstractUser):
     def get_emoji_counts_for_post_comment(self, post_comment, emoji_id=None):
         check_can_get_reactions_for_post_comment(user=self, post_comment=post_comment)
 
-        Emoji = get_emoji_model()
+        PostComment = get_post_comment_model()
+        emoji_counts = PostComment.get_emoji_counts_for_post_comment_with_id(post_comment_id=post_comment.pk,
+                                                                             emoji_id=emoji_id)
+
+        hidden_reactors_query = self._make_hidden_reactors_query(community=post_comment.post.community)
+
+        if not hidden_reactors_query:
+            return emoji_counts
 
-        emoji_query = Q(post_comment_reactions__post_comment_id=post_comment.pk, )
+        hidden_reactions_query = Q(post_comment_id=post_comment.pk)
 
         if emoji_id:
-            emoji_query.add(Q(post_comment_reactions__emoji_id=emoji_id), Q.AND)
+            hidden_reactions_query.add(Q(emoji_id=emoji_id), Q.AND)
 
-        post_comment_community = post_comment.post.community
+        hidden_reactions_query.add(hidden_reactors_query, Q.AND)
 
-        if post_comment_community:
-            if not self.is_staff_of_community_with_name(community_name=post_comment_community.name):
-                # Exclude blocked users reactions
-                blocked_users_query = ~Q(Q(post_comment_reactions__reactor__blocked_by_users__blocker_id=self.pk) | Q(
-                    post_comment_reactions__reactor__user_blocks__blocked_user_id=self.pk))
-                blocked_users_query_staff_members = Q(
-                    post_comment_reactions__reactor__communities_memberships__community_id=post_comment_community.pk)
-                blocked_users_query_staff_members.add(
-                    Q(post_comment_reactions__reactor__communities_memberships__is_administrator=True) | Q(
-                        post_comment_reactions__reactor__communities_memberships__is_moderator=True), Q.AND)
+        PostCommentReaction = get_post_comment_reaction_model()
+        hidden_emoji_counts = PostCommentReaction.objects.filter(hidden_reactions_query).values(
+            'emoji_id').annotate(count=Count('id', distinct=True))
 
-                blocked_users_query.add(~blocked_users_query_staff_members, Q.AND)
-                emoji_query.add(blocked_users_query, Q.AND)
-        else:
-            # Show all, even blocked users reactions
-            blocked_users_query = ~Q(Q(post_comment_reactions__reactor__blocked_by_users__blocker_id=self.pk) | Q(
-                post_comment_reactions__reactor__user_blocks__blocked_user_id=self.pk))
-            emoji_query.add(blocked_users_query, Q.AND)
+        return self._subtract_hidden_emoji_counts(emoji_counts=emoji_counts, hidden_emoji_counts=hidden_emoji_counts)
+
+    def _make_hidden_reactors_query(self, community=None):
+        """
+        The reactions we should not see are the ones of blocked users, in communities this does not apply to the
+        reactions of staff members nor when we are staff members ourselves.
+        """
+        if community and self.is_staff_of_community_with_id(community_id=community.pk):
+            return None
+
+        hidden_reactors_query = Q(reactor__blocked_by_users__blocker_id=self.pk) | Q(
+            reactor__user_blocks__blocked_user_id=self.pk)
+
+        if community:
+            staff_members_query = Q(reactor__communities_memberships__community_id=community.pk)
+            staff_members_query.add(Q(reactor__communities_memberships__is_administrator=True) | Q(
+                reactor__communities_memberships__is_moderator=True), Q.AND)
+            hidden_reactors_query.add(~staff_members_query, Q.AND)
+
+        return hidden_reactors_query
+
+    def _subtract_hidden_emoji_counts(self, emoji_counts, hidden_emoji_counts):
+        hidden_counts = {hidden_emoji_count['emoji_id']: hidden_emoji_count['count'] for hidden_emoji_count in
+                         hidden_emoji_counts}
 
-        emojis = Emoji.objects.filter(emoji_query).annotate(Count('post_comment_reactions')).distinct().order_by(
-            '-post_comment_reactions__count').cache().all()
+        if not hidden_counts:
+            return emoji_counts
 
-        return [{'emoji': emoji, 'count': emoji.post_comment_reactions__count} for emoji in emojis]
+        visible_emoji_counts = []
+
+        for emoji_count in emoji_counts:
+            count = emoji_count['count'] - hidden_counts.get(emoji_count['emoji'].pk, 0)
+            if count > 0:
+                visible_emoji_counts.append({'emoji': emoji_count['emoji'], 'count': count})
+
+        return sorted(visible_emoji_counts, key=lambda visible_emoji_count: visible_emoji_count['count'],
+                      reverse=True)
 
     def get_reaction_for_post_comment_with_id(self, post_comment_id):
         return self.post_comment_reactions.filter(post_comment_id=post_comment_id).get()
@@ -1129,7 +1378,10 @@ class User(AbstractUser):
     def delete_circle_with_id(self, circle_id):
         check_can_delete_circle_with_id(user=self, circle_id=circle_id)
         circle = self.circles.get(id=circle_id)
+        # Connections left without circles are no longer confirmed
+        circle_users_ids = list(circle.connections.values_list('target_user_id', flat=True))
         circle.delete()
+        self._clear_relationships_with_users_with_ids(users_ids=circle_users_ids)
 
     def update_circle(self, circle, **kwargs):
         return self.update_circle_with_id(circle.pk, **kwargs)
@@ -1185,6 +1437,7 @@ class User(AbstractUser):
         check_is_connected_with_user_with_id_in_circle_with_id(user=self, user_id=user_id, circle_id=circle_id)
         connection = self.get_connection_for_user_with_id(user_id)
         connection.circles.remove(circle_id)
+        self._clear_relationships_with_users_with_ids(users_ids=[user_id])
         return connection
 
     def add_circle_with_id_to_connection_with_user_with_id(self, user_id, circle_id):
@@ -1192,6 +1445,7 @@ class User(AbstractUser):
         check_is_not_connected_with_user_with_id_in_circle_with_id(user=self, user_id=user_id, circle_id=circle_id)
         connection = self.get_connection_for_user_with_id(user_id)
         connection.circles.add(circle_id)
+        self._clear_relationships_with_users_with_ids(users_ids=[user_id])
         return connection
 
     def get_circle_with_id(self, circle_id):
@@ -1611,13 +1865,12 @@ class User(AbstractUser):
     def search_users_with_query(self, query):
         users_query = self._make_search_users_query(query=query)
 
-        return User.objects.filter(users_query)
+        return UserSearchTerm.rank_users_for_query(users=User.objects.filter(users_query), query=query)
 
     def _make_search_users_query(self, query):
         users_query = self._make_users_query()
 
-        search_users_query = Q(username__icontains=query)
-        search_users_query.add(Q(profile__name__icontains=query), Q.OR)
+        search_users_query = UserSearchTerm.make_search_users_query(query=query)
 
         users_query.add(search_users_query, Q.AND)
         return users_query
@@ -1641,12 +1894,11 @@ class User(AbstractUser):
     def search_linked_users_with_query(self, query):
         linked_users_query = self._make_linked_users_query()
 
-        names_query = Q(username__icontains=query)
-        names_query.add(Q(profile__name__icontains=query), Q.OR)
+        names_query = UserSearchTerm.make_search_users_query(query=query)
 
         linked_users_query.add(names_query, Q.AND)
 
-        return User.objects.filter(linked_users_query).distinct()
+        return UserSearchTerm.rank_users_for_query(users=User.objects.filter(linked_users_query).distinct(), query=query)
 
     def get_blocked_users(self, max_id=None):
         blocked_users_query = self._make_blocked_users_query(max_id=max_id)
@@ -1656,12 +1908,11 @@ class User(AbstractUser):
     def search_blocked_users_with_query(self, query):
         blocked_users_query = self._make_blocked_users_query()
 
-        names_query = Q(username__icontains=query)
-        names_query.add(Q(profile__name__icontains=query), Q.OR)
+        names_query = UserSearchTerm.make_search_users_query(query=query)
 
         blocked_users_query.add(names_query, Q.AND)
 
-        return User.objects.filter(blocked_users_query).distinct()
+        return UserSearchTerm.rank_users_for_query(users=User.objects.filter(blocked_users_query).distinct(), query=query)
 
     def get_followers(self, max_id=None):
         followers_query = self._make_followers_query()
@@ -1682,22 +1933,20 @@ class User(AbstractUser):
     def search_followers_with_query(self, query):
         followers_query = Q(follows__followed_user_id=self.pk, is_deleted=False)
 
-        names_query = Q(username__icontains=query)
-        names_query.add(Q(profile__name__icontains=query), Q.OR)
+        names_query = UserSearchTerm.make_search_users_query(query=query)
 
         followers_query.add(names_query, Q.AND)
 
-        return User.objects.filter(followers_query).distinct()
+        return UserSearchTerm.rank_users_for_query(users=User.objects.filter(followers_query).distinct(), query=query)
 
     def search_followings_with_query(self, query):
         followings_query = Q(followers__user_id=self.pk, is_deleted=False)
 
-        names_query = Q(username__icontains=query)
-        names_query.add(Q(profile__name__icontains=query), Q.OR)
+        names_query = UserSearchTerm.make_search_users_query(query=query)
 
         followings_query.add(names_query, Q.AND)
 
-        return User.objects.filter(followings_query).distinct()
+        return UserSearchTerm.rank_users_for_query(users=User.objects.filter(followings_query).distinct(), query=query)
 
     def get_trending_posts(self):
         Post = get_post_model()
@@ -1721,12 +1970,13 @@ class User(AbstractUser):
         return Community.objects.filter(memberships__user=self)
 
     def search_joined_communities_with_query(self, query):
+        Community = get_community_model()
+        CommunitySearchTerm = get_community_search_term_model()
         joined_communities_query = Q(memberships__user=self)
-        joined_communities_name_query = Q(name__icontains=query)
-        joined_communities_name_query.add(Q(title__icontains=query), Q.OR)
+        joined_communities_name_query = CommunitySearchTerm.make_search_communities_query(query=query)
         joined_communities_query.add(joined_communities_name_query, Q.AND)
-        Community = get_community_model()
-        return Community.objects.filter(joined_communities_query)
+        return CommunitySearchTerm.rank_communities_for_query(
+            communities=Community.objects.filter(joined_communities_query), query=query)
 
     def get_favorite_communities(self):
         return self.favorite_communities.all()
@@ -1744,6 +1994,12 @@ class User(AbstractUser):
         return self.create_encircled_post(text=text, image=image, video=video, circles_ids=[world_circle_id],
                                           created=created, is_draft=is_draft)
 
+    def create_imported_public_posts(self, posts):
+        world_circle_id = self._get_world_circle_id()
+        check_can_post_to_circles_with_ids(user=self, circles_ids=[world_circle_id])
+        Post = get_post_model()
+        return Post.create_imported_posts(creator=self, circles_ids=[world_circle_id], posts=posts)
+
     def create_encircled_post(self, circles_ids, text=None, image=None, video=None, created=None, is_draft=False):
         check_can_post_to_circles_with_ids(user=self, circles_ids=circles_ids)
         Post = get_post_model()
@@ -1827,23 +2083,31 @@ class User(AbstractUser):
         preview_link = post.post_links.first().link
         check_can_preview_url(preview_link)
 
-        return get_url_metadata(preview_link)
+        return get_url_preview(preview_link)
 
     def get_preview_link_data_for_url(self, url):
         check_can_preview_url(url)
         url = normalise_url(url)
-        return get_url_metadata(url)
+        return get_url_preview(url)
 
     def translate_post_with_id(self, post_id):
         check_can_translate_post_with_id(user=self, post_id=post_id)
         Post = get_post_model()
-        post = Post.objects.get(id=post_id)
-        result = translation_strategy.translate_text(
-            source_language_code=post.language.code,
-            target_language_code=self.translation_language.code,
-            text=post.text
-        )
-        return post, result.get('translated_text')
+        post = Post.objects.select_related('language').get(id=post_id)
+        translated_text = translate_post(post=post, target_language_code=self.translation_language.code)
+        return post, translated_text
+
+    def translate_posts_with_ids(self, posts_ids):
+        posts_ids = set(posts_ids)
+
+        for post_id in posts_ids:
+            check_can_translate_post_with_id(user=self, post_id=post_id)
+
+        Post = get_post_model()
+        posts = list(Post.objects.select_related('language').filter(id__in=posts_ids))
+        translated_texts = translate_posts(posts=posts, target_language_code=self.translation_language.code)
+
+        return [(post, translated_texts[post.pk]) for post in posts]
 
     def open_post_with_id(self, post_id):
         check_can_open_post_with_id(user=self, post_id=post_id)
@@ -2077,9 +2341,8 @@ class User(AbstractUser):
     def _get_timeline_posts_with_no_filters(self, max_id=None, min_id=None, count=10):
         """
         Being the main action of the network, an optimised call of the get timeline posts call with no filtering.
+        The posts are read from the materialized timeline of the user, visibility is enforced on read.
         """
-        world_circle_id = self._get_world_circle_id()
-
         Post = get_post_model()
 
         posts_select_related = ('creator', 'creator__profile', 'community', 'image')
@@ -2093,56 +2356,96 @@ class User(AbstractUser):
                       'community__color',
                       'community__title')
 
+        timeline_posts_ids = self._get_timeline_posts_ids(max_id=max_id, min_id=min_id, count=count or 10)
+
+        return Post.objects.select_related(*posts_select_related).prefetch_related(
+            *posts_prefetch_related).only(*posts_only).filter(id__in=timeline_posts_ids)
+
+    def _get_timeline_posts_ids(self, max_id=None, min_id=None, count=10):
+        if not timeline_exists(self.pk):
+            self.rebuild_timeline()
+
+        timeline_posts_ids = []
+
+        while len(timeline_posts_ids) < count:
+            candidate_posts_ids = get_timeline_posts_ids(user_id=self.pk, max_id=max_id, min_id=min_id, count=count)
+
+            if candidate_posts_ids:
+                # Block, report and visibility rules might have changed since the posts were added
+                timeline_posts_ids.extend(self._make_timeline_posts_ids_queryset(posts_ids=candidate_posts_ids))
+                max_id = candidate_posts_ids[-1]
+
+            if len(candidate_posts_ids) < count:
+                if timeline_is_truncated(self.pk):
+                    # The older posts were trimmed from the timeline
+                    older_posts_ids = self._make_timeline_posts_ids_queryset(max_id=max_id, min_id=min_id)
+                    timeline_posts_ids.extend(older_posts_ids[:count - len(timeline_posts_ids)])
+                break
+
+        return timeline_posts_ids[:count]
+
+    def rebuild_timeline(self):
+        timeline_posts_ids = self._make_timeline_posts_ids_queryset()[:settings.USER_TIMELINE_MAX_LENGTH]
+        fill_timeline(user_id=self.pk, posts_ids=timeline_posts_ids)
+
+    def _make_timeline_posts_ids_queryset(self, max_id=None, min_id=None, posts_ids=None):
+        world_circle_id = self._get_world_circle_id()
+
+        Post = get_post_model()
+
         ModeratedObject = get_moderated_object_model()
         reported_posts_exclusion_query = ~Q(moderated_object__reports__reporter_id=self.pk)
 
+        cursor_scrolling_query = Q()
+
+        if max_id:
+            cursor_scrolling_query.add(Q(id__lt=max_id), Q.AND)
+
+        if min_id:
+            cursor_scrolling_query.add(Q(id__gt=min_id), Q.AND)
+
+        if posts_ids is not None:
+            cursor_scrolling_query.add(Q(id__in=posts_ids), Q.AND)
+
         own_posts_query = Q(creator=self.pk, community__isnull=True, is_deleted=False, status=Post.STATUS_PUBLISHED)
 
         own_posts_query.add(reported_posts_exclusion_query, Q.AND)
 
-        if max_id:
-            own_posts_query.add(Q(id__lt=max_id), Q.AND)
+        own_posts_query.add(cursor_scrolling_query, Q.AND)
 
-        own_posts_queryset = self.posts.select_related(*posts_select_related).prefetch_related(
-            *posts_prefetch_related).only(*posts_only).filter(own_posts_query)
+        own_posts_queryset = Post.objects.filter(own_posts_query).values_list('id', flat=True)
 
         community_posts_query = Q(community__memberships__user__id=self.pk, is_closed=False, is_deleted=False,
                                   status=Post.STATUS_PUBLISHED)
 
-        community_posts_query.add(~Q(Q(creator__blocked_by_users__blocker_id=self.pk) | Q(
-            creator__user_blocks__blocked_user_id=self.pk)), Q.AND)
+        relationships = self.get_relationships()
 
-        if max_id:
-            community_posts_query.add(Q(id__lt=max_id), Q.AND)
+        blocked_with_users_ids = relationships.get_blocked_with_users_ids()
 
-        community_posts_query.add(~Q(moderated_object__status=ModeratedObject.STATUS_APPROVED), Q.AND)
+        if blocked_with_users_ids:
+            community_posts_query.add(~Q(creator_id__in=blocked_with_users_ids), Q.AND)
 
-        community_posts_query.add(reported_posts_exclusion_query, Q.AND)
+        community_posts_query.add(cursor_scrolling_query, Q.AND)
 
-        community_posts_queryset = Post.objects.select_related(*posts_select_related).prefetch_related(
-            *posts_prefetch_related).only(*posts_only).filter(community_posts_query)
+        community_posts_query.add(~Q(moderated_object__status=ModeratedObject.STATUS_APPROVED), Q.AND)
 
-        followed_users = self.follows.values('followed_user_id')
+        community_posts_query.add(reported_posts_exclusion_query, Q.AND)
 
-        followed_users_ids = [followed_user['followed_user_id'] for followed_user in followed_users]
+        community_posts_queryset = Post.objects.filter(community_posts_query).values_list('id', flat=True)
 
-        followed_users_query = Q(creator__in=followed_users_ids, is_deleted=False, status=Post.STATUS_PUBLISHED)
+        followed_users_query = Q(creator__in=relationships.followed_users_ids, is_deleted=False, status=Post.STATUS_PUBLISHED)
 
         followed_users_query.add(reported_posts_exclusion_query, Q.AND)
 
-        if max_id:
-            followed_users_query.add(Q(id__lt=max_id), Q.AND)
+        followed_users_query.add(cursor_scrolling_query, Q.AND)
 
         followed_users_query.add(
             Q(circles__id=world_circle_id) | Q(circles__connections__target_connection__circles__isnull=False,
                                                circles__connections__target_user=self.pk), Q.AND)
 
-        followed_users_queryset = Post.objects.select_related(*posts_select_related).prefetch_related(
-            *posts_prefetch_related).only(*posts_only).filter(followed_users_query)
-
-        final_queryset = own_posts_queryset.union(community_posts_queryset, followed_users_queryset)
+        followed_users_queryset = Post.objects.filter(followed_users_query).values_list('id', flat=True)
 
-        return final_queryset
+        return own_posts_queryset.union(community_posts_queryset, followed_users_queryset).order_by('-id')
 
     def get_global_moderated_objects(self, types=None, max_id=None, verified=None, statuses=None):
         check_can_get_global_moderated_objects(user=self)
@@ -2266,6 +2569,9 @@ class User(AbstractUser):
 
         Follow = get_follow_model()
         follow = Follow.create_follow(user_id=self.pk, followed_user_id=user_id, lists_ids=lists_ids)
+        # The posts of the followed user need to be backfilled
+        delete_timeline(self.pk)
+        self._clear_relationships_with_users_with_ids(users_ids=[user_id])
         self._create_follow_notification(followed_user_id=user_id)
         self._send_follow_push_notification(followed_user_id=user_id)
 
@@ -2279,6 +2585,7 @@ class User(AbstractUser):
         follow = self.follows.get(followed_user_id=user_id)
         self._delete_follow_notification(followed_user_id=user_id)
         follow.delete()
+        self._clear_relationships_with_users_with_ids(users_ids=[user_id])
 
     def update_follow_for_user(self, user, lists_ids=None):
         return self.update_follow_for_user_with_id(user.pk, lists_ids=lists_ids)
@@ -2330,6 +2637,7 @@ class User(AbstractUser):
 
         Connection = get_connection_model()
         connection = Connection.create_connection(user_id=self.pk, target_user_id=user_id, circles_ids=circles_ids)
+        self._clear_relationships_with_users_with_ids(users_ids=[user_id])
 
         # Automatically follow user
         if not self.is_following_user_with_id(user_id):
@@ -2376,6 +2684,10 @@ class User(AbstractUser):
         connection.circles.add(*circles_ids)
         connection.save()
 
+        # The posts visible to each other might have changed
+        delete_timelines(users_ids=[self.pk, user_id])
+        self._clear_relationships_with_users_with_ids(users_ids=[user_id])
+
         return connection
 
     def disconnect_from_user(self, user):
@@ -2392,6 +2704,7 @@ class User(AbstractUser):
 
         connection = self.connections.get(target_connection__user_id=user_id)
         connection.delete()
+        self._clear_relationships_with_users_with_ids(users_ids=[user_id])
 
         return connection
 
@@ -2420,14 +2733,14 @@ class User(AbstractUser):
         if types:
             notifications_query.add(Q(notification_type__in=types), Q.AND)
 
-        self.notifications.filter(notifications_query).update(read=True)
+        read_amount = self.notifications.filter(notifications_query).update(read=True)
+        increment_cached_unread_notifications_counts(users_ids_amounts={self.pk: -read_amount})
 
     def read_notification_with_id(self, notification_id):
         check_can_read_notification_with_id(user=self, notification_id=notification_id)
-        notification = self.notifications.get(id=notification_id)
-        notification.read = True
-        notification.save()
-        return notification
+        read_amount = self.notifications.filter(id=notification_id, read=False).update(read=True)
+        increment_cached_unread_notifications_counts(users_ids_amounts={self.pk: -read_amount})
+        return self.notifications.get(id=notification_id)
 
     def delete_notification_with_id(self, notification_id):
         check_can_delete_notification_with_id(user=self, notification_id=notification_id)
@@ -2508,13 +2821,23 @@ class User(AbstractUser):
     def translate_post_comment_with_id(self, post_comment_id):
         check_can_translate_comment_with_id(user=self, post_comment_id=post_comment_id)
         PostComment = get_post_comment_model()
-        post_comment = PostComment.objects.get(pk=post_comment_id)
-        result = translation_strategy.translate_text(
-            source_language_code=post_comment.language.code,
-            target_language_code=self.translation_language.code,
-            text=post_comment.text
-        )
-        return post_comment, result.get('translated_text')
+        post_comment = PostComment.objects.select_related('language').get(pk=post_comment_id)
+        translated_text = translate_post_comment(post_comment=post_comment,
+                                                 target_language_code=self.translation_language.code)
+        return post_comment, translated_text
+
+    def translate_comments_with_ids_for_post_with_id(self, post_id, post_comments_ids):
+        post_comments_ids = set(post_comments_ids)
+
+        check_can_translate_comments_with_ids_for_post_with_id(user=self, post_id=post_id,
+                                                               post_comments_ids=post_comments_ids)
+
+        PostComment = get_post_comment_model()
+        post_comments = list(PostComment.objects.select_related('language').filter(id__in=post_comments_ids))
+        translated_texts = translate_post_comments(post_comments=post_comments,
+                                                   target_language_code=self.translation_language.code)
+
+        return [(post_comment, translated_texts[post_comment.pk]) for post_comment in post_comments]
 
     def block_user_with_username(self, username):
         user = User.objects.get(username=username)
@@ -2535,6 +2858,7 @@ class User(AbstractUser):
 
         UserBlock = get_user_block_model()
         UserBlock.create_user_block(blocker_id=self.pk, blocked_user_id=user_id)
+        self._clear_relationships_with_users_with_ids(users_ids=[user_id])
 
         return user_to_block
 
@@ -2545,6 +2869,8 @@ class User(AbstractUser):
     def unblock_user_with_id(self, user_id):
         check_can_unblock_user_with_id(user=self, user_id=user_id)
         self.user_blocks.filter(blocked_user_id=user_id).delete()
+        delete_timelines(users_ids=[self.pk, user_id])
+        self._clear_relationships_with_users_with_ids(users_ids=[user_id])
         return User.objects.get(pk=user_id)
 
     def report_comment_with_id_for_post_with_uuid(self, post_comment_id, post_uuid, category_id, description=None):
@@ -2579,6 +2905,7 @@ class User(AbstractUser):
                                                        reporter_id=self.pk,
                                                        description=description)
         post.delete_notifications_for_user(user=self)
+        post.clear_audience()
 
     def report_user_with_username(self, username, category_id, description=None):
         user = User.objects.get(username=username)
@@ -2944,24 +3271,69 @@ class User(AbstractUser):
                           settings.SECRET_KEY,
                           algorithm=settings.JWT_ALGORITHM).decode('utf-8')
 
-    def _can_see_post(self, post):
-        post_query = self._make_get_post_with_id_query_for_user(post.creator, post_id=post.pk)
+    def _can_see_circles_post(self, post, audience):
+        # Mirrors _make_get_posts_query_for_user
+        if post.creator_id == self.pk:
+            return not post.is_deleted
 
         Post = get_post_model()
-        profile_posts = Post.objects.filter(post_query)
 
-        return profile_posts.exists()
+        if post.is_deleted or post.status != Post.STATUS_PUBLISHED:
+            return False
 
-    def _can_see_community_post(self, community, post):
-        if post.creator_id == self.pk:
+        if audience.is_reported_by_user_with_id(self.pk):
+            return False
+
+        relationships = self.get_relationships()
+
+        if relationships.is_blocked_with_user_with_id(post.creator_id):
+            return False
+
+        if audience.is_world:
             return True
 
-        community_posts_query = self._make_get_community_with_id_posts_query(community=community)
+        # Posted to circles the creator put us in, once we confirmed the connection
+        return post.creator_id in relationships.confirmed_connection_users_ids and \
+               relationships.is_in_any_circle_with_id(audience.circles_ids)
 
-        community_posts_query.add(Q(pk=post.pk), Q.AND)
+    def _can_see_community_post(self, post, audience):
+        # Mirrors _make_get_community_with_id_posts_query
+        if post.creator_id == self.pk:
+            return True
 
         Post = get_post_model()
-        return Post.objects.filter(community_posts_query).exists()
+
+        if post.is_deleted or post.status != Post.STATUS_PUBLISHED:
+            return False
+
+        ModeratedObject = get_moderated_object_model()
+
+        if audience.has_moderation_status(ModeratedObject.STATUS_APPROVED) or audience.is_reported_by_user_with_id(
+                self.pk):
+            return False
+
+        communities_roles = self.get_communities_roles()
+
+        if communities_roles.is_banned_from_community_with_id(audience.community_id):
+            return False
+
+        Community = get_community_model()
+
+        if not communities_roles.is_member_of_community_with_id(
+                audience.community_id) and audience.community_type != Community.COMMUNITY_TYPE_PUBLIC:
+            return False
+
+        if communities_roles.is_staff_of_community_with_id(audience.community_id):
+            return True
+
+        if post.is_closed:
+            return False
+
+        if self.get_relationships().is_blocked_with_user_with_id(post.creator_id):
+            # Posts of staff members can be seen even if blocked with them
+            return post.creator.is_staff_of_community_with_id(audience.community_id)
+
+        return True
 
     def _make_get_reactions_for_post_query(self, post, max_id=None, emoji_id=None):
         reactions_query = Q(post_id=post.pk)
@@ -2973,7 +3345,7 @@ class User(AbstractUser):
         post_community = post.community
 
         if post_community:
-            if not self.is_staff_of_community_with_name(community_name=post_community.name):
+            if not self.is_staff_of_community_with_id(community_id=post_community.pk):
                 blocked_users_query = ~Q(Q(reactor__blocked_by_users__blocker_id=self.pk) | Q(
                     reactor__user_blocks__blocked_user_id=self.pk))
                 blocked_users_query_staff_members = Q(
@@ -3002,7 +3374,7 @@ class User(AbstractUser):
         post_comment_community = post_comment.post.community
 
         if post_comment_community:
-            if not self.is_staff_of_community_with_name(community_name=post_comment_community.name):
+            if not self.is_staff_of_community_with_id(community_id=post_comment_community.pk):
                 blocked_users_query = ~Q(Q(reactor__blocked_by_users__blocker_id=self.pk) | Q(
                     reactor__user_blocks__blocked_user_id=self.pk))
                 blocked_users_query_staff_members = Q(
@@ -3050,7 +3422,7 @@ class User(AbstractUser):
         post_community = post.community
 
         if post_community:
-            if not self.is_staff_of_community_with_name(community_name=post_community.name):
+            if not self.is_staff_of_community_with_id(community_id=post_community.pk):
                 # Dont retrieve posts of blocked users, except from staff members
                 blocked_users_query = ~Q(Q(commenter__blocked_by_users__blocker_id=self.pk) | Q(
                     commenter__user_blocks__blocked_user_id=self.pk))
@@ -3109,7 +3481,7 @@ class User(AbstractUser):
 
         community_posts_query.add(community_posts_visibility_query, Q.AND)
 
-        if not self.is_staff_of_community_with_name(community_name=community.name):
+        if not self.is_staff_of_community_with_id(community_id=community.pk):
             # Dont retrieve closed posts
             community_posts_query.add(Q(is_closed=False) | Q(creator_id=self.pk), Q.AND)
 
@@ -3140,6 +3512,14 @@ def create_auth_token(sender, instance=None, created=False, **kwargs):
         bootstrap_user_auth_token(instance)
 
 
+@receiver(post_delete, sender=Token, dispatch_uid='delete_cached_auth_token_user_id')
+def delete_auth_token_cached_user_id(sender, instance=None, **kwargs):
+    """
+    Tokens get deleted when reset and along with their user
+    """
+    delete_cached_token_user_id(key=instance.key)
+
+
 @receiver(post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid='bootstrap_user_circles')
 def bootstrap_circles(sender, instance=None, created=False, **kwargs):
     """"
@@ -3149,6 +3529,19 @@ def bootstrap_circles(sender, instance=None, created=False, **kwargs):
         bootstrap_user_circles(instance)
 
 
+@receiver(post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid='clear_user_stale_caches')
+def clear_stale_caches(sender, instance=None, created=False, **kwargs):
+    """
+    Make sure a new user does not inherit what got cached for a previous user with the same id
+    """
+    if created:
+        delete_timeline(instance.pk)
+        delete_cached_relationships(users_ids=[instance.pk])
+        delete_cached_communities_roles_of_new_user(user_id=instance.pk)
+        delete_cached_unread_notifications_count(user_id=instance.pk)
+        delete_cached_suspension_expiration(user_id=instance.pk)
+
+
 class UserProfile(models.Model):
     name = models.CharField(_('name'), max_length=settings.PROFILE_NAME_MAX_LENGTH, blank=False, null=False,
                             db_index=True,
@@ -3176,6 +3569,23 @@ class UserProfile(models.Model):
             ('id', 'user'),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user_profile = super(UserProfile, cls).from_db(db, field_names, values)
+        user_profile._indexed_name = user_profile.__dict__.get('name')
+        return user_profile
+
+    def save(self, *args, **kwargs):
+        name_needs_indexing = self.__dict__.get('name') != getattr(self, '_indexed_name', None)
+
+        saved = super(UserProfile, self).save(*args, **kwargs)
+
+        if name_needs_indexing:
+            UserSearchTerm.index_name_for_user_with_id(user_id=self.user_id, name=self.name)
+            self._indexed_name = self.name
+
+        return saved
+
     def __repr__(self):
         return '<UserProfile %s>' % self.user.username
 
@@ -3265,6 +3675,74 @@ class UserBlock(models.Model):
         return cls.objects.filter(Q(blocked_user_id=user_a_id, blocker_id=user_b_id) | Q(blocked_user_id=user_b_id,
                                                                                          blocker_id=user_a_id)).exists()
 
+    @classmethod
+    def get_users_ids_blocked_with_user_with_id(cls, user_id, users_ids):
+        """
+        Returns which of the given users ids blocked or are blocked by the user with the given id
+        """
+        blocks = cls.objects.filter(Q(blocker_id=user_id, blocked_user_id__in=users_ids) | Q(
+            blocked_user_id=user_id, blocker_id__in=users_ids)).values_list('blocker_id', 'blocked_user_id')
+
+        return {blocked_user_id if blocker_id == user_id else blocker_id for blocker_id, blocked_user_id in blocks}
+
+
+class UserSearchTerm(models.Model):
+    """
+    The terms users are searched by, made out of their username and name, see openbook_common.search
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(_('term'), max_length=settings.SEARCH_TERM_MAX_LENGTH, blank=False, null=False,
+                            db_index=True)
+
+    SOURCE_USERNAME = 'U'
+    SOURCE_NAME = 'N'
+    SOURCES = (
+        (SOURCE_USERNAME, 'Username'),
+        (SOURCE_NAME, 'Name'),
+    )
+    source = models.CharField(max_length=2, blank=False, null=False, choices=SOURCES)
+
+    class Meta:
+        unique_together = ('user', 'source', 'term',)
+
+    @classmethod
+    def index_username_for_user_with_id(cls, user_id, username):
+        cls._index_value_for_user_with_id(user_id=user_id, value=username, source=cls.SOURCE_USERNAME)
+
+    @classmethod
+    def index_name_for_user_with_id(cls, user_id, name):
+        cls._index_value_for_user_with_id(user_id=user_id, value=name, source=cls.SOURCE_NAME)
+
+    @classmethod
+    def _index_value_for_user_with_id(cls, user_id, value, source):
+        cls.objects.filter(user_id=user_id, source=source).delete()
+        cls.objects.bulk_create([cls(user_id=user_id, term=term, source=source) for term in make_search_terms(value)])
+
+    @classmethod
+    def make_search_users_query(cls, query):
+        """
+        Matches the users with a username or name starting with the query or with a word in them starting with it
+        """
+        users_ids = cls.objects.filter(term__startswith=normalise_search_query(query)).values('user_id')
+        return Q(id__in=users_ids)
+
+    @classmethod
+    def rank_users_for_query(cls, users, query):
+        """
+        Orders the users by how well they match the query, exact then prefix username matches go first
+        """
+        query = query.strip()
+
+        search_rank = Case(
+            When(username__iexact=query, then=Value(0)),
+            When(username__istartswith=query, then=Value(1)),
+            When(profile__name__istartswith=query, then=Value(2)),
+            default=Value(3),
+            output_field=IntegerField(),
+        )
+
+        return users.annotate(search_rank=search_rank).order_by('search_rank', 'username')
+
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid='bootstrap_notifications_settings')
 def create_user_notifications_settings(sender, instance=None, created=False, **kwargs):
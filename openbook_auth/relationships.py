@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.core.cache import cache
+
+# Bumped whenever the cached relationships change shape
+RELATIONSHIPS_CACHE_KEY = 'relationships-v2-%d'
+
+
+class UserRelationships:
+    """
+    A snapshot of the users someone follows, is connected with or is blocked with
+    and of the circles other users put them in
+    """
+
+    def __init__(self, followed_users_ids, connected_users_ids, confirmed_connection_users_ids,
+                 confirming_connection_users_ids, blocked_users_ids, blocking_users_ids, in_circles_ids):
+        self.followed_users_ids = frozenset(followed_users_ids)
+        self.connected_users_ids = frozenset(connected_users_ids)
+        # Connected users for which our side of the connection has circles
+        self.confirmed_connection_users_ids = frozenset(confirmed_connection_users_ids)
+        # Connected users for which their side of the connection has circles
+        self.confirming_connection_users_ids = frozenset(confirming_connection_users_ids)
+        self.blocked_users_ids = frozenset(blocked_users_ids)
+        self.blocking_users_ids = frozenset(blocking_users_ids)
+        # Circles of the connected users with their side of the connection in them
+        self.in_circles_ids = frozenset(in_circles_ids)
+
+    def is_following_user_with_id(self, user_id):
+        return user_id in self.followed_users_ids
+
+    def is_connected_with_user_with_id(self, user_id):
+        return user_id in self.connected_users_ids
+
+    def is_fully_connected_with_user_with_id(self, user_id):
+        return user_id in self.confirmed_connection_users_ids and user_id in self.confirming_connection_users_ids
+
+    def is_pending_confirm_connection_for_user_with_id(self, user_id):
+        return user_id in self.connected_users_ids and user_id not in self.confirmed_connection_users_ids
+
+    def has_blocked_user_with_id(self, user_id):
+        return user_id in self.blocked_users_ids
+
+    def is_blocked_with_user_with_id(self, user_id):
+        return user_id in self.blocked_users_ids or user_id in self.blocking_users_ids
+
+    def get_blocked_with_users_ids(self):
+        return self.blocked_users_ids | self.blocking_users_ids
+
+    def is_in_any_circle_with_id(self, circles_ids):
+        return not self.in_circles_ids.isdisjoint(circles_ids)
+
+    def to_dict(self):
+        return {
+            'followed_users_ids': self.followed_users_ids,
+            'connected_users_ids': self.connected_users_ids,
+            'confirmed_connection_users_ids': self.confirmed_connection_users_ids,
+            'confirming_connection_users_ids': self.confirming_connection_users_ids,
+            'blocked_users_ids': self.blocked_users_ids,
+            'blocking_users_ids': self.blocking_users_ids,
+            'in_circles_ids': self.in_circles_ids,
+        }
+
+
+def get_cached_relationships(user_id):
+    relationships = cache.get(RELATIONSHIPS_CACHE_KEY % user_id)
+
+    if relationships is None:
+        return None
+
+    return UserRelationships(**relationships)
+
+
+def cache_relationships(user_id, relationships):
+    cache.set(RELATIONSHIPS_CACHE_KEY % user_id, relationships.to_dict(), settings.USER_RELATIONSHIPS_TTL)
+
+
+def delete_cached_relationships(users_ids):
+    cache.delete_many([RELATIONSHIPS_CACHE_KEY % user_id for user_id in users_ids])
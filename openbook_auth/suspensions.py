@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+SUSPENSION_CACHE_KEY = 'suspension-%d'
+
+
+def get_cached_suspension_expiration(user_id):
+    """
+    Returns a dict with the expiration of the longest suspension of the user, None as expiration when not suspended.
+    Returns None when nothing is cached.
+    """
+    return cache.get(SUSPENSION_CACHE_KEY % user_id)
+
+
+def cache_suspension_expiration(user_id, expiration):
+    """
+    Suspensions are cached until they expire, not being suspended for USER_SUSPENSION_TTL
+    """
+    if expiration is None:
+        timeout = settings.USER_SUSPENSION_TTL
+    else:
+        timeout = int((expiration - timezone.now()).total_seconds()) + 1
+        if timeout <= 0:
+            return
+
+    cache.set(SUSPENSION_CACHE_KEY % user_id, {'expiration': expiration}, timeout)
+
+
+def delete_cached_suspension_expiration(user_id):
+    cache.delete(SUSPENSION_CACHE_KEY % user_id)
@@ -0,0 +1,71 @@
+from openbook_auth.models import User
+from openbook_common.tests.models import OpenbookAPITestCase
+from openbook_common.tests.helpers import make_user, make_community
+
+
+class CommunitiesRolesTests(OpenbookAPITestCase):
+    """
+    CommunitiesRoles
+    """
+
+    def test_roles_follow_memberships_changes(self):
+        """
+        should reflect joining, becoming staff, leaving and getting banned in the roles of an already loaded user
+        """
+        creator = make_user()
+        community = make_community(creator=creator)
+
+        user = make_user()
+        self.assertFalse(user.is_member_of_community_with_id(community.pk))
+
+        user.join_community_with_name(community_name=community.name)
+        self.assertTrue(user.is_member_of_community_with_id(community.pk))
+        self.assertFalse(user.is_staff_of_community_with_id(community.pk))
+
+        creator.add_moderator_with_username_to_community_with_name(username=user.username,
+                                                                   community_name=community.name)
+        self.assertTrue(user.is_moderator_of_community_with_id(community.pk))
+        self.assertTrue(user.is_staff_of_community_with_name(community_name=community.name))
+
+        creator.remove_moderator_with_username_from_community_with_name(username=user.username,
+                                                                        community_name=community.name)
+        self.assertFalse(user.is_moderator_of_community_with_id(community.pk))
+
+        creator.ban_user_with_username_from_community_with_name(username=user.username,
+                                                                community_name=community.name)
+        self.assertFalse(user.is_member_of_community_with_id(community.pk))
+        self.assertTrue(user.is_banned_from_community_with_id(community.pk))
+
+        creator.unban_user_with_username_from_community_with_name(username=user.username,
+                                                                  community_name=community.name)
+        self.assertFalse(user.is_banned_from_community_with_name(community_name=community.name))
+
+    def test_roles_checks_are_not_a_query_each(self):
+        """
+        should not query the database again to check the roles in communities once they were loaded
+        """
+        creator = make_user()
+        communities = [make_community(creator=creator) for i in range(0, 3)]
+
+        user = User.objects.get(pk=creator.pk)
+        user.get_communities_roles()
+
+        with self.assertNumQueries(0):
+            for community in communities:
+                self.assertTrue(user.is_administrator_of_community_with_id(community.pk))
+                self.assertTrue(user.is_staff_of_community_with_name(community_name=community.name))
+                self.assertFalse(user.is_banned_from_community_with_name(community_name=community.name))
+
+    def test_renamed_community_roles(self):
+        """
+        should look up the roles in a community by its new name once renamed
+        """
+        creator = make_user()
+        community = make_community(creator=creator)
+        old_name = community.name
+
+        community.name = old_name + 'r'
+        community.save()
+
+        self.assertTrue(creator.is_administrator_of_community_with_name(community_name=community.name))
+        self.assertFalse(creator.is_administrator_of_community_with_name(community_name=old_name))
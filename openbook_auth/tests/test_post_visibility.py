@@ -0,0 +1,162 @@
+from django.db.models import Q
+from faker import Faker
+
+from openbook_auth.models import User
+from openbook_common.tests.models import OpenbookAPITestCase
+from openbook_common.tests.helpers import make_user, make_fake_post_text, make_community, make_fake_circle_name, \
+    make_moderation_category, make_global_moderator
+from openbook_communities.models import Community
+from openbook_moderation.models import ModeratedObject
+from openbook_posts.models import Post
+
+fake = Faker()
+
+
+class PostVisibilityTests(OpenbookAPITestCase):
+    """
+    PostVisibility
+    """
+
+    fixtures = [
+        'openbook_circles/fixtures/circles.json'
+    ]
+
+    def test_circles_posts_visibility_matches_posts_query(self):
+        """
+        should decide whether users can see circles posts the same way the posts query does
+        """
+        creator = make_user()
+        circle = creator.create_circle(name=make_fake_circle_name(), color=fake.hex_color())
+        other_circle = creator.create_circle(name=make_fake_circle_name(), color=fake.hex_color())
+
+        confirmed_connection = make_user()
+        creator.connect_with_user_with_id(confirmed_connection.pk, circles_ids=[circle.pk])
+        confirmed_connection.confirm_connection_with_user_with_id(creator.pk)
+
+        pending_connection = make_user()
+        creator.connect_with_user_with_id(pending_connection.pk, circles_ids=[circle.pk])
+
+        other_circle_connection = make_user()
+        creator.connect_with_user_with_id(other_circle_connection.pk, circles_ids=[other_circle.pk])
+        other_circle_connection.confirm_connection_with_user_with_id(creator.pk)
+
+        follower = make_user()
+        follower.follow_user_with_id(creator.pk)
+
+        blocked_user = make_user()
+        creator.block_user_with_id(blocked_user.pk)
+
+        blocking_user = make_user()
+        blocking_user.block_user_with_id(creator.pk)
+
+        reporter = make_user()
+        stranger = make_user()
+
+        public_post = creator.create_public_post(text=make_fake_post_text())
+        encircled_post = creator.create_encircled_post(circles_ids=[circle.pk], text=make_fake_post_text())
+        other_circle_post = creator.create_encircled_post(circles_ids=[other_circle.pk], text=make_fake_post_text())
+        draft_post = creator.create_public_post(text=make_fake_post_text(), is_draft=True)
+        deleted_post = creator.create_public_post(text=make_fake_post_text())
+        deleted_post.soft_delete()
+        deleted_post.save()
+
+        reported_post = creator.create_public_post(text=make_fake_post_text())
+        reporter.report_post(post=reported_post, category_id=make_moderation_category().pk)
+
+        viewers = [creator, confirmed_connection, pending_connection, other_circle_connection, follower,
+                   blocked_user, blocking_user, reporter, stranger]
+        posts = [public_post, encircled_post, other_circle_post, draft_post, deleted_post, reported_post]
+
+        self._assert_visibility_matches_posts_queries(viewers=viewers, posts=posts)
+
+    def test_community_posts_visibility_matches_community_posts_query(self):
+        """
+        should decide whether users can see community posts the same way the community posts query does
+        """
+        global_moderator = make_global_moderator()
+
+        community_creator = make_user()
+        public_community = make_community(creator=community_creator, type=Community.COMMUNITY_TYPE_PUBLIC)
+        private_community = make_community(creator=community_creator, type=Community.COMMUNITY_TYPE_PRIVATE)
+
+        member = make_user()
+        member.join_community_with_name(community_name=public_community.name)
+        community_creator.invite_user_with_username_to_community_with_name(username=member.username,
+                                                                         community_name=private_community.name)
+        member.join_community_with_name(community_name=private_community.name)
+
+        moderator = make_user()
+        moderator.join_community_with_name(community_name=public_community.name)
+        community_creator.add_moderator_with_username_to_community_with_name(username=moderator.username,
+                                                                           community_name=public_community.name)
+
+        banned_user = make_user()
+        banned_user.join_community_with_name(community_name=public_community.name)
+        community_creator.ban_user_with_username_from_community_with_name(username=banned_user.username,
+                                                                        community_name=public_community.name)
+
+        poster = make_user()
+        poster.join_community_with_name(community_name=public_community.name)
+
+        blocking_member = make_user()
+        blocking_member.join_community_with_name(community_name=public_community.name)
+        blocking_member.block_user_with_id(poster.pk)
+        blocking_member.block_user_with_id(moderator.pk)
+
+        reporter = make_user()
+        stranger = make_user()
+
+        post = poster.create_community_post(community_name=public_community.name, text=make_fake_post_text())
+        moderator_post = moderator.create_community_post(community_name=public_community.name,
+                                                         text=make_fake_post_text())
+        private_community_post = community_creator.create_community_post(community_name=private_community.name,
+                                                                         text=make_fake_post_text())
+
+        closed_post = poster.create_community_post(community_name=public_community.name, text=make_fake_post_text())
+        community_creator.close_post(post=closed_post)
+
+        draft_post = poster.create_community_post(community_name=public_community.name, text=make_fake_post_text(),
+                                                  is_draft=True)
+
+        reported_post = poster.create_community_post(community_name=public_community.name,
+                                                     text=make_fake_post_text())
+        reporter.report_post(post=reported_post, category_id=make_moderation_category().pk)
+
+        approved_post = poster.create_community_post(community_name=public_community.name,
+                                                     text=make_fake_post_text())
+        moderation_category = make_moderation_category()
+        reporter.report_post(post=approved_post, category_id=moderation_category.pk)
+        moderated_object = ModeratedObject.get_or_create_moderated_object_for_post(post=approved_post,
+                                                                                   category_id=moderation_category.pk)
+        global_moderator.approve_moderated_object(moderated_object=moderated_object)
+
+        viewers = [community_creator, member, moderator, banned_user, poster, blocking_member, reporter, stranger]
+        posts = [post, moderator_post, private_community_post, closed_post, draft_post, reported_post, approved_post]
+
+        self._assert_visibility_matches_posts_queries(viewers=viewers, posts=posts)
+
+    def _assert_visibility_matches_posts_queries(self, viewers, posts):
+        for post in posts:
+            # The same post instance is checked for every viewer, as done for the users mentioned in a post
+            post = Post.objects.get(pk=post.pk)
+
+            for viewer in viewers:
+                viewer = User.objects.get(pk=viewer.pk)
+
+                self.assertEqual(viewer.can_see_post(post=post), self._can_see_post_with_query(viewer=viewer, post=post),
+                                 'Visibility of post %d for user %s differs' % (post.pk, viewer.username))
+
+    def _can_see_post_with_query(self, viewer, post):
+        if post.community_id:
+            if post.creator_id == viewer.pk:
+                return True
+
+            community_posts_query = viewer._make_get_community_with_id_posts_query(community=post.community)
+            community_posts_query.add(Q(pk=post.pk), Q.AND)
+            return Post.objects.filter(community_posts_query).exists()
+
+        if post.creator_id == viewer.pk and not post.is_deleted:
+            return True
+
+        post_query = viewer._make_get_post_with_id_query_for_user(post.creator, post_id=post.pk)
+        return Post.objects.filter(post_query).exists()
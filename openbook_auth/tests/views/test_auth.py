@@ -519,6 +519,33 @@ class VerifyResetPasswordAPITests(OpenbookAPITestCase):
         self.assertNotEqual(original_auth_token_key, user.auth_token.key)
         self.assertFalse(Token.objects.filter(key=original_auth_token_key).exists())
 
+    def test_cannot_authenticate_with_reset_auth_token(self):
+        """
+        should not be able to authenticate with the auth token from before updating the password and return 401
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+        authenticated_user_url = reverse('authenticated-user')
+
+        response = self.client.get(authenticated_user_url, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        password_reset_token = user.request_password_reset()
+        request_data = {
+            'new_password': 'testing12345',
+            'token': password_reset_token,
+        }
+
+        response = self.client.post(self._get_url(), request_data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(authenticated_user_url, **headers)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        user.refresh_from_db()
+        response = self.client.get(authenticated_user_url, **make_authentication_headers_for_user(user))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def _get_url(self):
         return reverse('verify-reset-password')
 
@@ -2,6 +2,7 @@ from unittest import mock
 
 from urllib.parse import urlsplit
 from django.urls import reverse
+from django.utils import timezone
 from faker import Faker
 from rest_framework import status
 from openbook_common.tests.models import OpenbookAPITestCase
@@ -12,7 +13,8 @@ import json
 
 from openbook_auth.views.authenticated_user.views import AuthenticatedUserSettings
 from openbook_common.tests.helpers import make_user, make_authentication_headers_for_user, make_user_bio, \
-    make_user_location, make_user_avatar, make_user_cover, make_random_language
+    make_user_location, make_user_avatar, make_user_cover, make_random_language, make_moderation_penalty, \
+    make_fake_post_text, make_fake_post_comment_text, make_reactions_emoji_group, make_emoji
 
 fake = Faker()
 
@@ -140,6 +142,33 @@ class AuthenticatedUserAPITests(OpenbookAPITestCase):
 
         self.assertEqual(user.profile.name, new_name)
 
+    def test_cannot_update_user_while_suspended(self):
+        """
+        should not be able to update the authenticated user once suspended and until the suspension is lifted
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        url = self._get_url()
+
+        response = self.client.patch(url, {'name': fake.name()}, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        moderation_penalty = make_moderation_penalty(user=user)
+        moderation_penalty.expiration = timezone.now() + timezone.timedelta(days=1)
+        moderation_penalty.save()
+
+        response = self.client.patch(url, {'name': fake.name()}, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        moderation_penalty.delete()
+
+        response = self.client.patch(url, {'name': fake.name()}, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_can_update_user_bio(self):
         """
         should be able to update the authenticated user bio and return 200
@@ -553,6 +582,48 @@ class AuthenticatedUserDeleteTests(OpenbookAPITestCase):
 
         self.assertTrue(User.objects.filter(pk=user.pk).exists())
 
+    def test_deleting_user_updates_counters_of_posts_and_comments_of_others(self):
+        """
+        should take the reactions, comments and replies of the deleted user out of the counters of the posts and
+        comments of others
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        user_password = fake.password()
+        user.set_password(user_password)
+        user.save()
+
+        post_creator = make_user()
+        post = post_creator.create_public_post(text=make_fake_post_text())
+        post_comment = post_creator.comment_post_with_id(post_id=post.pk, text=make_fake_post_comment_text())
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        post_creator.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+        user.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+        user.react_to_post_comment_with_id(post_comment_id=post_comment.pk, emoji_id=emoji.pk)
+        user.comment_post_with_id(post_id=post.pk, text=make_fake_post_comment_text())
+        user.reply_to_comment_with_id_for_post_with_uuid(post_comment_id=post_comment.pk, post_uuid=post.uuid,
+                                                         text=make_fake_post_comment_text())
+
+        url = self._get_url()
+
+        response = self.client.post(url, {'password': user_password}, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        post.refresh_from_db()
+        post_comment.refresh_from_db()
+
+        self.assertEqual(post.reactions_count, 1)
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(post_comment.reactions_count, 0)
+        self.assertEqual(post_comment.replies_count, 0)
+        self.assertEqual(post.emoji_counts.get(emoji_id=emoji.pk).count, 1)
+        self.assertEqual(post_comment.emoji_counts.get(emoji_id=emoji.pk).count, 0)
+
     def _get_url(self):
         return reverse('delete-authenticated-user')
 
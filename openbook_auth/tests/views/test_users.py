@@ -55,6 +55,65 @@ class SearchUsersAPITests(OpenbookAPITestCase):
         for lil_user in lil_users:
             self.assertIn(lil_user.username, response_usernames)
 
+    def test_can_query_users_by_a_word_of_their_name(self):
+        user_to_query = make_user(name='Grace Okunahopper')
+
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        url = self._get_url()
+        response = self.client.get(url, {
+            'query': 'okunahop'
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        parsed_response = json.loads(response.content)
+
+        self.assertEqual(len(parsed_response), 1)
+        self.assertEqual(parsed_response[0]['username'], user_to_query.username)
+
+    def test_cant_query_users_by_the_middle_of_a_word(self):
+        make_user(username='graceokunahopper', name='Grace Okunahopper')
+
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        url = self._get_url()
+        response = self.client.get(url, {
+            'query': 'nahop'
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        parsed_response = json.loads(response.content)
+
+        self.assertEqual(len(parsed_response), 0)
+
+    def test_queried_users_are_ranked_by_exact_then_prefix_username_match(self):
+        name_match_user = make_user(name='Okunawayne Flint')
+
+        prefix_match_user = make_user(username='okunawayne_junior')
+
+        exact_match_user = make_user(username='okunawayne')
+
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        url = self._get_url()
+        response = self.client.get(url, {
+            'query': 'OkunaWayne'
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        parsed_response = json.loads(response.content)
+
+        response_usernames = [user['username'] for user in parsed_response]
+
+        self.assertEqual(response_usernames,
+                         [exact_match_user.username, prefix_match_user.username, name_match_user.username])
+
     def test_cant_query_blocked_user(self):
         user = make_user()
 
@@ -140,6 +199,10 @@ class GetUserAPITests(OpenbookAPITestCase):
     UserAPI
     """
 
+    fixtures = [
+        'openbook_circles/fixtures/circles.json'
+    ]
+
     def test_can_retrieve_user(self):
         """
         should be able to retrieve a user when authenticated and return 200
@@ -159,6 +222,37 @@ class GetUserAPITests(OpenbookAPITestCase):
         response_username = parsed_response['username']
         self.assertEqual(response_username, user.username)
 
+    def test_retrieves_relationships_changed_after_previous_retrieval(self):
+        """
+        should retrieve the follow and connection with a user made after having retrieved the user
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        user_to_retrieve = make_user()
+
+        url = self._get_url(user_to_retrieve)
+
+        response = self.client.get(url, **headers)
+
+        parsed_response = json.loads(response.content)
+
+        self.assertFalse(parsed_response['is_following'])
+        self.assertFalse(parsed_response['is_connected'])
+
+        user.connect_with_user_with_id(user_id=user_to_retrieve.pk)
+        user_to_retrieve.confirm_connection_with_user_with_id(user_id=user.pk)
+
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        parsed_response = json.loads(response.content)
+
+        self.assertTrue(parsed_response['is_following'])
+        self.assertTrue(parsed_response['is_connected'])
+        self.assertTrue(parsed_response['is_fully_connected'])
+
     def test_cant_retrieve_blocked_user(self):
         """
         should not be able to retrieve a blocked user and return 403
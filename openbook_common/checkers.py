@@ -1,7 +1,7 @@
 from rest_framework.exceptions import PermissionDenied
 from django.utils.translation import ugettext_lazy as _
 
-from openbook_common.helpers import extract_urls_from_string
+from openbook_common.link_extraction import extract_urls_from_string
 from openbook_common.utils.model_loaders import get_proxy_whitelist_domain_model
 
 
@@ -2,38 +2,24 @@ import os
 import tempfile
 
 from django.core.files import File
-from langdetect import DetectorFactory
-from langdetect.lang_detect_exception import LangDetectException
 from django.conf import settings
-import urllib
 from urllib.parse import urlparse
+import requests
 from bs4 import BeautifulSoup
-from urlextract import URLExtract
-from webpreview import web_preview
+from webpreview import web_preview, URLNotFound, URLUnreachable
 from django.utils.translation import ugettext_lazy as _
 
+from openbook_common.language_detection import language_detector
 from openbook_common.utils.model_loaders import get_language_model
 from openbook_translation import translation_strategy
 
-# seed the language detector
-DetectorFactory.seed = 0
-
 
 def get_detected_language_code(text):
-    try:
-        detected_lang = translation_strategy.get_detected_language_code(text)
-    except LangDetectException:
-        detected_lang = None
-    return detected_lang
+    return language_detector.get_detected_language_code(text)
 
 
 def get_language_for_text(text):
-    language_code = get_detected_language_code(text)
-    Language = get_language_model()
-    if language_code is not None and Language.objects.filter(code=language_code).exists():
-        return Language.objects.get(code=language_code)
-
-    return None
+    return language_detector.get_language_for_text(text)
 
 
 def get_supported_translation_language(language_code):
@@ -43,23 +29,6 @@ def get_supported_translation_language(language_code):
     return Language.objects.get(code=supported_translation_code)
 
 
-def extract_urls_from_string(text):
-    """
-    Returns all the raw extracted urls as a list
-    If a URL has a scheme, it ensures that it is http/s
-    URLs like www. are sanitised in the normalise_url
-    """
-    text = text.lower()
-    extractor = URLExtract(cache_dir=tempfile.gettempdir())
-    results = [url for url in extractor.gen_urls(text)]
-    for url in results:
-        scheme = urlparse(url).scheme
-        if scheme and scheme != 'https' and scheme != 'http':
-            results.remove(url)
-
-    return results
-
-
 def make_proxy_image_url(image_url):
     proxy_image_url = settings.PROXY_URL + image_url
 
@@ -83,23 +52,35 @@ def get_domain_with_protocol_from_url(url):
     return result.lower()
 
 
-def get_favicon_url_from_url(url):
+def get_url_page_content(url):
     url_scheme = urlparse(url).scheme
 
     if url_scheme != 'http' and url_scheme != 'https':
-        raise PermissionError(_('You can only retrieve favicon urls from protocol http and https.'))
+        raise PermissionError(_('You can only retrieve pages from protocol http and https.'))
+
+    try:
+        response = requests.get(url, timeout=settings.URL_PREVIEW_TIMEOUT)
+    except requests.exceptions.RequestException:
+        raise URLUnreachable('The URL is unreachable.')
 
-    # Doing validation up here
-    page = urllib.request.urlopen(url)  # nosec
+    if response.status_code == 404:
+        raise URLNotFound('The web page does not exist.')
 
-    if page.getcode() != 200:
-        return None
+    if not response.ok:
+        raise URLUnreachable('The URL is unreachable.')
 
-    soup = BeautifulSoup(page, features='html.parser')
+    return response.text
+
+
+def get_favicon_url_from_page_content(url, page_content):
+    soup = BeautifulSoup(page_content, features='html.parser')
     favicon_link = soup.find("link", rel="icon")
     if not favicon_link:
         favicon_link = soup.find("link", rel="shortcut icon")
 
+    if not favicon_link or not favicon_link.get('href'):
+        return None
+
     if favicon_link['href'][0] == '/':
         favicon_link = get_domain_with_protocol_from_url(url) + favicon_link['href']
     else:
@@ -116,8 +97,11 @@ def normalise_url(url):
 
 
 def get_url_metadata(preview_link):
-    title, description, image_url = web_preview(preview_link, parser='html.parser')
-    favicon_url = get_favicon_url_from_url(preview_link)
+    # The page gets fetched once for both the preview and the favicon
+    page_content = get_url_page_content(preview_link)
+    title, description, image_url = web_preview(preview_link, timeout=settings.URL_PREVIEW_TIMEOUT,
+                                                content=page_content, parser='html.parser')
+    favicon_url = get_favicon_url_from_page_content(url=preview_link, page_content=page_content)
     domain_url = get_url_domain(preview_link)
     if image_url is not None:
         image_url = make_proxy_image_url(image_url)
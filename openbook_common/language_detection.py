@@ -0,0 +1,116 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from langdetect import DetectorFactory
+from langdetect.lang_detect_exception import LangDetectException
+
+from openbook_common.utils.model_loaders import get_language_model
+from openbook_translation import translation_strategy
+
+# seed the language detector
+DetectorFactory.seed = 0
+
+
+class LanguageDetector:
+    """
+    Detects the language of texts through the translation strategy.
+
+    The detected language codes are kept in an LRU cache keyed by the hash of the text and the Language
+    rows are loaded once into a code to language map, so detecting the language of an already seen text
+    and turning its code into a Language take no work at all.
+    """
+
+    def __init__(self, cache_size):
+        self.cache_size = cache_size
+        self._languages_codes = OrderedDict()
+        self._languages = None
+        self._lock = threading.Lock()
+
+    def get_detected_language_code(self, text):
+        text_hash = self._get_text_hash(text)
+
+        with self._lock:
+            if text_hash in self._languages_codes:
+                self._languages_codes.move_to_end(text_hash)
+                return self._languages_codes[text_hash]
+
+        language_code = detect_language_code(text)
+        self._cache_language_code(text_hash=text_hash, language_code=language_code)
+
+        return language_code
+
+    def get_detected_languages_codes(self, texts, pool=None):
+        """
+        Returns the detected language code of every text, in order.
+        When given a multiprocessing pool the texts which are not cached get detected within it.
+        """
+        texts_hashes = [self._get_text_hash(text) for text in texts]
+        languages_codes = {}
+
+        with self._lock:
+            for text_hash in texts_hashes:
+                if text_hash in self._languages_codes:
+                    languages_codes[text_hash] = self._languages_codes[text_hash]
+
+        undetected_texts = OrderedDict()
+        for text_hash, text in zip(texts_hashes, texts):
+            if text_hash not in languages_codes:
+                undetected_texts[text_hash] = text
+
+        if undetected_texts:
+            if pool:
+                detected_languages_codes = pool.map(detect_language_code, list(undetected_texts.values()))
+            else:
+                detected_languages_codes = [detect_language_code(text) for text in undetected_texts.values()]
+
+            for text_hash, language_code in zip(undetected_texts.keys(), detected_languages_codes):
+                languages_codes[text_hash] = language_code
+                self._cache_language_code(text_hash=text_hash, language_code=language_code)
+
+        return [languages_codes[text_hash] for text_hash in texts_hashes]
+
+    def get_language_for_text(self, text):
+        return self.get_language_with_code(self.get_detected_language_code(text))
+
+    def get_languages_for_texts(self, texts, pool=None):
+        return [self.get_language_with_code(language_code) for language_code in
+                self.get_detected_languages_codes(texts=texts, pool=pool)]
+
+    def get_language_with_code(self, language_code):
+        if language_code is None:
+            return None
+
+        languages = self._languages
+
+        if languages is None:
+            Language = get_language_model()
+            languages = {language.code: language for language in Language.objects.all()}
+            self._languages = languages
+
+        return languages.get(language_code)
+
+    def clear_languages(self):
+        self._languages = None
+
+    def _cache_language_code(self, text_hash, language_code):
+        with self._lock:
+            self._languages_codes[text_hash] = language_code
+            self._languages_codes.move_to_end(text_hash)
+
+            while len(self._languages_codes) > self.cache_size:
+                self._languages_codes.popitem(last=False)
+
+    def _get_text_hash(self, text):
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def detect_language_code(text):
+    try:
+        return translation_strategy.get_detected_language_code(text)
+    except LangDetectException:
+        return None
+
+
+language_detector = LanguageDetector(cache_size=settings.LANGUAGE_DETECTION_CACHE_SIZE)
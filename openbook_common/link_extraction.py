@@ -0,0 +1,48 @@
+import tempfile
+import threading
+from urllib.parse import urlparse
+
+from urlextract import URLExtract
+
+_url_extractor = None
+_url_extractor_lock = threading.Lock()
+
+
+def extract_urls_from_string(text):
+    """
+    Returns all the raw extracted urls as a list
+    If a URL has a scheme, it ensures that it is http/s
+    URLs like www. are sanitised in the normalise_url
+    """
+    if not text_can_contain_urls(text):
+        return []
+
+    text = text.lower()
+
+    return [url for url in get_url_extractor().gen_urls(text) if _has_http_or_no_scheme(url)]
+
+
+def text_can_contain_urls(text):
+    """
+    The urls we extract always have a domain with a top level domain, texts without a dot can't contain them
+    """
+    return bool(text) and ('.' in text or '://' in text)
+
+
+def get_url_extractor():
+    """
+    Returns the process wide url extractor, loading its list of top level domains takes a while
+    """
+    global _url_extractor
+
+    if _url_extractor is None:
+        with _url_extractor_lock:
+            if _url_extractor is None:
+                _url_extractor = URLExtract(cache_dir=tempfile.gettempdir())
+
+    return _url_extractor
+
+
+def _has_http_or_no_scheme(url):
+    scheme = urlparse(url).scheme
+    return not scheme or scheme == 'https' or scheme == 'http'
@@ -3,12 +3,15 @@
 from django.conf import settings
 from django.db import models
 from django.db.models import QuerySet, Q, Count
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 # Create your views here.
 from openbook.settings import COLOR_ATTR_MAX_LENGTH
 from openbook_common.helpers import get_url_domain
+from openbook_common.language_detection import language_detector
 from openbook_common.validators import hex_color_validator
 
 
@@ -127,3 +130,9 @@ class ProxyWhitelistDomain(models.Model):
             length = len(domain_parts)
 
         return is_matched
+
+
+@receiver(post_save, sender=Language, dispatch_uid='clear_saved_language')
+@receiver(post_delete, sender=Language, dispatch_uid='clear_deleted_language')
+def clear_languages(sender, instance=None, **kwargs):
+    language_detector.clear_languages()
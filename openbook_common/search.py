@@ -0,0 +1,27 @@
+import re
+
+from django.conf import settings
+
+SEARCH_TERM_WORD_REGEX = re.compile(r'[^\s_.\-]+')
+
+
+def make_search_terms(value):
+    """
+    Returns the lowercased value and every tail of it which starts at a word.
+    Looking terms up by prefix then matches values starting with the query and values with a word starting with it,
+    e.g. "john smith" and "smith" for "John Smith", without scanning the searched table.
+    """
+    if not value:
+        return set()
+
+    value = value.lower()
+    terms = {value[:settings.SEARCH_TERM_MAX_LENGTH]}
+
+    for word_match in SEARCH_TERM_WORD_REGEX.finditer(value):
+        terms.add(value[word_match.start():][:settings.SEARCH_TERM_MAX_LENGTH])
+
+    return terms
+
+
+def normalise_search_query(query):
+    return query.strip().lower()[:settings.SEARCH_TERM_MAX_LENGTH]
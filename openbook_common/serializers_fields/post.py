@@ -17,8 +17,13 @@ class ReactionField(Field):
         request_user = request.user
 
         serialized_reaction = None
+        posts_page_context = self.context.get('posts_page_context')
 
-        if not request_user.is_anonymous:
+        if posts_page_context:
+            reaction = posts_page_context.get_reaction_for_post(post)
+            if reaction:
+                serialized_reaction = self.reaction_serializer(reaction, context={'request': request}).data
+        elif not request_user.is_anonymous:
             try:
                 reaction = request_user.get_reaction_for_post_with_id(post.pk)
                 serialized_reaction = self.reaction_serializer(reaction, context={'request': request}).data
@@ -39,14 +44,18 @@ class CommentsCountField(Field):
         request_user = request.user
 
         comments_count = None
+        posts_page_context = self.context.get('posts_page_context')
 
-        if request_user.is_anonymous:
+        if posts_page_context:
+            comments_count = posts_page_context.get_comments_count_for_post(post)
+        elif request_user.is_anonymous:
             comments_count = post.count_comments()
         else:
             comments_count = request_user.get_comments_count_for_post(post=post)
 
         return comments_count
 
+
 class PostReactionsEmojiCountField(Field):
     def __init__(self, emoji_count_serializer=None, **kwargs):
         kwargs['source'] = '*'
@@ -59,8 +68,11 @@ class PostReactionsEmojiCountField(Field):
         request_user = request.user
 
         reaction_emoji_count = []
+        posts_page_context = self.context.get('posts_page_context')
 
-        if request_user.is_anonymous:
+        if posts_page_context:
+            reaction_emoji_count = posts_page_context.get_emoji_counts_for_post(post)
+        elif request_user.is_anonymous:
             if post.public_reactions:
                 Post = get_post_model()
                 reaction_emoji_count = Post.get_emoji_counts_for_post_with_id(post.pk)
@@ -84,9 +96,13 @@ class CirclesField(Field):
         request = self.context.get('request')
         request_user = request.user
         circles = []
+        posts_page_context = self.context.get('posts_page_context')
 
         if post.creator_id == request_user.pk:
-            circles = post.circles
+            if posts_page_context:
+                circles = posts_page_context.get_circles_for_post(post)
+            else:
+                circles = post.circles
 
         return self.circle_serializer(circles, many=True, context={"request": request, 'post': post}).data
 
@@ -108,8 +124,17 @@ class PostCreatorField(Field):
         post_creator_serializer = self.post_creator_serializer(post_creator, context={"request": request}).data
 
         if post_community:
-            try:
-                post_creator_membership = post_community.memberships.get(user_id=post_creator.pk)
+            posts_page_context = self.context.get('posts_page_context')
+
+            if posts_page_context:
+                post_creator_membership = posts_page_context.get_creator_membership_for_post(post)
+            else:
+                try:
+                    post_creator_membership = post_community.memberships.get(user_id=post_creator.pk)
+                except CommunityMembership.DoesNotExist:
+                    post_creator_membership = None
+
+            if post_creator_membership:
                 post_creator_serializer['communities_memberships'] = [
                     self.community_membership_serializer(
                         post_creator_membership,
@@ -117,8 +142,6 @@ class PostCreatorField(Field):
                         context={
                             "request": request}).data
                 ]
-            except CommunityMembership.DoesNotExist:
-                pass
 
         return post_creator_serializer
 
@@ -134,8 +157,11 @@ class PostIsMutedField(Field):
         request_user = request.user
 
         is_muted = False
+        posts_page_context = self.context.get('posts_page_context')
 
-        if not request_user.is_anonymous:
+        if posts_page_context:
+            is_muted = posts_page_context.is_post_muted(post)
+        elif not request_user.is_anonymous:
             is_muted = request_user.has_muted_post_with_id(post_id=post.pk)
 
         return is_muted
@@ -110,6 +110,12 @@ class PostCommentIsMutedField(Field):
         is_muted = False
 
         if not request_user.is_anonymous:
-            is_muted = request_user.has_muted_post_comment_with_id(post_comment_id=post_comment.pk)
+            # Serializers of many post comments can pass the ones muted by the request user along
+            muted_post_comments_ids = self.context.get('muted_post_comments_ids')
+
+            if muted_post_comments_ids is not None:
+                is_muted = post_comment.pk in muted_post_comments_ids
+            else:
+                is_muted = request_user.has_muted_post_comment_with_id(post_comment_id=post_comment.pk)
 
         return is_muted
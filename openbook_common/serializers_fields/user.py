@@ -15,7 +15,7 @@ class IsFollowingField(Field):
         if not request.user.is_anonymous:
             if request.user.pk == value.pk:
                 return False
-            return request.user.is_following_user_with_id(value.pk)
+            return request.user.get_relationships().is_following_user_with_id(value.pk)
 
         return False
 
@@ -64,7 +64,7 @@ class IsConnectedField(Field):
         if not request.user.is_anonymous:
             if request.user.pk == value.pk:
                 return False
-            return request.user.is_connected_with_user_with_id(value.pk)
+            return request.user.get_relationships().is_connected_with_user_with_id(value.pk)
 
         return False
 
@@ -81,7 +81,7 @@ class IsBlockedField(Field):
         if not request.user.is_anonymous:
             if request.user.pk == value.pk:
                 return False
-            return request.user.has_blocked_user_with_id(value.pk)
+            return request.user.get_relationships().has_blocked_user_with_id(value.pk)
 
         return False
 
@@ -98,7 +98,7 @@ class IsFullyConnectedField(Field):
         if not request.user.is_anonymous:
             if request.user.pk == value.pk:
                 return False
-            return request.user.is_fully_connected_with_user_with_id(value.pk)
+            return request.user.get_relationships().is_fully_connected_with_user_with_id(value.pk)
 
         return False
 
@@ -115,7 +115,7 @@ class IsPendingConnectionConfirmation(Field):
         if not request.user.is_anonymous:
             if request.user.pk == value.pk:
                 return False
-            return request.user.is_pending_confirm_connection_for_user_with_id(value.pk)
+            return request.user.get_relationships().is_pending_confirm_connection_for_user_with_id(value.pk)
 
         return False
 
@@ -1,7 +1,10 @@
 import os
 import shutil
 import tempfile
+import threading
 import uuid
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from unittest import mock
 
 from PIL import Image
 from faker import Faker
@@ -257,6 +260,59 @@ def make_proxy_whitelisted_domain(domain):
     return mixer.blend(ProxyWhitelistDomain, domain=domain)
 
 
+def serve_test_website(test_case):
+    """
+    Proxies the http requests made during the test to a local stand-in for the websites out there.
+    Every path of every domain serves the test website page, except the not-found and server-error paths.
+    Returns the stand-in server, which gets shut down at the end of the test.
+    """
+    server = HTTPServer(('127.0.0.1', 0), WebsiteStandInRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    environment_patcher = mock.patch.dict(os.environ, {
+        'http_proxy': 'http://127.0.0.1:%d' % server.server_port,
+        'no_proxy': ''
+    })
+    environment_patcher.start()
+
+    test_case.addCleanup(environment_patcher.stop)
+    test_case.addCleanup(server.server_close)
+    test_case.addCleanup(server.shutdown)
+
+    return server
+
+
+class WebsiteStandInRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if 'not-found' in self.path:
+            self.send_error(404)
+            return
+
+        if 'server-error' in self.path:
+            self.send_error(500)
+            return
+
+        with open('openbook_common/tests/files/test_website.html', 'rb') as page:
+            content = page.read()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_test_website_url(path=None):
+    """
+    Returns an url of the test website, unique unless given a path so that no preview of it is cached yet
+    """
+    return 'http://www.okuna.io/%s' % (path or uuid.uuid4().hex)
+
+
 def get_test_usernames():
     return [
         'j_oel',
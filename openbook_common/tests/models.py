@@ -2,11 +2,19 @@ from unittest.mock import patch
 
 from rest_framework.test import APITestCase
 
+from openbook_common.language_detection import language_detector
+
 
 class OpenbookAPITestCase(APITestCase):
     def setUp(self):
         self.patcher = patch('openbook_notifications.helpers._send_notification_to_user')
         self.mock_foo = self.patcher.start()
+        # Tests run within a transaction which never gets committed
+        self.on_commit_patcher = patch('django.db.transaction.on_commit', side_effect=lambda func: func())
+        self.on_commit_patcher.start()
+        # Languages from fixtures of previous tests got rolled back
+        language_detector.clear_languages()
 
     def tearDown(self):
         self.patcher.stop()
+        self.on_commit_patcher.stop()
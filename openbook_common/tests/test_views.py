@@ -5,9 +5,12 @@ from openbook_common.tests.models import OpenbookAPITestCase
 
 import logging
 import json
+import uuid
 
 from openbook_common.tests.helpers import make_emoji_group, make_user, make_authentication_headers_for_user, \
-    make_fake_post_text, make_proxy_whitelisted_domain
+    make_fake_post_text, make_proxy_whitelisted_domain, serve_test_website, make_test_website_url
+from openbook_common.helpers import normalise_url
+from openbook_common.url_previews import get_cached_url_preview, URL_PREVIEW_NOT_FOUND
 
 logger = logging.getLogger(__name__)
 
@@ -111,9 +114,10 @@ class PreviewLinkDataAPITests(OpenbookAPITestCase):
         """
         should retrieve preview data for a link in a whitelisted domain and return 200
         """
+        serve_test_website(self)
         user = make_user()
         headers = make_authentication_headers_for_user(user)
-        preview_url = 'www.okuna.io'
+        preview_url = make_test_website_url()
         url = self._get_url()
         make_proxy_whitelisted_domain(domain='okuna.io')
 
@@ -166,6 +170,38 @@ class PreviewLinkDataAPITests(OpenbookAPITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_does_not_cache_preview_data_of_url_responding_with_error(self):
+        """
+        should fail to retrieve preview data for a url responding with an error, without caching it, and return 400
+        """
+        serve_test_website(self)
+        make_proxy_whitelisted_domain(domain='okuna.io')
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+        preview_url = make_test_website_url(path='server-error/%s' % uuid.uuid4().hex)
+
+        url = self._get_url()
+        response = self.client.get(url, {'url': preview_url}, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIsNone(get_cached_url_preview(normalise_url(preview_url)))
+
+    def test_caches_url_not_found(self):
+        """
+        should fail to retrieve preview data for a url which does not exist, cache it as not found and return 400
+        """
+        serve_test_website(self)
+        make_proxy_whitelisted_domain(domain='okuna.io')
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+        preview_url = make_test_website_url(path='not-found/%s' % uuid.uuid4().hex)
+
+        url = self._get_url()
+        response = self.client.get(url, {'url': preview_url}, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual({'error': URL_PREVIEW_NOT_FOUND}, get_cached_url_preview(normalise_url(preview_url)))
+
     def test_cannot_retrieve_preview_data_if_no_url_param(self):
         """
         should fail if url param is missing return 400
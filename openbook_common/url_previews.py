@@ -0,0 +1,54 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from webpreview import URLNotFound, URLUnreachable
+
+from openbook_common.helpers import get_url_metadata
+
+URL_PREVIEW_CACHE_KEY = 'url-preview-%s'
+
+URL_PREVIEW_NOT_FOUND = 'not-found'
+
+
+def get_url_preview(url):
+    """
+    Returns the metadata of the normalised url, fetching it only when it is not cached.
+    Raises URLNotFound when the url was found not to exist, also when that got cached, and URLUnreachable when the
+    url can't be fetched right now.
+    """
+    url_preview = get_cached_url_preview(url)
+
+    if url_preview is None:
+        url_preview = fetch_url_preview(url)
+
+    if url_preview.get('error') == URL_PREVIEW_NOT_FOUND:
+        raise URLNotFound('The web page does not exist.')
+
+    return url_preview['metadata']
+
+
+def get_cached_url_preview(url):
+    return cache.get(_make_url_preview_cache_key(url))
+
+
+def fetch_url_preview(url):
+    """
+    Fetches and caches the metadata of the normalised url.
+    Urls which were not found are cached as such, for a shorter time. Urls which are unreachable or respond with an
+    error are not cached, they are fetched again the next time, and raise URLUnreachable.
+    """
+    try:
+        url_preview = {'metadata': get_url_metadata(url)}
+        timeout = settings.URL_PREVIEW_TTL
+    except URLNotFound:
+        url_preview = {'error': URL_PREVIEW_NOT_FOUND}
+        timeout = settings.URL_PREVIEW_ERROR_TTL
+
+    cache.set(_make_url_preview_cache_key(url), url_preview, timeout)
+
+    return url_preview
+
+
+def _make_url_preview_cache_key(url):
+    return URL_PREVIEW_CACHE_KEY % hashlib.sha1(url.encode('utf-8')).hexdigest()
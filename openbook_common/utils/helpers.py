@@ -110,14 +110,39 @@ def get_magic():
     return magic
 
 
-def write_in_memory_file_to_disk(in_memory_file):
+# Enough of the beginning of a file to tell its mime type
+MIME_SNIFF_SIZE = 8 * 1024
+
+
+def get_in_memory_file_mime(in_memory_file):
+    """
+    Returns the mime type of the in memory file, told from its first bytes rather than from all of it
+    """
+    in_memory_file.seek(0)
+    file_mime = magic.from_buffer(in_memory_file.read(MIME_SNIFF_SIZE))
+    in_memory_file.seek(0)
+    return file_mime
+
+
+def write_in_memory_file_to_disk_with_sha256sum(in_memory_file):
+    """
+    Writes the in memory file to a temporary file on disk in chunks, hashing it in the same pass.
+    Returns the closed temporary file and the sha256sum.
+    """
     extension = os.path.splitext(in_memory_file.name)[1]
 
-    tmp_file = tempfile.mkstemp(suffix=extension)
-    tmp_file_path = tmp_file[1]
-    tmp_file = open(tmp_file_path, 'wb')
-    # Was read for the magic headers thing
-    tmp_file.write(in_memory_file.read())
-    tmp_file.seek(0)
-    tmp_file.close()
-    return tmp_file
+    tmp_file_descriptor, tmp_file_path = tempfile.mkstemp(suffix=extension)
+    os.close(tmp_file_descriptor)
+
+    h = hashlib.sha256()
+
+    in_memory_file.seek(0)
+
+    with open(tmp_file_path, 'wb') as tmp_file:
+        for chunk in in_memory_file.chunks():
+            h.update(chunk)
+            tmp_file.write(chunk)
+
+    in_memory_file.seek(0)
+
+    return tmp_file, h.hexdigest()
@@ -21,6 +21,10 @@ def get_post_media_model():
     return apps.get_model('openbook_posts.PostMedia')
 
 
+def get_post_video_model():
+    return apps.get_model('openbook_posts.PostVideo')
+
+
 def get_proxy_whitelist_domain_model():
     return apps.get_model('openbook_common.ProxyWhitelistDomain')
 
@@ -41,6 +45,10 @@ def get_post_comment_mute_model():
     return apps.get_model('openbook_posts.PostCommentMute')
 
 
+def get_connection_circle_model():
+    return apps.get_model('openbook_circles.ConnectionCircle')
+
+
 def get_user_block_model():
     return apps.get_model('openbook_auth.UserBlock')
 
@@ -61,6 +69,10 @@ def get_community_log_model():
     return apps.get_model('openbook_communities.CommunityLog')
 
 
+def get_community_search_term_model():
+    return apps.get_model('openbook_communities.CommunitySearchTerm')
+
+
 def get_post_comment_model():
     return apps.get_model('openbook_posts.PostComment')
 
@@ -69,10 +81,18 @@ def get_post_reaction_model():
     return apps.get_model('openbook_posts.PostReaction')
 
 
+def get_post_reaction_emoji_count_model():
+    return apps.get_model('openbook_posts.PostReactionEmojiCount')
+
+
 def get_post_comment_reaction_model():
     return apps.get_model('openbook_posts.PostCommentReaction')
 
 
+def get_post_comment_reaction_emoji_count_model():
+    return apps.get_model('openbook_posts.PostCommentReactionEmojiCount')
+
+
 def get_emoji_model():
     return apps.get_model('openbook_common.Emoji')
 
@@ -165,6 +185,10 @@ def get_moderation_report_model():
     return apps.get_model('openbook_moderation.ModerationReport')
 
 
+def get_blocked_media_hash_model():
+    return apps.get_model('openbook_moderation.BlockedMediaHash')
+
+
 def get_moderation_category_model():
     return apps.get_model('openbook_moderation.ModerationCategory')
 
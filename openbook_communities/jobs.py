@@ -0,0 +1,16 @@
+from django_rq import job
+
+from openbook_common.utils.model_loaders import get_community_model
+
+
+@job
+def curate_trending_communities():
+    """
+    This job should be scheduled
+    """
+    # Recounts the members of the trending communities, catching up with the memberships which were not counted
+    # in the leaderboards such as the ones deleted along with their users
+    Community = get_community_model()
+    Community.rebuild_trending_communities()
+
+    return 'Curated trending communities'
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.5 on 2026-10-18 05:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_communities', '0028_auto_20190606_0944'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommunitySearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(db_index=True, max_length=64, verbose_name='term')),
+                ('community', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='openbook_communities.Community')),
+            ],
+            options={
+                'unique_together': {('community', 'term')},
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+import re
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+# Frozen copy of openbook_common.search.make_search_terms and the SEARCH_TERM_MAX_LENGTH setting as of this migration
+SEARCH_TERM_WORD_REGEX = re.compile(r'[^\s_.\-]+')
+SEARCH_TERM_MAX_LENGTH = 64
+
+
+def make_search_terms(value):
+    if not value:
+        return set()
+
+    value = value.lower()
+    terms = {value[:SEARCH_TERM_MAX_LENGTH]}
+
+    for word_match in SEARCH_TERM_WORD_REGEX.finditer(value):
+        terms.add(value[word_match.start():][:SEARCH_TERM_MAX_LENGTH])
+
+    return terms
+
+
+def forwards_func(apps, schema_editor):
+    # We get the models from the versioned app registry;
+    # if we directly import them, they'll be the wrong version
+    Community = apps.get_model('openbook_communities', 'Community')
+    CommunitySearchTerm = apps.get_model('openbook_communities', 'CommunitySearchTerm')
+    db_alias = schema_editor.connection.alias
+
+    communities_search_terms = []
+
+    for community_id, name, title in Community.objects.using(db_alias).values_list('id', 'name', 'title').iterator():
+        terms = make_search_terms(name) | make_search_terms(title)
+        communities_search_terms.extend(
+            [CommunitySearchTerm(community_id=community_id, term=term) for term in terms])
+
+        if len(communities_search_terms) >= BATCH_SIZE:
+            CommunitySearchTerm.objects.using(db_alias).bulk_create(communities_search_terms)
+            communities_search_terms = []
+
+    CommunitySearchTerm.objects.using(db_alias).bulk_create(communities_search_terms)
+
+
+def reverse_func(apps, schema_editor):
+    CommunitySearchTerm = apps.get_model('openbook_communities', 'CommunitySearchTerm')
+    db_alias = schema_editor.connection.alias
+    CommunitySearchTerm.objects.using(db_alias).all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('openbook_communities', '0029_communitysearchterm'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards_func, reverse_func),
+    ]
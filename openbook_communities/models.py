@@ -1,24 +1,36 @@
+from collections import defaultdict
+
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericRelation
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
 
 # Create your models here.
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Q, Case, When, Value, IntegerField
 from django.db.models import Count
 from pilkit.processors import ResizeToFill, ResizeToFit
 
 from openbook.settings import COLOR_ATTR_MAX_LENGTH
-from openbook_auth.models import User
+from openbook_auth.communities_roles import delete_cached_communities_roles
+from openbook_auth.models import User, UserSearchTerm
 from django.utils.translation import ugettext_lazy as _
 
+from openbook_common.search import make_search_terms, normalise_search_query
 from openbook_common.utils.model_loaders import get_community_invite_model, \
     get_community_log_model, get_category_model, get_user_model, get_moderated_object_model
 from openbook_common.validators import hex_color_validator
 from openbook_communities.helpers import upload_to_community_avatar_directory, upload_to_community_cover_directory
+from openbook_communities.names import get_cached_community_id, cache_community_id, delete_cached_community_id
+from openbook_communities.trending import trending_communities_need_rebuild, fill_trending_communities, \
+    set_trending_community, increment_trending_community_members_count, remove_trending_community, \
+    get_trending_communities_ids
 from openbook_communities.validators import community_name_characters_validator
 from openbook_moderation.models import ModeratedObject, ModerationCategory
 from openbook_posts.models import Post
+from openbook_posts.jobs import soft_delete_posts, unsoft_delete_posts
+from openbook_posts.timelines import delete_timeline
 from imagekit.models import ProcessedImageField
 
 
@@ -66,6 +78,21 @@ class Community(models.Model):
     class Meta:
         verbose_name_plural = 'communities'
 
+    @classmethod
+    def get_community_id_with_name(cls, community_name):
+        """
+        Returns the id of the community with the given name, None if there is none
+        """
+        community_id = get_cached_community_id(community_name=community_name)
+
+        if community_id is None:
+            community_id = cls.objects.filter(name=community_name).values_list('id', flat=True).first()
+
+            if community_id is not None:
+                cache_community_id(community_name=community_name, community_id=community_id)
+
+        return community_id
+
     @classmethod
     def is_user_with_username_invited_to_community_with_name(cls, username, community_name):
         CommunityInvite = get_community_invite_model()
@@ -111,40 +138,68 @@ class Community(models.Model):
 
     @classmethod
     def search_communities_with_query(cls, query):
-        query = cls._make_search_communities_query(query=query)
-        return cls.objects.filter(query)
+        db_query = cls._make_search_communities_query(query=query)
+        return CommunitySearchTerm.rank_communities_for_query(communities=cls.objects.filter(db_query), query=query)
 
     @classmethod
     def _make_search_communities_query(cls, query):
-        communities_query = Q(name__icontains=query)
-        communities_query.add(Q(title__icontains=query), Q.OR)
+        communities_query = CommunitySearchTerm.make_search_communities_query(query=query)
         communities_query.add(Q(is_deleted=False), Q.AND)
         return communities_query
 
     @classmethod
     def get_trending_communities_for_user_with_id(cls, user_id, category_name=None):
-        trending_communities_query = cls._make_trending_communities_query(category_name=category_name)
+        trending_communities_query = cls._make_trending_communities_query()
         trending_communities_query.add(~Q(banned_users__id=user_id), Q.AND)
-        return cls._get_trending_communities_with_query(query=trending_communities_query)
+        return cls._get_trending_communities_with_query(query=trending_communities_query, category_name=category_name)
 
     @classmethod
     def get_trending_communities(cls, category_name=None):
-        trending_communities_query = cls._make_trending_communities_query(category_name=category_name)
-        return cls._get_trending_communities_with_query(query=trending_communities_query)
+        trending_communities_query = cls._make_trending_communities_query()
+        return cls._get_trending_communities_with_query(query=trending_communities_query, category_name=category_name)
 
     @classmethod
-    def _get_trending_communities_with_query(cls, query):
-        return cls.objects.annotate(Count('memberships')).filter(query).order_by(
-            '-memberships__count', '-created')
+    def _get_trending_communities_with_query(cls, query, category_name=None, max_count=100):
+        if trending_communities_need_rebuild():
+            cls.rebuild_trending_communities()
+
+        trending_communities_ids = get_trending_communities_ids(count=max_count, category_name=category_name)
+
+        if not trending_communities_ids:
+            return cls.objects.none()
+
+        # Keep the order of the leaderboard
+        trending_communities_order = Case(*[When(pk=community_id, then=position) for position, community_id in
+                                            enumerate(trending_communities_ids)], output_field=IntegerField())
+
+        return cls.objects.filter(query, id__in=trending_communities_ids).order_by(trending_communities_order)
 
     @classmethod
-    def _make_trending_communities_query(cls, category_name=None):
-        trending_communities_query = Q(type=cls.COMMUNITY_TYPE_PUBLIC, is_deleted=False)
+    def rebuild_trending_communities(cls):
+        trending_communities = cls.objects.filter(cls._make_trending_communities_query()).annotate(
+            Count('memberships')).values_list('id', 'memberships__count')
+
+        communities_categories = cls.categories.through.objects.filter(
+            community__type=cls.COMMUNITY_TYPE_PUBLIC, community__is_deleted=False).values_list('community_id',
+                                                                                              'category__name')
 
-        if category_name:
-            trending_communities_query.add(Q(categories__name=category_name), Q.AND)
+        communities_categories_names = defaultdict(list)
+        for community_id, category_name in communities_categories.iterator():
+            communities_categories_names[community_id].append(category_name)
+
+        fill_trending_communities(communities=[
+            (community_id, members_count, communities_categories_names[community_id]) for
+            community_id, members_count in trending_communities.iterator()
+        ], categories_names=cls._get_all_categories_names())
+
+    @classmethod
+    def _make_trending_communities_query(cls):
+        return Q(type=cls.COMMUNITY_TYPE_PUBLIC, is_deleted=False)
 
-        return trending_communities_query
+    @classmethod
+    def _get_all_categories_names(cls):
+        Category = get_category_model()
+        return Category.objects.values_list('name', flat=True)
 
     @classmethod
     def create_community(cls, name, title, creator, color, type=None, user_adjective=None, users_adjective=None,
@@ -169,6 +224,7 @@ class Community(models.Model):
             community.set_categories_with_names(categories_names=categories_names)
 
         community.save()
+        community.update_trending_communities()
         return community
 
     @classmethod
@@ -196,8 +252,7 @@ class Community(models.Model):
     def search_community_with_name_members(cls, community_name, query, exclude_keywords=None):
         db_query = Q(communities_memberships__community__name=community_name)
 
-        community_members_query = Q(communities_memberships__user__username__icontains=query)
-        community_members_query.add(Q(communities_memberships__user__profile__name__icontains=query), Q.OR)
+        community_members_query = UserSearchTerm.make_search_users_query(query=query)
 
         db_query.add(community_members_query, Q.AND)
 
@@ -206,7 +261,7 @@ class Community(models.Model):
                 cls._get_exclude_members_query_for_keywords(exclude_keywords=exclude_keywords),
                 Q.AND)
 
-        return User.objects.filter(db_query)
+        return UserSearchTerm.rank_users_for_query(users=User.objects.filter(db_query), query=query)
 
     @classmethod
     def _get_exclude_members_query_for_keywords(cls, exclude_keywords):
@@ -235,12 +290,11 @@ class Community(models.Model):
         db_query = Q(communities_memberships__community__name=community_name,
                      communities_memberships__is_administrator=True)
 
-        community_members_query = Q(communities_memberships__user__username__icontains=query)
-        community_members_query.add(Q(communities_memberships__user__profile__name__icontains=query), Q.OR)
+        community_members_query = UserSearchTerm.make_search_users_query(query=query)
 
         db_query.add(community_members_query, Q.AND)
 
-        return User.objects.filter(db_query)
+        return UserSearchTerm.rank_users_for_query(users=User.objects.filter(db_query), query=query)
 
     @classmethod
     def get_community_with_name_moderators(cls, community_name, moderators_max_id=None):
@@ -257,12 +311,11 @@ class Community(models.Model):
         db_query = Q(communities_memberships__community__name=community_name,
                      communities_memberships__is_moderator=True)
 
-        community_members_query = Q(communities_memberships__user__username__icontains=query)
-        community_members_query.add(Q(communities_memberships__user__profile__name__icontains=query), Q.OR)
+        community_members_query = UserSearchTerm.make_search_users_query(query=query)
 
         db_query.add(community_members_query, Q.AND)
 
-        return User.objects.filter(db_query)
+        return UserSearchTerm.rank_users_for_query(users=User.objects.filter(db_query), query=query)
 
     @classmethod
     def get_community_with_name_banned_users(cls, community_name, users_max_id):
@@ -277,9 +330,9 @@ class Community(models.Model):
     @classmethod
     def search_community_with_name_banned_users(cls, community_name, query):
         community = Community.objects.get(name=community_name)
-        community_banned_users_query = Q(username__icontains=query)
-        community_banned_users_query.add(Q(profile__name__icontains=query), Q.OR)
-        return community.banned_users.filter(community_banned_users_query)
+        community_banned_users_query = UserSearchTerm.make_search_users_query(query=query)
+        return UserSearchTerm.rank_users_for_query(users=community.banned_users.filter(community_banned_users_query),
+                                                   query=query)
 
     @property
     def members_count(self):
@@ -330,6 +383,7 @@ class Community(models.Model):
             self.set_categories_with_names(categories_names=categories_names)
 
         self.save()
+        self.update_trending_communities()
 
     def add_moderator(self, user):
         user_membership = self.memberships.get(user=user)
@@ -357,11 +411,33 @@ class Community(models.Model):
 
     def add_member(self, user):
         user_membership = CommunityMembership.create_membership(user=user, community=self)
+        # The community posts need to be backfilled
+        delete_timeline(user.pk)
+        self._increment_trending_communities_members_count(amount=1)
         return user_membership
 
     def remove_member(self, user):
         user_membership = self.memberships.get(user=user)
         user_membership.delete()
+        self._increment_trending_communities_members_count(amount=-1)
+
+    def update_trending_communities(self):
+        """
+        Puts the community in the trending communities leaderboards or takes it out of them,
+        after it got created or something deciding whether it is trending changed
+        """
+        if self.type == self.COMMUNITY_TYPE_PUBLIC and not self.is_deleted:
+            set_trending_community(community_id=self.pk, members_count=self.members_count,
+                                   categories_names=self.categories.values_list('name', flat=True),
+                                   all_categories_names=self._get_all_categories_names())
+        else:
+            remove_trending_community(community_id=self.pk, categories_names=self._get_all_categories_names())
+
+    def _increment_trending_communities_members_count(self, amount):
+        if self.type == self.COMMUNITY_TYPE_PUBLIC and not self.is_deleted:
+            increment_trending_community_members_count(community_id=self.pk, amount=amount,
+                                                       categories_names=self.categories.values_list('name',
+                                                                                                    flat=True))
 
     def set_categories_with_names(self, categories_names):
         self.clear_categories()
@@ -466,28 +542,98 @@ class Community(models.Model):
         if self.users_adjective:
             self.users_adjective = self.users_adjective.title()
 
-        return super(Community, self).save(*args, **kwargs)
+        name_and_title = (self.__dict__.get('name'), self.__dict__.get('title'))
+        indexed_name_and_title = getattr(self, '_indexed_name_and_title', None)
+        name_and_title_need_indexing = name_and_title != indexed_name_and_title
+
+        saved = super(Community, self).save(*args, **kwargs)
+
+        if name_and_title_need_indexing:
+            CommunitySearchTerm.index_community_with_id(community_id=self.pk, name=self.name, title=self.title)
+            self._indexed_name_and_title = name_and_title
+
+            if indexed_name_and_title and indexed_name_and_title[0] != self.name:
+                delete_cached_community_id(community_name=indexed_name_and_title[0])
+
+            cache_community_id(community_name=self.name, community_id=self.pk)
+
+        return saved
 
     def soft_delete(self):
         self.is_deleted = True
-        for post in self.posts.all().iterator():
-            post.soft_delete()
         self.save()
+        self.update_trending_communities()
+
+        # Communities can have too many posts to soft delete them within the request
+        posts_query = Q(community_id=self.pk)
+        transaction.on_commit(lambda: soft_delete_posts.delay(posts_query=posts_query))
 
     def unsoft_delete(self):
         self.is_deleted = False
-        for post in self.posts:
-            post.unsoft_delete()
         self.save()
+        self.update_trending_communities()
+
+        posts_query = Q(community_id=self.pk)
+        transaction.on_commit(lambda: unsoft_delete_posts.delay(posts_query=posts_query))
 
     def count_pending_moderated_objects(self):
         ModeratedObject = get_moderated_object_model()
         return self.moderated_objects.filter(status=ModeratedObject.STATUS_PENDING).count()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        community = super(Community, cls).from_db(db, field_names, values)
+        community._indexed_name_and_title = (community.__dict__.get('name'), community.__dict__.get('title'))
+        return community
+
     def __str__(self):
         return self.name
 
 
+class CommunitySearchTerm(models.Model):
+    """
+    The terms communities are searched by, made out of their name and title, see openbook_common.search
+    """
+    community = models.ForeignKey(Community, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(_('term'), max_length=settings.SEARCH_TERM_MAX_LENGTH, blank=False, null=False,
+                            db_index=True)
+
+    class Meta:
+        unique_together = ('community', 'term',)
+
+    @classmethod
+    def index_community_with_id(cls, community_id, name, title):
+        terms = make_search_terms(name) | make_search_terms(title)
+
+        cls.objects.filter(community_id=community_id).delete()
+        cls.objects.bulk_create([cls(community_id=community_id, term=term) for term in terms])
+
+    @classmethod
+    def make_search_communities_query(cls, query):
+        """
+        Matches the communities with a name or title starting with the query or with a word in them starting with it
+        """
+        communities_ids = cls.objects.filter(term__startswith=normalise_search_query(query)).values('community_id')
+        return Q(id__in=communities_ids)
+
+    @classmethod
+    def rank_communities_for_query(cls, communities, query):
+        """
+        Orders the communities by how well they match the query, exact then prefix name matches go first
+        """
+        query = query.strip()
+
+        search_rank = Case(
+            When(name__iexact=query, then=Value(0)),
+            When(name__istartswith=query, then=Value(1)),
+            When(title__istartswith=query, then=Value(2)),
+            default=Value(3),
+            output_field=IntegerField(),
+        )
+
+        return communities.annotate(search_rank=search_rank).order_by('search_rank', 'name')
+
+
 class CommunityMembership(models.Model):
     """
     An object representing the membership of a user in a community
@@ -582,3 +728,38 @@ class CommunityInvite(models.Model):
     @classmethod
     def is_user_with_username_invited_to_community_with_name(cls, username, community_name):
         return cls.objects.filter(community__name=community_name, invited_user__username=username).exists()
+
+
+@receiver(post_delete, sender=Community, dispatch_uid='community_deleted_delete_cached_id')
+def delete_community_cached_id(sender, instance, **kwargs):
+    delete_cached_community_id(community_name=instance.name)
+
+
+@receiver(post_delete, sender=Community, dispatch_uid='community_deleted_remove_from_trending_communities')
+def remove_community_from_trending_communities(sender, instance, **kwargs):
+    remove_trending_community(community_id=instance.pk, categories_names=Community._get_all_categories_names())
+
+
+@receiver(post_save, sender=CommunityMembership, dispatch_uid='community_membership_saved_clear_communities_roles')
+@receiver(post_delete, sender=CommunityMembership, dispatch_uid='community_membership_deleted_clear_communities_roles')
+def clear_member_communities_roles(sender, instance, **kwargs):
+    delete_cached_communities_roles(users_ids=[instance.user_id])
+
+
+@receiver(m2m_changed, sender=Community.banned_users.through,
+          dispatch_uid='community_bans_changed_clear_communities_roles')
+def clear_banned_users_communities_roles(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Bans get added and removed through Community.banned_users
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if reverse:
+        users_ids = [instance.pk]
+    elif action == 'pre_clear':
+        users_ids = list(instance.banned_users.values_list('id', flat=True))
+    else:
+        users_ids = pk_set
+
+    delete_cached_communities_roles(users_ids=users_ids)
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.cache import cache
+
+COMMUNITY_ID_CACHE_KEY = 'community-id-%s'
+
+
+def get_cached_community_id(community_name):
+    return cache.get(COMMUNITY_ID_CACHE_KEY % community_name)
+
+
+def cache_community_id(community_name, community_id):
+    cache.set(COMMUNITY_ID_CACHE_KEY % community_name, community_id, settings.COMMUNITY_ID_TTL)
+
+
+def delete_cached_community_id(community_name):
+    cache.delete(COMMUNITY_ID_CACHE_KEY % community_name)
@@ -1041,6 +1041,26 @@ class SearchCommunitiesAPITests(OpenbookAPITestCase):
             self.assertEqual(retrieved_community['name'], community_name.lower())
             community.delete()
 
+    def test_cant_search_communities_by_the_middle_of_a_word(self):
+        """
+        should not find communities by a query in the middle of a word of their name or title and return 200
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        mixer.blend(Community, name='okunahoppers', title='Okunahopper Club')
+
+        url = self._get_url()
+        response = self.client.get(url, {
+            'query': 'nahop'
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        parsed_response = json.loads(response.content)
+
+        self.assertEqual(len(parsed_response), 0)
+
     def test_can_search_communities_by_title(self):
         """
         should be able to search for communities by their title and return 200
@@ -1195,5 +1215,113 @@ class TrendingCommunitiesAPITests(OpenbookAPITestCase):
 
         self.assertEqual(0, len(response_communities))
 
+    def test_displays_communities_with_more_members_first(self):
+        """
+        should display the communities with more members first, the newest first among the ones with as many members
+        """
+        user = make_user()
+
+        community = make_community()
+        community_with_most_members = make_community()
+        community_with_as_many_members = make_community()
+        community_left = make_community()
+
+        for i in range(0, 2):
+            member = make_user()
+            member.join_community_with_name(community_name=community_with_most_members.name)
+            member.join_community_with_name(community_name=community_left.name)
+            member.leave_community_with_name(community_name=community_left.name)
+
+        member = make_user()
+        member.join_community_with_name(community_name=community.name)
+        member.join_community_with_name(community_name=community_with_as_many_members.name)
+
+        headers = make_authentication_headers_for_user(user)
+
+        response = self.client.get(self._get_url(), **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_communities = json.loads(response.content)
+
+        self.assertEqual(
+            [community_with_most_members.pk, community_with_as_many_members.pk, community.pk, community_left.pk],
+            [response_community['id'] for response_community in response_communities])
+
+    def test_displays_communities_of_category(self):
+        """
+        should display the communities of the given category only and return 200
+        """
+        user = make_user()
+
+        community = make_community()
+        make_community()
+
+        category_name = community.categories.get().name
+
+        headers = make_authentication_headers_for_user(user)
+
+        response = self.client.get(self._get_url(), {'category': category_name}, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_communities = json.loads(response.content)
+
+        self.assertEqual([community.pk], [response_community['id'] for response_community in response_communities])
+
+    def test_does_not_display_community_of_category_it_was_taken_out_of(self):
+        """
+        should not display a community in a category it was taken out of and return 200
+        """
+        user = make_user()
+        community_owner = make_user()
+
+        community = make_community(creator=community_owner)
+        previous_category_name = community.categories.get().name
+        new_category_name = make_category().name
+
+        headers = make_authentication_headers_for_user(user)
+
+        # Builds the leaderboards
+        self.client.get(self._get_url(), {'category': previous_category_name}, **headers)
+
+        community_owner.update_community_with_name(community_name=community.name,
+                                                   categories_names=[new_category_name])
+
+        response = self.client.get(self._get_url(), {'category': previous_category_name}, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_communities = json.loads(response.content)
+
+        self.assertEqual(0, len(response_communities))
+
+        response = self.client.get(self._get_url(), {'category': new_category_name}, **headers)
+
+        response_communities = json.loads(response.content)
+
+        self.assertEqual([community.pk], [response_community['id'] for response_community in response_communities])
+
+    def test_does_not_display_community_made_private(self):
+        """
+        should not display a community which was made private and return 200
+        """
+        user = make_user()
+        community_owner = make_user()
+
+        community = make_community(creator=community_owner)
+        community_owner.update_community_with_name(community_name=community.name,
+                                                   type=Community.COMMUNITY_TYPE_PRIVATE)
+
+        headers = make_authentication_headers_for_user(user)
+
+        response = self.client.get(self._get_url(), **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_communities = json.loads(response.content)
+
+        self.assertEqual(0, len(response_communities))
+
     def _get_url(self):
         return reverse('trending-communities')
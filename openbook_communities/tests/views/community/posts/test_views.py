@@ -1,5 +1,7 @@
 from django.urls import reverse
+from django_rq import get_worker
 from faker import Faker
+from rq import SimpleWorker
 from openbook_common.tests.models import OpenbookAPITestCase
 from rest_framework import status
 
@@ -640,6 +642,9 @@ class CommunityPostsAPITest(OpenbookAPITestCase):
         url = self._get_url(community_name=community.name)
         response = self.client.put(url, data, **headers, format='multipart')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post = Post.objects.get(text=post_text, creator_id=user.pk)
 
         self.assertTrue(PostUserMention.objects.filter(post_id=post.pk, user_id=mentioned_user.pk).exists())
@@ -703,6 +708,9 @@ class CommunityPostsAPITest(OpenbookAPITestCase):
         url = self._get_url(community_name=community.name)
         response = self.client.put(url, data, **headers, format='multipart')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post = Post.objects.get(text=post_text, creator_id=user.pk)
 
         self.assertTrue(PostUserMention.objects.filter(post_id=post.pk, user_id=mentioned_user.pk).exists())
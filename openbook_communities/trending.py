@@ -0,0 +1,100 @@
+from django_redis import get_redis_connection
+
+TRENDING_COMMUNITIES_KEY = 'ob-api-trending-communities'
+TRENDING_COMMUNITIES_CATEGORY_KEY = 'ob-api-trending-communities-category-%s'
+TRENDING_COMMUNITIES_BUILT_KEY = 'ob-api-trending-communities-built'
+
+
+def trending_communities_need_rebuild():
+    """
+    The leaderboards need to be rebuilt when they were never built or got lost
+    """
+    return not get_redis_connection('default').exists(TRENDING_COMMUNITIES_BUILT_KEY)
+
+
+def fill_trending_communities(communities, categories_names):
+    """
+    Replaces the leaderboards with the given (community id, members count, categories names) tuples.
+    The leaderboards of all the given categories names get emptied first.
+    """
+    pipeline = get_redis_connection('default').pipeline()
+    pipeline.delete(TRENDING_COMMUNITIES_KEY, *[TRENDING_COMMUNITIES_CATEGORY_KEY % category_name for category_name in
+                                                categories_names])
+
+    for community_id, members_count, community_categories_names in communities:
+        member = _make_member(community_id=community_id)
+
+        for key in _get_keys(categories_names=community_categories_names):
+            pipeline.zadd(key, {member: members_count})
+
+    pipeline.set(TRENDING_COMMUNITIES_BUILT_KEY, 1)
+    pipeline.execute()
+
+
+def set_trending_community(community_id, members_count, categories_names, all_categories_names):
+    """
+    Sets the members count of the community in the leaderboards of all and of its categories, and takes it out of
+    the leaderboards of the other categories, which it might have been in before its categories changed.
+    Leaderboards which need to be rebuilt are left alone, they get rebuilt from the database when read.
+    """
+    if trending_communities_need_rebuild():
+        return
+
+    member = _make_member(community_id=community_id)
+
+    pipeline = get_redis_connection('default').pipeline()
+
+    for category_name in set(all_categories_names) - set(categories_names):
+        pipeline.zrem(TRENDING_COMMUNITIES_CATEGORY_KEY % category_name, member)
+
+    for key in _get_keys(categories_names=categories_names):
+        pipeline.zadd(key, {member: members_count})
+
+    pipeline.execute()
+
+
+def increment_trending_community_members_count(community_id, categories_names, amount):
+    """
+    Increments the members count of the community in the leaderboards it is currently in
+    """
+    member = _make_member(community_id=community_id)
+
+    pipeline = get_redis_connection('default').pipeline()
+
+    for key in _get_keys(categories_names=categories_names):
+        pipeline.zadd(key, {member: amount}, xx=True, incr=True)
+
+    pipeline.execute()
+
+
+def remove_trending_community(community_id, categories_names):
+    member = _make_member(community_id=community_id)
+
+    pipeline = get_redis_connection('default').pipeline()
+
+    for key in _get_keys(categories_names=categories_names):
+        pipeline.zrem(key, member)
+
+    pipeline.execute()
+
+
+def get_trending_communities_ids(count, category_name=None):
+    """
+    Returns the ids of the communities with the most members, newest first among the ones with as many members
+    """
+    key = TRENDING_COMMUNITIES_CATEGORY_KEY % category_name if category_name else TRENDING_COMMUNITIES_KEY
+
+    communities_ids = get_redis_connection('default').zrevrange(key, 0, count - 1)
+
+    return [int(community_id) for community_id in communities_ids]
+
+
+def _get_keys(categories_names):
+    return [TRENDING_COMMUNITIES_KEY] + [TRENDING_COMMUNITIES_CATEGORY_KEY % category_name for category_name in
+                                         categories_names]
+
+
+def _make_member(community_id):
+    # Sorted sets order the members with the same score in reverse lexicographical order, zero padding the ids makes
+    # it the reverse order of creation
+    return '%012d' % community_id
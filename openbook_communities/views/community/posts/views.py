@@ -7,6 +7,7 @@ from rest_framework.views import APIView
 
 from openbook_moderation.permissions import IsNotSuspended
 from openbook_common.utils.helpers import normalise_request_data
+from openbook_posts.page_context import PostsPageContext
 from openbook_communities.views.community.posts.serializers import GetCommunityPostsSerializer, CommunityPostSerializer, \
     CreateCommunityPostSerializer
 
@@ -28,11 +29,14 @@ class CommunityPosts(APIView):
 
         user = request.user
 
-        posts = user.get_posts_for_community_with_name(community_name=community_name, max_id=max_id).order_by(
-            '-created')[:count]
+        posts = list(user.get_posts_for_community_with_name(community_name=community_name, max_id=max_id).order_by(
+            '-created')[:count])
+
+        posts_page_context = PostsPageContext(posts=posts, user=user)
 
         response_serializer = CommunityPostSerializer(posts, many=True,
-                                                      context={"request": request})
+                                                      context={"request": request,
+                                                               "posts_page_context": posts_page_context})
 
         return Response(response_serializer.data, status=status.HTTP_200_OK)
 
@@ -78,10 +82,13 @@ class ClosedCommunityPosts(APIView):
 
         user = request.user
 
-        posts = user.get_closed_posts_for_community_with_name(community_name=community_name, max_id=max_id).order_by(
-            '-created')[:count]
+        posts = list(user.get_closed_posts_for_community_with_name(community_name=community_name, max_id=max_id).order_by(
+            '-created')[:count])
+
+        posts_page_context = PostsPageContext(posts=posts, user=user)
 
         response_serializer = CommunityPostSerializer(posts, many=True,
-                                                      context={"request": request})
+                                                      context={"request": request,
+                                                               "posts_page_context": posts_page_context})
 
         return Response(response_serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,15 @@
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from openbook.storage_backends import S3PrivateMediaStorage
+
+archive_storage = S3PrivateMediaStorage() if settings.IS_PRODUCTION else default_storage
+
+
+def save_archive(archive_file):
+    """
+    Stores the uploaded archive until imported in the background, returns its name in the storage
+    """
+    return archive_storage.save('imports/%s.zip' % uuid.uuid4(), archive_file)
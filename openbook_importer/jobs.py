@@ -0,0 +1,122 @@
+from datetime import datetime
+from json import JSONDecodeError
+from zipfile import BadZipFile
+
+from django.conf import settings
+from django.core.files.images import ImageFile
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django_rq import job
+from rest_framework.exceptions import ValidationError
+
+from openbook_common.utils.helpers import sha256sum
+from openbook_common.utils.model_loaders import get_post_model, get_user_model
+from openbook_importer.archives import archive_storage
+from openbook_importer.socialmedia_archive_parser.fb_parser import zip_parser
+from openbook_importer.statuses import set_import_status, IMPORT_STATUS_IMPORTING, IMPORT_STATUS_DONE, \
+    IMPORT_STATUS_FAILED
+import logging
+
+logger = logging.getLogger(__name__)
+
+IMPORTED_POSTS_BATCH_SIZE = 500
+
+
+@job('default', timeout=settings.ARCHIVE_IMPORT_JOB_TIMEOUT)
+def import_archive(user_id, import_uuid, archive_name):
+    """
+    Imports the posts of an uploaded facebook archive, the archive gets deleted once imported
+    """
+    User = get_user_model()
+    user = User.objects.get(pk=user_id)
+    imported_posts_count = 0
+    posts_count = None
+
+    try:
+        with archive_storage.open(archive_name) as archive_file:
+            parser = zip_parser(archive_file)
+            posts = [_parse_post(parser=parser, post=post) for post in parser.get_posts()]
+            posts = [post for post in posts if post['text'] or post['media_uri']]
+            posts_count = len(posts)
+
+            set_import_status(user_id=user_id, import_uuid=import_uuid, status=IMPORT_STATUS_IMPORTING,
+                              posts_count=posts_count)
+
+            text_posts = [(post['text'], post['created']) for post in posts if not post['media_uri']]
+
+            for i in range(0, len(text_posts), IMPORTED_POSTS_BATCH_SIZE):
+                text_posts_batch = text_posts[i:i + IMPORTED_POSTS_BATCH_SIZE]
+                user.create_imported_public_posts(posts=text_posts_batch)
+                imported_posts_count += len(text_posts_batch)
+                set_import_status(user_id=user_id, import_uuid=import_uuid, status=IMPORT_STATUS_IMPORTING,
+                                  posts_count=posts_count, imported_posts_count=imported_posts_count)
+
+            for post in posts:
+                if not post['media_uri']:
+                    continue
+
+                _import_media_post(user=user, parser=parser, post=post)
+                imported_posts_count += 1
+                set_import_status(user_id=user_id, import_uuid=import_uuid, status=IMPORT_STATUS_IMPORTING,
+                                  posts_count=posts_count, imported_posts_count=imported_posts_count)
+
+    except (BadZipFile, BufferError, FileNotFoundError, JSONDecodeError, KeyError, LookupError, TypeError,
+            ValidationError) as e:
+        logger.info('Failed importing archive %s: %s' % (archive_name, e))
+        set_import_status(user_id=user_id, import_uuid=import_uuid, status=IMPORT_STATUS_FAILED,
+                          posts_count=posts_count, imported_posts_count=imported_posts_count)
+        return 'Failed importing archive %s' % archive_name
+
+    except Exception:
+        # Reported as failed rather than left importing, the job itself fails too
+        logger.exception('Failed importing archive %s' % archive_name)
+        set_import_status(user_id=user_id, import_uuid=import_uuid, status=IMPORT_STATUS_FAILED,
+                          posts_count=posts_count, imported_posts_count=imported_posts_count)
+        raise
+
+    finally:
+        archive_storage.delete(archive_name)
+
+    set_import_status(user_id=user_id, import_uuid=import_uuid, status=IMPORT_STATUS_DONE,
+                      posts_count=posts_count, imported_posts_count=imported_posts_count)
+
+    return 'Imported %d posts of archive %s' % (imported_posts_count, archive_name)
+
+
+def _parse_post(parser, post):
+    text = None
+    media_uri = None
+    created = datetime.fromtimestamp(post['timestamp'])
+    created = parse_datetime(created.strftime('%Y-%m-%d %T+00:00'))
+
+    if 'data' in post.keys() and len(post['data']) != 0:
+        text = post['data'][0]['post']
+
+    media = parser.get_post_media(post)
+
+    if media:
+        media_uri, description = media
+
+        if description:
+            text = description
+
+    return {
+        'text': text,
+        'created': created,
+        'media_uri': media_uri,
+    }
+
+
+def _import_media_post(user, parser, post):
+    Post = get_post_model()
+
+    # Only the media of the posts which get imported is extracted, one at a time
+    with parser.extract_file(post['media_uri']) as media_file:
+        # Posts with media get created again once published, the ones imported before are told apart by their media
+        media_hash = sha256sum(file=media_file)
+
+        if Post.objects.filter(Q(image__hash=media_hash) | Q(videos__hash=media_hash), creator=user.pk,
+                               text=post['text']).exists():
+            return
+
+        user.create_public_post(text=post['text'], image=ImageFile(media_file), created=post['created'])
@@ -2,291 +2,149 @@
 
 from json import loads
 from yaml import safe_load
-from hashlib import sha3_256
+from shutil import copyfileobj
 from zipfile import PyZipFile
 from os import access, R_OK, path
-from tempfile import TemporaryDirectory
+from functools import lru_cache
+from tempfile import NamedTemporaryFile
 
 from magic import from_buffer
 
+MIMETYPES_PATH = path.join(path.dirname(__file__), 'mimetypes.yml')
 
-class profile_import(object):
+POSTS_JSON = 'posts/your_posts.json'
 
-    friends = False
-    albums = False
-    messages = False
-    posts = False
+# libmagic only needs the start of a file to tell its mime-type
+MAGIC_BUFFER_SIZE = 8192
 
-    def __init__(self, friends, albums, messages, posts):
 
-        self.friends = friends
-        self.albums = albums
-        self.messages = messages
-        self.posts = posts
+@lru_cache(maxsize=None)
+def get_mimetypes():
 
+    if not access(MIMETYPES_PATH, R_OK):
+        raise FileNotFoundError(f"{MIMETYPES_PATH} not found")
 
-class zip_parser():
+    with open(MIMETYPES_PATH, 'r') as fd:
+        types = safe_load(fd)
+
+    if 'mimetypes' not in types:
+        raise LookupError('file format incorrect, mimetypes key not found')
+
+    return types['mimetypes']
 
-    profile = False
+
+class zip_parser():
+    """
+    Reads the posts of a facebook archive. Only the index of the archive is
+    read up front, its files get read as they are imported and their
+    checksums get verified while read.
+    """
 
     def __init__(self, filename):
 
-        zipf = PyZipFile(filename)
-        # test this with corrupt zipfile
-        zipf.testzip()
-        size = self._get_extracted_zipsize(zipf)
+        self.zipf = PyZipFile(filename)
+        self.names = frozenset(self.zipf.namelist())
+
+        size = self._get_extracted_zipsize()
 
         # if size > 1gb
         if size > 1000000000:
             raise BufferError('filesize exceeds 1GB')
 
-        friends = self._extract_friends(zipf)
-        albums = self._extract_albums(zipf)
-        messages = self._extract_messages(zipf)
-        posts = self._extract_posts(zipf)
+    def get_posts(self):
 
-        self.profile = profile_import(friends, albums, messages, posts)
+        json = loads(self._read_file_from_zip(POSTS_JSON))
 
-    def _file_access(self, filename):
+        if 'status_updates' not in json.keys():
+            raise KeyError('key status_updates not found in json')
 
-        if not access(filename, R_OK):
-            raise FileNotFoundError(f"{filename} not found")
+        return json['status_updates']
 
-        return True
+    def get_post_media(self, post):
+        """
+        Returns the uri and description of the first media attached to the
+        post, None when it has none
+        """
 
-    def _return_mime_magic(self, extension):
+        for attachment in post.get('attachments', []):
+            for item in attachment.get('data', []):
+                if 'media' in item.keys():
+                    media = item['media']
+                    return media['uri'], media.get('description')
 
-        mpath = 'openbook_importer/socialmedia_archive_parser'
+        return None
 
-        if not self._file_access(f"{mpath}/mimetypes.yml"):
-            return False
+    def extract_file(self, name):
+        """
+        Extracts the file to a temporary file, which gets deleted once
+        closed
+        """
 
-        types = safe_load(open(f"{mpath}/mimetypes.yml", 'r'))
+        self._check_file_exists(name)
 
-        if 'mimetypes' not in types:
-            raise LookupError('file format incorrect, mimetypes key not found')
+        fd = NamedTemporaryFile(suffix=f".{self._get_extension(name)}")
 
-        types = types['mimetypes']
+        try:
+            with self.zipf.open(name) as zipped_fd:
+                buffer = zipped_fd.read(MAGIC_BUFFER_SIZE)
+                self._check_file_magic(name, buffer)
 
-        if extension not in types:
-            raise KeyError(f'extension not found, unknown filetype for '
-                           f'{extension}')
+                fd.write(buffer)
+                copyfileobj(zipped_fd, fd)
 
-        return types[extension]
+        except Exception:
+            fd.close()
+            raise
+
+        fd.seek(0)
 
-    def _check_file_magic(self, zipf, name):
+        return fd
 
-        if name.find('.') != -1:
-            extension = name.split('.')[-1]
-            mime = self._return_mime_magic(extension)
+    def _get_extension(self, name):
 
-        else:
+        if name.find('.') == -1:
             raise TypeError(f"{name} filenames without extension not "
                             "allowed")
 
-        if from_buffer(zipf.read(name), mime=True) not in mime:
-            raise TypeError(f"{name}'s extension does not "
-                            f"match mime-type {mime}")
-
-    def _read_file_from_zip(self, zipf, name):
-
-        if name in zipf.namelist():
-            self._check_file_magic(zipf, name)
-            return zipf.read(name)
-
-        else:
-            raise FileNotFoundError(f"{name} not found in zip file")
-
-    def _get_extracted_zipsize(self, zipf):
-
-        size = 0
-
-        for entry in zipf.filelist:
-            size += entry.file_size
-
-        return size
-
-    def _get_files_from_directory(self, dir_name, zipf, directory=False,
-                                  filename=False):
-
-        files = set()
-        for entry in zipf.filelist:
-
-            if not filename:
-                if not directory and not entry.is_dir():
-                    name = entry.filename
-
-                elif directory and entry.is_dir():
-                    name = entry.filename
-
-                else:
-                    name = entry.filename
-
-                if name[0:len(dir_name)+1] == f"{dir_name}/":
-                    if name != f"{dir_name}/":
-                        files.add(name)
-
-            else:
-                if filename in entry.filename and not entry.is_dir():
-                    name = entry.filename
-                    files.add(name)
-
-        return files
-
-    def _write_file_to_dir(self, dir_name, item, zipf):
-
-        i_path = path.join(dir_name, item.split('/')[-1])
-
-        with open(i_path, 'wb+') as fd:
-            fd.write(zipf.read(item))
-
-    def _get_fd_from_file(self, dir_name, itype, item, zipf, mode='r'):
-
-        self._write_file_to_dir(dir_name, item, zipf)
-
-        name = item.split('/')[-1]
-        fd = open(path.join(dir_name, name), mode)
+        return name.split('.')[-1]
 
-        return((name, fd))
-
-    def _parse_album_json(self, album_json, zipf):
-
-        photo_attrs = ['uri', 'creation_timestamp', 'comments', 'description']
-
-        json = loads(self._read_file_from_zip(zipf, album_json))
-
-        album_name = json['name']
-        album = {}
-        album[album_name] = {'photos': []}
-        photos = {}
-
-        for photo in json['photos']:
-            for attr in photo_attrs:
-                if attr in photo.keys():
-                    photos[attr] = photo[attr]
-
-            album[album_name]['photos'].append(photos)
-            photos = {}
-
-        return album
-
-    def _extract_albums(self, zipf):
-
-        album_defs = self._get_files_from_directory('photos_and_videos/album',
-                                                    zipf)
-        albums = []
-
-        for album in album_defs:
-            albums.append(self._parse_album_json(album, zipf))
-
-        temp = TemporaryDirectory(dir='media')
-
-        for album in albums:
-            for value in album.values():
-                for file in (value['photos']):
-                    file['uri'] = self._get_fd_from_file(temp.name,
-                                                         'photos_and_videos',
-                                                         file['uri'], zipf,
-                                                         mode='rb')
-
-        return albums
-
-    def _extract_friends(self, zipf):
-
-        json = loads(self._read_file_from_zip(zipf, 'friends/friends.json'))
-        friends = json['friends']
-
-        profile_info = 'profile_information/profile_information.json'
-        profile_info = loads(self._read_file_from_zip(zipf, profile_info)
-                             )['profile']
-        full_name = profile_info['name']['full_name']
-
-        sort_string = []
-        friends_hash = []
-
-        for friend in friends:
-            sort_string.append(friend['name'])
-            sort_string.append(full_name)
-            sort_string.sort()
-
-            friend_string = (f"{':'.join(sort_string)}:{friend['timestamp']}"
-                             .encode('utf-8'))
-
-            friends_hash.append(sha3_256(friend_string).hexdigest())
-            sort_string = []
-
-        return(friends_hash)
-
-    def _parse_message(self, zipf, message):
-
-        json = loads(self._read_file_from_zip(zipf, message))
-
-        temp = TemporaryDirectory(dir='media')
-
-        if 'messages' in json.keys():
-            for m in json['messages']:
-
-                if 'photos' in m.keys():
-                    for p in m['photos']:
-                        p['uri'] = self._get_fd_from_file(temp.name,
-                                                          'messages',
-                                                          p['uri'], zipf)
-        else:
-            raise KeyError('key messages not found in json')
-
-        return json
-
-    def _extract_messages(self, zipf):
+    def _return_mime_magic(self, extension):
 
-        message_json = self._get_files_from_directory('messages', zipf,
-                                                      filename='message.json')
-        messages = []
-        for message in message_json:
-            messages.append(self._parse_message(zipf, message))
+        types = get_mimetypes()
 
-        return messages
+        if extension not in types:
+            raise KeyError(f'extension not found, unknown filetype for '
+                           f'{extension}')
 
-    def _has_attachment(self, zipf, post):
+        return types[extension]
 
-        temp = TemporaryDirectory(dir='media')
+    def _check_file_magic(self, name, buffer):
 
-        if 'attachments' in post.keys():
-            for attachment in post['attachments']:
-                if 'data' in attachment.keys():
-                    for item in attachment['data']:
-                        if 'media' in item.keys():
-                            media = item['media']
-                            uri = self._get_fd_from_file(temp.name,
-                                                         media['uri'].
-                                                         split('/')[0],
-                                                         media['uri'], zipf,
-                                                         mode='rb')
-                            media['uri'] = uri
+        mime = self._return_mime_magic(self._get_extension(name))
 
-                            if 'media_metadata' in media:
-                                media.pop('media_metadata')
+        if from_buffer(buffer, mime=True) not in mime:
+            raise TypeError(f"{name}'s extension does not "
+                            f"match mime-type {mime}")
 
-                            return post
+    def _check_file_exists(self, name):
 
-                        else:
-                            return False
+        if name not in self.names:
+            raise FileNotFoundError(f"{name} not found in zip file")
 
-    def _extract_posts(self, zipf):
+    def _read_file_from_zip(self, name):
 
-        json = loads(self._read_file_from_zip(zipf, 'posts/your_posts.json'))
+        self._check_file_exists(name)
 
-        posts = []
+        content = self.zipf.read(name)
+        self._check_file_magic(name, content[:MAGIC_BUFFER_SIZE])
 
-        if 'status_updates' in json.keys():
-            for post in json['status_updates']:
-                media = self._has_attachment(zipf, post)
+        return content
 
-                if media:
-                    post = media
+    def _get_extracted_zipsize(self):
 
-                posts.append(post)
+        size = 0
 
-        else:
-            raise KeyError('key status_updates not found in json')
+        for entry in self.zipf.filelist:
+            size += entry.file_size
 
-        return posts
+        return size
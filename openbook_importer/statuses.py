@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.cache import cache
+
+IMPORT_STATUS_CACHE_KEY = 'archive-import-%d-%s'
+
+IMPORT_STATUS_PENDING = 'pending'
+IMPORT_STATUS_IMPORTING = 'importing'
+IMPORT_STATUS_DONE = 'done'
+IMPORT_STATUS_FAILED = 'failed'
+
+
+def get_import_status(user_id, import_uuid):
+    return cache.get(IMPORT_STATUS_CACHE_KEY % (user_id, import_uuid))
+
+
+def set_import_status(user_id, import_uuid, status, posts_count=None, imported_posts_count=0):
+    cache.set(IMPORT_STATUS_CACHE_KEY % (user_id, import_uuid), {
+        'status': status,
+        'posts_count': posts_count,
+        'imported_posts_count': imported_posts_count,
+    }, settings.ARCHIVE_IMPORT_STATUS_TTL)
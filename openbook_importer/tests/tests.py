@@ -1,9 +1,14 @@
+from unittest import mock
+
 from django.urls import reverse
+from django_rq import get_worker
 from rest_framework import status
+from rq import SimpleWorker
 from openbook_common.tests.models import OpenbookAPITestCase
 
 from openbook_common.tests.helpers import make_user
 from openbook_common.tests.helpers import make_authentication_headers_for_user
+from openbook_posts.models import Post
 
 
 # DISABLED
@@ -79,3 +84,125 @@ class UploadFileTests(OpenbookAPITestCase):
 
         response = self.client.get(reverse('posts'), **headers)
         self.assertEqual(len(response.json()), number_of_posts)
+
+
+class ImportArchiveTests(OpenbookAPITestCase):
+
+    fixtures = [
+        'openbook_circles/fixtures/circles.json'
+    ]
+
+    def test_import_archive_in_background(self):
+        """
+        should accept the archive right away, import its posts in the
+        background and report the progress of the import
+        """
+
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        response = self._upload_archive(
+            'openbook_importer/tests/facebook-jaybeenote5.zip', headers)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        import_uuid = response.json()['import_uuid']
+
+        response = self.client.get(self._get_status_url(import_uuid),
+                                   **headers)
+        self.assertEqual(response.json()['status'], 'pending')
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        number_of_posts = 9
+
+        response = self.client.get(self._get_status_url(import_uuid),
+                                   **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {
+            'status': 'done',
+            'posts_count': number_of_posts,
+            'imported_posts_count': number_of_posts
+        })
+
+        self.assertEqual(Post.objects.filter(
+            creator=user, status=Post.STATUS_PUBLISHED).count(),
+            number_of_posts)
+
+        # text posts keep the date they were posted on
+        self.assertTrue(Post.objects.filter(
+            creator=user, text='i like food',
+            created__year=2018).exists())
+
+    def test_import_archive_twice(self):
+        """
+        should skip the posts imported before when importing an archive
+        again
+        """
+
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        for i in range(0, 2):
+            response = self._upload_archive(
+                'openbook_importer/tests/facebook-jaybeenote5.zip', headers)
+            self.assertEqual(response.status_code,
+                             status.HTTP_202_ACCEPTED)
+
+            get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        number_of_posts = 9
+
+        self.assertEqual(Post.objects.filter(creator=user).count(),
+                         number_of_posts)
+
+    def test_import_archive_failing_unexpectedly(self):
+        """
+        should report the import as failed when it fails unexpectedly
+        """
+
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        response = self._upload_archive(
+            'openbook_importer/tests/facebook-jaybeenote5.zip', headers)
+        import_uuid = response.json()['import_uuid']
+
+        with mock.patch('openbook_importer.jobs._import_media_post',
+                        side_effect=RuntimeError('Unexpected')):
+            get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        response = self.client.get(self._get_status_url(import_uuid),
+                                   **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['status'], 'failed')
+
+    def test_import_archive_status_of_other_user(self):
+        """
+        should not report the status of the import of another user
+        """
+
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        response = self._upload_archive(
+            'openbook_importer/tests/facebook-jaybeenote5.zip', headers)
+        import_uuid = response.json()['import_uuid']
+
+        other_user_headers = make_authentication_headers_for_user(
+            make_user())
+        response = self.client.get(self._get_status_url(import_uuid),
+                                   **other_user_headers)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+    def _upload_archive(self, archive_path, headers):
+
+        with open(archive_path, 'rb') as fd:
+            return self.client.post(reverse('uploads'), {'file': fd},
+                                    **headers)
+
+    def _get_status_url(self, import_uuid):
+
+        return reverse('upload-status', kwargs={'import_uuid': import_uuid})
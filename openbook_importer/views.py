@@ -1,19 +1,20 @@
-from datetime import datetime
+import uuid
 from json import JSONDecodeError
+from zipfile import BadZipFile
 
 from rest_framework import status
 
 from openbook_moderation.permissions import IsNotSuspended
-from openbook_posts.models import Post
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.core.files.images import ImageFile
-from django.utils.dateparse import parse_datetime
 from rest_framework.permissions import IsAuthenticated
 from django.utils.translation import ugettext_lazy as _
 
+from openbook_importer.archives import save_archive
+from openbook_importer.jobs import import_archive
 from openbook_importer.serializers import ZipfileSerializer
 from openbook_importer.socialmedia_archive_parser.fb_parser import zip_parser
+from openbook_importer.statuses import get_import_status, set_import_status, IMPORT_STATUS_PENDING
 
 
 class ImportItem(APIView):
@@ -26,10 +27,13 @@ class ImportItem(APIView):
 
         zipfile = request.FILES['file']
 
+        # Only the index of the archive and its posts get read here, the
+        # posts get imported in the background
         try:
             p = zip_parser(zipfile)
+            p.get_posts()
 
-        except FileNotFoundError:
+        except (BadZipFile, BufferError, FileNotFoundError, KeyError):
             return self._return_invalid()
 
         except JSONDecodeError:
@@ -38,56 +42,18 @@ class ImportItem(APIView):
         except TypeError:
             return self._return_malicious()
 
-        if p.profile.posts:
-            self.save_posts(p.profile.posts, request.user)
+        import_uuid = str(uuid.uuid4())
+        archive_name = save_archive(zipfile)
 
-        return Response({
-            'message': _('done')
-        }, status=status.HTTP_200_OK)
-
-    def save_posts(self, posts, user):
-
-        for post in posts:
-            image = None
-            images = None
-            text = None
-            timestamp = post['timestamp']
-            created = datetime.fromtimestamp(timestamp)
-            created = parse_datetime(created.strftime('%Y-%m-%d %T+00:00'))
-
-            if 'attachments' in post.keys():
-                images = self._get_media_content(post)
-
-            if 'data' in post.keys() and len(post['data']) != 0:
-                text = post['data'][0]['post']
-
-            if images:
-                image = images[0]
-
-                if 'text' in image.keys():
-                    text = image['text']
-
-                image = ImageFile(image['file'])
-
-            if not Post.objects.filter(creator=user.pk, text=text, created=created).exists():
-                user.create_public_post(text=text, image=image, created=created)
-
-    def _get_media_content(self, post):
-
-        images = []
-        image = {}
+        set_import_status(user_id=request.user.pk, import_uuid=import_uuid,
+                          status=IMPORT_STATUS_PENDING)
+        import_archive.delay(user_id=request.user.pk, import_uuid=import_uuid,
+                             archive_name=archive_name)
 
-        for attachment in post['attachments']:
-            for data in attachment['data']:
-                image['file'] = data['media']['uri'][1]
-
-                if 'description' in data['media'].keys():
-                    image['text'] = data['media']['description']
-
-                images.append(image)
-                image = {}
-
-        return images
+        return Response({
+            'message': _('importing'),
+            'import_uuid': import_uuid
+        }, status=status.HTTP_202_ACCEPTED)
 
     def _return_invalid(self):
 
@@ -102,3 +68,19 @@ class ImportItem(APIView):
         return Response({
             'message':_('invalid archive')
         }, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ImportItemStatus(APIView):
+
+    permission_classes = (IsAuthenticated, IsNotSuspended)
+
+    def get(self, request, import_uuid):
+        import_status = get_import_status(user_id=request.user.pk,
+                                          import_uuid=str(import_uuid))
+
+        if not import_status:
+            return Response({
+                'message': _('import not found')
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(import_status, status=status.HTTP_200_OK)
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.5 on 2026-10-18 07:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_moderation', '0013_auto_20190909_1236'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlockedMediaHash',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash', models.CharField(db_index=True, max_length=64, verbose_name='hash')),
+                ('moderated_object', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocked_media_hashes', to='openbook_moderation.ModeratedObject')),
+            ],
+            options={
+                'unique_together': {('moderated_object', 'hash')},
+            },
+        ),
+    ]
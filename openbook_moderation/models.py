@@ -2,12 +2,15 @@ from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils.translation import ugettext_lazy as _
 
 # Create your models here.
 from django.utils import timezone
 
 from openbook_auth.models import User
+from openbook_auth.suspensions import delete_cached_suspension_expiration
 from openbook_common.utils.model_loaders import get_post_model, get_post_comment_model, get_community_model, \
     get_user_model, get_moderation_penalty_model
 
@@ -222,7 +225,9 @@ class ModeratedObject(models.Model):
                 content_object.soft_delete()
 
                 if moderation_severity == ModerationCategory.SEVERITY_CRITICAL and isinstance(content_object, Post):
-                    # We have hashes
+                    # The media can not be posted again once removed
+                    BlockedMediaHash.block_hashes_for_moderated_object_with_id(
+                        hashes=content_object.get_media_hashes(), moderated_object_id=self.pk)
                     content_object.delete_media()
 
         content_object.save()
@@ -234,6 +239,7 @@ class ModeratedObject(models.Model):
         ModeratedObjectVerifiedChangedLog.create_moderated_object_verified_changed_log(
             changed_from=current_verified, changed_to=self.verified, moderated_object_id=self.pk, actor_id=actor_id)
         self.user_penalties.all().delete()
+        self.blocked_media_hashes.all().delete()
         content_object = self.content_object
 
         Post = get_post_model()
@@ -340,6 +346,36 @@ class ModerationPenalty(models.Model):
                                   expiration=expiration)
 
 
+@receiver(post_save, sender=ModerationPenalty, dispatch_uid='moderation_penalty_saved_delete_cached_suspension')
+@receiver(post_delete, sender=ModerationPenalty, dispatch_uid='moderation_penalty_deleted_delete_cached_suspension')
+def delete_moderation_penalty_user_cached_suspension(sender, instance, **kwargs):
+    """
+    Penalties get deleted when unverifying their moderated object and along with it when cascading
+    """
+    delete_cached_suspension_expiration(user_id=instance.user_id)
+
+
+class BlockedMediaHash(models.Model):
+    """
+    The hash of media removed at critical severity, media with the same hash can not be posted again
+    """
+    moderated_object = models.ForeignKey(ModeratedObject, on_delete=models.CASCADE,
+                                         related_name='blocked_media_hashes')
+    hash = models.CharField(_('hash'), max_length=64, blank=False, null=False, db_index=True)
+
+    class Meta:
+        unique_together = ('moderated_object', 'hash',)
+
+    @classmethod
+    def block_hashes_for_moderated_object_with_id(cls, hashes, moderated_object_id):
+        cls.objects.bulk_create([cls(hash=hash, moderated_object_id=moderated_object_id) for hash in set(hashes)],
+                                ignore_conflicts=True)
+
+    @classmethod
+    def is_hash_blocked(cls, hash):
+        return cls.objects.filter(hash=hash).exists()
+
+
 class ModeratedObjectLog(models.Model):
     actor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', null=True)
 
@@ -16,12 +16,10 @@ class IsNotSuspended(BasePermission):
 
 def check_user_is_not_suspended(user):
     if not user.is_anonymous:
-        is_suspended = user.is_suspended()
-        if is_suspended:
-            longest_suspension = user.get_longest_moderation_suspension()
-
+        suspension_expiration = user.get_suspension_expiration()
+        if suspension_expiration:
             raise PermissionDenied(
                 _('Your account has been suspended and will be unsuspended in %s' % naturaltime(
-                    longest_suspension.expiration)))
+                    suspension_expiration)))
 
     return True
@@ -5,8 +5,11 @@ from PIL import Image
 from django.core.files import File
 from django.urls import reverse
 from django.utils import timezone
+from django_rq import get_worker
 from faker import Faker
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rq import SimpleWorker
 from openbook_common.tests.models import OpenbookAPITestCase
 
 from openbook_auth.models import User
@@ -15,9 +18,10 @@ from openbook_common.tests.helpers import make_global_moderator, make_user, make
     make_community, make_fake_post_text, make_fake_post_comment_text, make_moderated_object, make_moderated_object_log, \
     make_moderated_object_report
 from openbook_communities.models import Community
+from openbook_communities.trending import get_trending_communities_ids
 from openbook_moderation.models import ModeratedObject, ModeratedObjectDescriptionChangedLog, \
     ModeratedObjectCategoryChangedLog, ModerationPenalty, ModerationCategory, ModeratedObjectStatusChangedLog, \
-    ModeratedObjectVerifiedChangedLog
+    ModeratedObjectVerifiedChangedLog, BlockedMediaHash
 from openbook_posts.models import Post, PostComment
 
 fake = Faker()
@@ -2147,6 +2151,9 @@ class VerifyModeratedObjectApiTests(OpenbookAPITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+        # The posts get soft deleted in the background
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post.refresh_from_db()
         community.refresh_from_db()
         post_comment.refresh_from_db()
@@ -2263,6 +2270,9 @@ class VerifyModeratedObjectApiTests(OpenbookAPITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+        # The posts get soft deleted in the background
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         self.assertTrue(len(post_ids), Post.objects.filter(
             community_id=community.pk,
             is_deleted=True,
@@ -3062,6 +3072,53 @@ class VerifyModeratedObjectApiTests(OpenbookAPITestCase):
         with self.assertRaises(FileNotFoundError):
             file = post.image.image.file
 
+    def test_on_critical_severity_post_moderated_object_verify_should_block_media_hash(self):
+        """
+        on critical severity post moderated object, verify should keep the same image from being posted again
+        """
+        global_moderator = make_global_moderator()
+
+        post_creator = make_user()
+
+        image = Image.new('RGB', (100, 100))
+        tmp_file = tempfile.NamedTemporaryFile(suffix='.jpg')
+        image.save(tmp_file)
+        tmp_file.seek(0)
+
+        post = post_creator.create_public_post(text=make_fake_post_text(), image=File(tmp_file))
+
+        # Published once its media is processed
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+        post.refresh_from_db()
+
+        reporter_user = make_user()
+        report_category = make_moderation_category(severity=ModerationCategory.SEVERITY_CRITICAL)
+
+        reporter_user.report_post(post=post, category_id=report_category.pk)
+
+        moderated_object = ModeratedObject.get_or_create_moderated_object_for_post(post=post,
+                                                                                   category_id=report_category.pk)
+
+        global_moderator.approve_moderated_object(moderated_object=moderated_object)
+
+        url = self._get_url(moderated_object=moderated_object)
+        headers = make_authentication_headers_for_user(global_moderator)
+        response = self.client.post(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertTrue(BlockedMediaHash.objects.filter(moderated_object=moderated_object).exists())
+
+        post.refresh_from_db()
+
+        with self.assertRaises(FileNotFoundError):
+            file = post.image.image.file
+
+        tmp_file.seek(0)
+
+        with self.assertRaises(ValidationError):
+            make_user().create_public_post(text=make_fake_post_text(), image=File(tmp_file))
+
     def _get_url(self, moderated_object):
         return reverse('verify-moderated-object', kwargs={
             'moderated_object_id': moderated_object.pk
@@ -3563,6 +3620,141 @@ class UnverifyModeratedObjectApiTests(OpenbookAPITestCase):
             verified=True
         ).exists())
 
+    def test_unverifying_critical_severity_user_moderated_object_keeps_verified_posts_and_communities(self):
+        """
+        unverifying a critical severity user moderated object should not restore its posts, comments and
+        communities soft deleted by their own verified moderated objects, and should keep the deleted communities out
+        of trending
+        """
+        global_moderator = make_global_moderator()
+
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+        community = make_community(creator=user, type=Community.COMMUNITY_TYPE_PUBLIC)
+        verified_community = make_community(creator=user, type=Community.COMMUNITY_TYPE_PUBLIC)
+        Community.rebuild_trending_communities()
+
+        restored_post = user.create_public_post(text=make_fake_post_text())
+        post_commenter = make_user()
+        post_comment = post_commenter.comment_post(post=restored_post, text=make_fake_post_comment_text())
+        verified_post_comment = post_commenter.comment_post(post=restored_post, text=make_fake_post_comment_text())
+
+        reporter_user = make_user()
+        report_category = make_moderation_category(severity=ModerationCategory.SEVERITY_CRITICAL)
+
+        reporter_user.report_comment_for_post(post_comment=verified_post_comment, post=restored_post,
+                                              category_id=report_category.pk)
+        post_comment_moderated_object = ModeratedObject.get_or_create_moderated_object_for_post_comment(
+            post_comment=verified_post_comment, category_id=report_category.pk)
+        global_moderator.approve_moderated_object(moderated_object=post_comment_moderated_object)
+        global_moderator.verify_moderated_object(moderated_object=post_comment_moderated_object)
+
+        reporter_user.report_post(post=post, category_id=report_category.pk)
+        post_moderated_object = ModeratedObject.get_or_create_moderated_object_for_post(
+            post=post, category_id=report_category.pk)
+        global_moderator.approve_moderated_object(moderated_object=post_moderated_object)
+        global_moderator.verify_moderated_object(moderated_object=post_moderated_object)
+
+        reporter_user.report_community(community=verified_community, category_id=report_category.pk)
+        community_moderated_object = ModeratedObject.get_or_create_moderated_object_for_community(
+            community=verified_community, category_id=report_category.pk)
+        global_moderator.approve_moderated_object(moderated_object=community_moderated_object)
+        global_moderator.verify_moderated_object(moderated_object=community_moderated_object)
+
+        reporter_user.report_user(user=user, category_id=report_category.pk)
+        moderated_object = ModeratedObject.get_or_create_moderated_object_for_user(user=user,
+                                                                                   category_id=report_category.pk)
+        global_moderator.approve_moderated_object(moderated_object=moderated_object)
+        global_moderator.verify_moderated_object(moderated_object=moderated_object)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        self.assertNotIn(community.pk, get_trending_communities_ids(count=100))
+
+        url = self._get_url(moderated_object=moderated_object)
+        headers = make_authentication_headers_for_user(global_moderator)
+        response = self.client.post(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        post.refresh_from_db()
+        community.refresh_from_db()
+        verified_community.refresh_from_db()
+
+        self.assertTrue(post.is_deleted)
+        self.assertFalse(community.is_deleted)
+        self.assertTrue(verified_community.is_deleted)
+
+        restored_post.refresh_from_db()
+        post_comment.refresh_from_db()
+        verified_post_comment.refresh_from_db()
+
+        self.assertFalse(restored_post.is_deleted)
+        self.assertFalse(post_comment.is_deleted)
+        self.assertTrue(verified_post_comment.is_deleted)
+        self.assertEqual(restored_post.comments_count, 1)
+
+        trending_communities_ids = get_trending_communities_ids(count=100)
+        self.assertIn(community.pk, trending_communities_ids)
+        self.assertNotIn(verified_community.pk, trending_communities_ids)
+
+    def test_unverifying_critical_severity_user_moderated_object_restores_its_posts_and_communities(self):
+        """
+        unverifying a critical severity user moderated object should restore its posts, their comments and its
+        communities
+        """
+        global_moderator = make_global_moderator()
+
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+
+        post_commenter = make_user()
+        post_comment = post_commenter.comment_post(post=post, text=make_fake_post_comment_text())
+        post_commenter.reply_to_comment_for_post(post_comment=post_comment, post=post,
+                                                 text=make_fake_post_comment_text())
+
+        community = make_community(creator=user)
+
+        reporter_user = make_user()
+        report_category = make_moderation_category(severity=ModerationCategory.SEVERITY_CRITICAL)
+
+        reporter_user.report_user(user=user, category_id=report_category.pk)
+
+        moderated_object = ModeratedObject.get_or_create_moderated_object_for_user(user=user,
+                                                                                   category_id=report_category.pk)
+
+        global_moderator.approve_moderated_object(moderated_object=moderated_object)
+        global_moderator.verify_moderated_object(moderated_object=moderated_object)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        post.refresh_from_db()
+        post_comment.refresh_from_db()
+
+        self.assertTrue(post.is_deleted)
+        self.assertEqual(post.comments_count, 0)
+        self.assertEqual(post_comment.replies_count, 0)
+
+        url = self._get_url(moderated_object=moderated_object)
+        headers = make_authentication_headers_for_user(global_moderator)
+        response = self.client.post(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        post.refresh_from_db()
+        community.refresh_from_db()
+        post_comment.refresh_from_db()
+
+        self.assertFalse(post.is_deleted)
+        self.assertFalse(community.is_deleted)
+        self.assertFalse(post_comment.is_deleted)
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(post_comment.replies_count, 1)
+
     def test_creates_verified_changed_log_on_unverify(self):
         """
         should create a verified changed log on unverify
@@ -1,32 +1,33 @@
-from hashlib import sha256
-import onesignal as onesignal_sdk
-from django.conf import settings
 from django_rq import job
 
 from openbook_common.utils.model_loaders import get_user_model
-
-onesignal_client = onesignal_sdk.Client(
-    app_id=settings.ONE_SIGNAL_APP_ID,
-    app_auth_key=settings.ONE_SIGNAL_API_KEY
-)
+from openbook_notifications.push_notifications import pop_queued_push_notifications, coalesce_push_notifications, \
+    send_push_notifications_to_user
 
 
 @job
-def send_notification_to_user_with_id(user_id, notification):
+def send_queued_push_notifications_to_user_with_id(user_id):
+    post_bodies = pop_queued_push_notifications(user_id=user_id)
+
+    if not post_bodies:
+        return
+
     User = get_user_model()
-    user = User.objects.only('username', 'uuid', 'id').get(pk=user_id)
 
-    for device in user.devices.all():
-        notification.set_parameter('ios_badgeType', 'Increase')
-        notification.set_parameter('ios_badgeCount', '1')
+    try:
+        user = User.objects.only('uuid', 'id').get(pk=user_id)
+    except User.DoesNotExist:
+        return
 
-        user_id_contents = (str(user.uuid) + str(user.id)).encode('utf-8')
+    send_push_notifications_to_user(user=user, post_bodies_with_counts=coalesce_push_notifications(post_bodies))
 
-        user_id = sha256(user_id_contents).hexdigest()
 
-        notification.set_filters([
-            {"field": "tag", "key": "user_id", "relation": "=", "value": user_id},
-            {"field": "tag", "key": "device_uuid", "relation": "=", "value": device.uuid},
-        ])
+@job
+def send_notification_to_user_with_id(user_id, notification):
+    """
+    Sends a single notification, left for the jobs enqueued before notifications got queued per user
+    """
+    User = get_user_model()
+    user = User.objects.only('uuid', 'id').get(pk=user_id)
 
-        onesignal_client.send_notification(notification)
+    send_push_notifications_to_user(user=user, post_bodies_with_counts=[(notification.post_body, 1)])
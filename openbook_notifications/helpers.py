@@ -4,7 +4,8 @@ from django.utils.translation import ugettext_lazy as _
 import onesignal as onesignal_sdk
 
 from openbook_common.utils.model_loaders import get_notification_model
-from openbook_notifications.django_rq_jobs import send_notification_to_user_with_id
+from openbook_notifications.django_rq_jobs import send_queued_push_notifications_to_user_with_id
+from openbook_notifications.push_notifications import queue_push_notification
 from openbook_translation import translation_strategy
 
 import logging
@@ -80,6 +81,7 @@ def send_follow_push_notification(followed_user, following_user):
 
         notification_data = {
             'type': Notification.FOLLOW,
+            'following_user_id': following_user.pk,
         }
 
         one_signal_notification.set_parameter('data', notification_data)
@@ -102,6 +104,7 @@ def send_connection_request_push_notification(connection_requester, connection_r
 
         notification_data = {
             'type': Notification.CONNECTION_REQUEST,
+            'connection_requester_id': connection_requester.pk,
         }
 
         one_signal_notification.set_parameter('data', notification_data)
@@ -220,6 +223,7 @@ def send_community_invite_push_notification(community_invite):
 
         notification_data = {
             'type': Notification.COMMUNITY_INVITE,
+            'community_invite_id': community_invite.pk,
         }
 
         one_signal_notification.set_parameter('data', notification_data)
@@ -235,4 +239,5 @@ def get_notification_language_code_for_target_user(target_user):
 
 
 def _send_notification_to_user(user, notification):
-    send_notification_to_user_with_id.delay(user_id=user.pk, notification=notification)
\ No newline at end of file
+    if queue_push_notification(user_id=user.pk, notification=notification):
+        send_queued_push_notifications_to_user_with_id.delay(user_id=user.pk)
\ No newline at end of file
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+import logging
+
+from django.db.models import Count
+
+from openbook_common.utils.model_loaders import get_notification_model
+from openbook_notifications.unread_counts import get_cached_unread_notifications_counts_users_ids, \
+    get_cached_unread_notifications_count, cache_unread_notifications_count
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Recounts the cached unread notifications counts of users and fixes the ones that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='The amount of users to reconcile the unread notifications count of at once')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        users_ids = get_cached_unread_notifications_counts_users_ids()
+
+        reconciled_users = 0
+        for i in range(0, len(users_ids), batch_size):
+            reconciled_users = reconciled_users + self._reconcile_users(users_ids=users_ids[i:i + batch_size])
+
+        logger.info('Reconciled the unread notifications counts of %d out of %d users' % (
+            reconciled_users, len(users_ids)))
+
+    def _reconcile_users(self, users_ids):
+        Notification = get_notification_model()
+
+        actual_counts = {count['owner_id']: count['count'] for count in
+                         Notification.objects.filter(owner_id__in=users_ids, read=False).values('owner_id').annotate(
+                             count=Count('id'))}
+
+        reconciled_users = 0
+
+        for user_id in users_ids:
+            actual_count = actual_counts.get(user_id, 0)
+
+            if get_cached_unread_notifications_count(user_id=user_id) != actual_count:
+                cache_unread_notifications_count(user_id=user_id, count=actual_count, overwrite=True)
+                reconciled_users = reconciled_users + 1
+
+        return reconciled_users
@@ -1,9 +1,17 @@
+from collections import defaultdict
+
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 
 from openbook_auth.models import User
+from openbook_notifications.unread_counts import increment_cached_unread_notifications_counts
+
+NOTIFICATION_DELETED_DISPATCH_UID = 'notification_deleted_decrement_unread_count'
 
 
 class Notification(models.Model):
@@ -46,13 +54,110 @@ class Notification(models.Model):
     def create_notification(cls, owner_id, type, content_object):
         return cls.objects.create(notification_type=type, content_object=content_object, owner_id=owner_id)
 
+    @classmethod
+    def create_notifications(cls, type, owners_ids_and_content_objects):
+        # Bulk creation skips save, so the timestamps and unread counts are updated here
+        created = timezone.now()
+
+        notifications = cls.objects.bulk_create([
+            cls(notification_type=type, content_object=content_object, owner_id=owner_id, created=created) for
+            owner_id, content_object in owners_ids_and_content_objects
+        ])
+
+        owners_ids_amounts = defaultdict(int)
+        for notification in notifications:
+            owners_ids_amounts[notification.owner_id] += 1
+
+        increment_cached_unread_notifications_counts(users_ids_amounts=owners_ids_amounts)
+
+        return notifications
+
+    @classmethod
+    def prefetch_content_objects(cls, notifications, content_objects_querysets):
+        """
+        Loads the content objects of the notifications with a query per content type instead of per notification.
+        The content objects of a model get retrieved from its queryset in content_objects_querysets if any, to select
+        or prefetch what they are used with along.
+        """
+        objects_ids_by_content_type_id = defaultdict(set)
+
+        for notification in notifications:
+            objects_ids_by_content_type_id[notification.content_type_id].add(notification.object_id)
+
+        content_objects = {}
+
+        for content_type_id, objects_ids in objects_ids_by_content_type_id.items():
+            content_type_model = ContentType.objects.get_for_id(content_type_id).model_class()
+
+            if content_type_model is None:
+                continue
+
+            queryset = content_objects_querysets.get(content_type_model, content_type_model.objects.all())
+
+            for content_object in queryset.filter(pk__in=objects_ids):
+                content_objects[(content_type_id, content_object.pk)] = content_object
+
+        content_object_field = cls._meta.get_field('content_object')
+
+        for notification in notifications:
+            content_object = content_objects.get((notification.content_type_id, notification.object_id))
+            if content_object is not None:
+                content_object_field.set_cached_value(notification, content_object)
+
+        return notifications
+
+    @classmethod
+    def delete_notifications_for_content_objects(cls, content_objects):
+        """
+        Deletes the given queryset of content objects along with their notifications with a handful of queries,
+        whatever their amount. The unread counts of the owners of the notifications get updated once here, instead of
+        once per deleted notification.
+        """
+        content_type = ContentType.objects.get_for_model(content_objects.model)
+
+        with transaction.atomic():
+            notifications = cls.objects.filter(content_type=content_type,
+                                               object_id__in=content_objects.values('pk'))
+
+            unread_counts = notifications.filter(read=False).order_by().values('owner_id').annotate(
+                count=Count('id'))
+            owners_ids_amounts = {unread_count['owner_id']: -unread_count['count'] for unread_count in unread_counts}
+
+            # The unread counts of the owners are updated once below, not per deleted notification
+            post_delete.disconnect(sender=cls, dispatch_uid=NOTIFICATION_DELETED_DISPATCH_UID)
+            try:
+                notifications.delete()
+            finally:
+                post_delete.connect(decrement_notification_owner_unread_count, sender=cls,
+                                    dispatch_uid=NOTIFICATION_DELETED_DISPATCH_UID)
+
+            content_objects.delete()
+
+            increment_cached_unread_notifications_counts(users_ids_amounts=owners_ids_amounts)
+
     @classmethod
     def get_notification_types_values(cls):
         return [a for (a, b) in Notification.NOTIFICATION_TYPES]
 
     def save(self, *args, **kwargs):
         ''' On save, update timestamps '''
+        is_unread_notification_creation = not self.id and not self.read
+
         if not self.id and not self.created:
             self.created = timezone.now()
 
-        return super(Notification, self).save(*args, **kwargs)
+        notification = super(Notification, self).save(*args, **kwargs)
+
+        if is_unread_notification_creation:
+            increment_cached_unread_notifications_counts(users_ids_amounts={self.owner_id: 1})
+
+        return notification
+
+
+@receiver(post_delete, sender=Notification, dispatch_uid=NOTIFICATION_DELETED_DISPATCH_UID)
+def decrement_notification_owner_unread_count(sender, instance, **kwargs):
+    """
+    Notifications get deleted along with what they notify about, not only through the notifications endpoints
+    """
+    if not instance.read:
+        increment_cached_unread_notifications_counts(users_ids_amounts={instance.owner_id: -1})
@@ -18,6 +18,22 @@ class PostCommentUserMentionNotification(models.Model):
                                          owner_id=owner_id)
         return post_comment_user_mention_notification
 
+    @classmethod
+    def create_post_comment_user_mention_notifications(cls, post_comment_user_mentions):
+        cls.objects.bulk_create([cls(post_comment_user_mention=post_comment_user_mention) for
+                                 post_comment_user_mention in post_comment_user_mentions])
+
+        post_comment_user_mention_notifications = cls.objects.select_related('post_comment_user_mention').filter(
+            post_comment_user_mention__in=post_comment_user_mentions)
+
+        Notification.create_notifications(type=Notification.POST_COMMENT_USER_MENTION,
+                                          owners_ids_and_content_objects=[
+                                              (post_comment_user_mention_notification.post_comment_user_mention.user_id,
+                                               post_comment_user_mention_notification) for
+                                              post_comment_user_mention_notification in
+                                              post_comment_user_mention_notifications
+                                          ])
+
     @classmethod
     def delete_post_comment_user_mention_notification(cls, post_comment_user_mention_id, owner_id):
         cls.objects.filter(post_comment_user_mention_id=post_comment_user_mention_id,
@@ -17,6 +17,18 @@ class PostUserMentionNotification(models.Model):
                                          owner_id=owner_id)
         return post_user_mention_notification
 
+    @classmethod
+    def create_post_user_mention_notifications(cls, post_user_mentions):
+        cls.objects.bulk_create([cls(post_user_mention=post_user_mention) for post_user_mention in post_user_mentions])
+
+        post_user_mention_notifications = cls.objects.select_related('post_user_mention').filter(
+            post_user_mention__in=post_user_mentions)
+
+        Notification.create_notifications(type=Notification.POST_USER_MENTION, owners_ids_and_content_objects=[
+            (post_user_mention_notification.post_user_mention.user_id, post_user_mention_notification) for
+            post_user_mention_notification in post_user_mention_notifications
+        ])
+
     @classmethod
     def delete_post_user_mention_notification(cls, post_user_mention_id, owner_id):
         cls.objects.filter(post_user_mention_id=post_user_mention_id,
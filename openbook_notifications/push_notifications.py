@@ -0,0 +1,123 @@
+import pickle
+from collections import OrderedDict
+from hashlib import sha256
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from openbook_notifications.push_transports import push_notifications_transport
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+PUSH_NOTIFICATIONS_QUEUE_KEY = 'ob-api-push-notifications-%d'
+
+
+def queue_push_notification(user_id, notification):
+    """
+    Queues the OneSignal notification for the user.
+    Returns whether it's the first one queued, then a job must be enqueued to send the queued notifications.
+    Everything queued until that job runs gets sent along.
+    """
+    key = PUSH_NOTIFICATIONS_QUEUE_KEY % user_id
+
+    redis = get_redis_connection('default')
+    queued_amount = redis.rpush(key, pickle.dumps(notification.post_body))
+
+    if queued_amount == 1:
+        # Only set when the queue gets created, so the queue of a job which got lost still expires and the next
+        # notification queued enqueues a job again
+        redis.expire(key, settings.PUSH_NOTIFICATIONS_QUEUE_TTL)
+
+    return queued_amount == 1
+
+
+def pop_queued_push_notifications(user_id):
+    """
+    Returns the post bodies of the notifications queued for the user, oldest first, and empties the queue
+    """
+    key = PUSH_NOTIFICATIONS_QUEUE_KEY % user_id
+
+    redis = get_redis_connection('default')
+    pipeline = redis.pipeline()
+    pipeline.lrange(key, 0, -1)
+    pipeline.delete(key)
+    queued_post_bodies, _ = pipeline.execute()
+
+    return [pickle.loads(queued_post_body) for queued_post_body in queued_post_bodies]
+
+
+def coalesce_push_notifications(post_bodies):
+    """
+    Keeps the latest notification of every type and group, e.g. one for all the reactions to a post.
+    Returns tuples of the kept post body and how many notifications it stands for.
+    """
+    coalesced_post_bodies = OrderedDict()
+
+    for post_body in post_bodies:
+        coalesce_key = _make_coalesce_key(post_body=post_body)
+        _, count = coalesced_post_bodies.pop(coalesce_key, (None, 0))
+        coalesced_post_bodies[coalesce_key] = (post_body, count + 1)
+
+    return list(coalesced_post_bodies.values())
+
+
+def _make_coalesce_key(post_body):
+    data = post_body.get('data', {})
+    thread_id = post_body.get('thread_id')
+
+    if thread_id:
+        return data.get('type'), thread_id
+
+    # Notifications without a group, e.g. follows, are only the same when about the same user or community
+    return data.get('type'), tuple(sorted(data.items()))
+
+
+def send_push_notifications_to_user(user, post_bodies_with_counts):
+    """
+    Sends every notification to all the devices of the user at once, in as few requests as OneSignal allows
+    """
+    devices_uuids = list(user.devices.values_list('uuid', flat=True))
+
+    if not devices_uuids:
+        return
+
+    user_tag = make_user_tag(user=user)
+    max_devices = settings.PUSH_NOTIFICATIONS_MAX_DEVICES_PER_REQUEST
+
+    devices_filters = [
+        make_devices_filters(user_tag=user_tag, devices_uuids=devices_uuids[i:i + max_devices])
+        for i in range(0, len(devices_uuids), max_devices)
+    ]
+
+    for post_body, count in post_bodies_with_counts:
+        for filters in devices_filters:
+            try:
+                push_notifications_transport.send_notification({
+                    **post_body,
+                    'ios_badgeType': 'Increase',
+                    'ios_badgeCount': str(count),
+                    'filters': filters,
+                })
+            except Exception as e:
+                # Don't lose the other notifications popped from the queue along with this one
+                logger.error('Failed to send push notification to user with id %d: %s' % (user.pk, e))
+
+
+def make_user_tag(user):
+    user_id_contents = (str(user.uuid) + str(user.id)).encode('utf-8')
+    return sha256(user_id_contents).hexdigest()
+
+
+def make_devices_filters(user_tag, devices_uuids):
+    filters = []
+
+    for device_uuid in devices_uuids:
+        if filters:
+            filters.append({"operator": "OR"})
+
+        filters.append({"field": "tag", "key": "user_id", "relation": "=", "value": user_tag})
+        filters.append({"field": "tag", "key": "device_uuid", "relation": "=", "value": device_uuid})
+
+    return filters
@@ -0,0 +1,95 @@
+"""
+Transports deliver push notifications, the one to use is configured with PUSH_NOTIFICATIONS_TRANSPORT_NAME
+among settings.PUSH_NOTIFICATIONS_TRANSPORTS_CONFIG
+"""
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+from onesignal.constants import ENDPOINTS
+from requests.adapters import HTTPAdapter
+
+
+class InvalidPushNotificationsTransportError(Exception):
+    pass
+
+
+class BasePushNotificationsTransport:
+
+    def __init__(self, params):
+        self.params = params
+
+    def send_notification(self, post_body):
+        """
+        Sends the OneSignal notification with the given post body
+        """
+        raise NotImplementedError
+
+
+class OneSignalTransport(BasePushNotificationsTransport):
+    """
+    Sends notifications to OneSignal over a pooled session, keeping its connections alive between notifications
+    """
+
+    def __init__(self, params):
+        super().__init__(params)
+        self.app_id = params['APP_ID']
+        self.api_key = params['API_KEY']
+        self.timeout = params['TIMEOUT']
+        self.url = ENDPOINTS['API_ROOT'] + ENDPOINTS['NOTIFICATIONS_PATH']
+
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=params['POOL_SIZE']))
+        self.session.headers.update({'Authorization': 'Basic %s' % self.api_key})
+
+    def send_notification(self, post_body):
+        response = self.session.post(self.url, json={**post_body, 'app_id': self.app_id}, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+
+class LocalTransport(BasePushNotificationsTransport):
+    """
+    Keeps the notifications it sends in memory instead of sending them anywhere.
+    Meant for tests and to benchmark the push notifications code paths offline, LATENCY simulates the round trip
+    in seconds.
+    """
+
+    def __init__(self, params):
+        super().__init__(params)
+        self.latency = float(params.get('LATENCY', 0))
+        self.sent_notifications = []
+        self._sent_notifications_lock = threading.Lock()
+
+    def send_notification(self, post_body):
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._sent_notifications_lock:
+            self.sent_notifications.append(post_body)
+
+    def clear_sent_notifications(self):
+        with self._sent_notifications_lock:
+            self.sent_notifications = []
+
+
+def create_push_notifications_transport(name):
+    if name not in settings.PUSH_NOTIFICATIONS_TRANSPORTS_CONFIG:
+        raise InvalidPushNotificationsTransportError(
+            "Could not find config for '%s' in settings.PUSH_NOTIFICATIONS_TRANSPORTS_CONFIG" % name
+        )
+
+    params = dict(settings.PUSH_NOTIFICATIONS_TRANSPORTS_CONFIG[name])
+    transport = params.pop('TRANSPORT')
+
+    try:
+        transport_cls = import_string(transport)
+    except ImportError as e:
+        raise InvalidPushNotificationsTransportError("Could not find transport '%s': %s" % (transport, e))
+
+    return transport_cls(params)
+
+
+push_notifications_transport = create_push_notifications_transport(settings.PUSH_NOTIFICATIONS_TRANSPORT_NAME)
@@ -524,6 +524,46 @@ class PostCommentUserMentionNotificationSerializer(serializers.ModelSerializer):
         )
 
 
+def _make_post_related_fields(prefix):
+    return [prefix, prefix + '__creator__profile', prefix + '__image', prefix + '__community']
+
+
+def _make_post_comment_related_fields(prefix):
+    return [prefix, prefix + '__commenter__profile', prefix + '__language',
+            prefix + '__parent_comment__commenter__profile', prefix + '__parent_comment__language'] + \
+           _make_post_related_fields(prefix + '__post')
+
+
+# What GetNotificationsNotificationSerializer serializes of every notification content object, to load it along
+NOTIFICATIONS_CONTENT_OBJECTS_QUERYSETS = {
+    PostCommentNotification: PostCommentNotification.objects.select_related(
+        *_make_post_comment_related_fields('post_comment')).prefetch_related('post_comment__post__circles'),
+    PostCommentReplyNotification: PostCommentReplyNotification.objects.select_related(
+        *_make_post_comment_related_fields('post_comment')).prefetch_related('post_comment__post__circles'),
+    PostCommentReactionNotification: PostCommentReactionNotification.objects.select_related(
+        'post_comment_reaction__reactor__profile', 'post_comment_reaction__emoji',
+        *_make_post_comment_related_fields('post_comment_reaction__post_comment')).prefetch_related(
+        'post_comment_reaction__post_comment__post__circles'),
+    PostReactionNotification: PostReactionNotification.objects.select_related(
+        'post_reaction__reactor__profile', 'post_reaction__emoji',
+        *_make_post_related_fields('post_reaction__post')).prefetch_related('post_reaction__post__circles'),
+    ConnectionRequestNotification: ConnectionRequestNotification.objects.select_related(
+        'connection_requester__profile'),
+    ConnectionConfirmedNotification: ConnectionConfirmedNotification.objects.select_related(
+        'connection_confirmator__profile'),
+    FollowNotification: FollowNotification.objects.select_related('follower__profile'),
+    PostCommentUserMentionNotification: PostCommentUserMentionNotification.objects.select_related(
+        'post_comment_user_mention__user__profile',
+        *_make_post_comment_related_fields('post_comment_user_mention__post_comment')).prefetch_related(
+        'post_comment_user_mention__post_comment__post__circles'),
+    PostUserMentionNotification: PostUserMentionNotification.objects.select_related(
+        'post_user_mention__user__profile', *_make_post_related_fields('post_user_mention__post')).prefetch_related(
+        'post_user_mention__post__circles'),
+    CommunityInviteNotification: CommunityInviteNotification.objects.select_related(
+        'community_invite__creator__profile', 'community_invite__community'),
+}
+
+
 class GetNotificationsNotificationSerializer(serializers.ModelSerializer):
     content_object = GenericRelatedField({
         PostCommentNotification: PostCommentNotificationSerializer(),
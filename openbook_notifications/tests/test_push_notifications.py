@@ -0,0 +1,145 @@
+import onesignal as onesignal_sdk
+from django_redis import get_redis_connection
+from django_rq import get_worker
+from faker import Faker
+from rq import SimpleWorker
+
+from openbook_common.tests.models import OpenbookAPITestCase
+from openbook_common.tests.helpers import make_user, make_device
+from openbook_notifications import helpers
+from openbook_notifications.models import Notification
+from openbook_notifications.push_notifications import pop_queued_push_notifications, make_user_tag, \
+    queue_push_notification, PUSH_NOTIFICATIONS_QUEUE_KEY
+from openbook_notifications.push_transports import push_notifications_transport
+
+fake = Faker()
+
+
+class PushNotificationsTests(OpenbookAPITestCase):
+    """
+    PushNotifications
+    """
+
+    def setUp(self):
+        super(PushNotificationsTests, self).setUp()
+        # Send the push notifications the base test case patches away
+        self.patcher.stop()
+        push_notifications_transport.clear_sent_notifications()
+
+    def tearDown(self):
+        # The base test case stops the patcher again
+        self.patcher.start()
+        super(PushNotificationsTests, self).tearDown()
+
+    def test_sends_notifications_to_all_devices_at_once(self):
+        """
+        should send a notification to all the devices of the user with a single request
+        """
+        user = make_user()
+        devices = [make_device(owner=user) for i in range(0, 3)]
+        pop_queued_push_notifications(user_id=user.pk)
+
+        helpers._send_notification_to_user(user=user,
+                                           notification=self._make_notification(type=Notification.FOLLOW))
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        sent_notifications = push_notifications_transport.sent_notifications
+
+        self.assertEqual(len(sent_notifications), 1)
+
+        filters_values = [device_filter['value'] for device_filter in sent_notifications[0]['filters'] if
+                          'value' in device_filter]
+
+        user_tag = make_user_tag(user=user)
+
+        for device in devices:
+            self.assertIn(device.uuid, filters_values)
+
+        self.assertEqual(filters_values.count(user_tag), len(devices))
+
+    def test_coalesces_queued_notifications_of_the_same_type_and_group(self):
+        """
+        should send one notification for all the queued notifications of the same type and group
+        """
+        user = make_user()
+        make_device(owner=user)
+        pop_queued_push_notifications(user_id=user.pk)
+
+        for i in range(0, 3):
+            helpers._send_notification_to_user(user=user, notification=self._make_notification(
+                type=Notification.POST_REACTION, group='post_1'))
+
+        helpers._send_notification_to_user(user=user, notification=self._make_notification(
+            type=Notification.POST_REACTION, group='post_2'))
+
+        helpers._send_notification_to_user(user=user, notification=self._make_notification(
+            type=Notification.FOLLOW))
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        sent_notifications = push_notifications_transport.sent_notifications
+
+        self.assertEqual(len(sent_notifications), 3)
+
+        badge_counts = {sent_notification.get('thread_id'): sent_notification['ios_badgeCount'] for
+                        sent_notification in sent_notifications}
+
+        self.assertEqual(badge_counts, {'post_1': '3', 'post_2': '1', None: '1'})
+
+    def test_does_not_coalesce_follows_of_different_users(self):
+        """
+        should send a notification for each user following, as follows are not grouped
+        """
+        user = make_user()
+        make_device(owner=user)
+        pop_queued_push_notifications(user_id=user.pk)
+
+        following_users = [make_user() for i in range(0, 2)]
+
+        for following_user in following_users:
+            helpers.send_follow_push_notification(followed_user=user, following_user=following_user)
+
+        helpers.send_follow_push_notification(followed_user=user, following_user=following_users[0])
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        sent_notifications = push_notifications_transport.sent_notifications
+
+        badge_counts = {sent_notification['data']['following_user_id']: sent_notification['ios_badgeCount'] for
+                        sent_notification in sent_notifications}
+
+        self.assertEqual(badge_counts, {following_users[0].pk: '2', following_users[1].pk: '1'})
+
+    def test_queue_expires_when_its_job_got_lost(self):
+        """
+        should only set the expiration of the queue when it gets created, so a queue whose job got lost expires
+        """
+        user = make_user()
+        pop_queued_push_notifications(user_id=user.pk)
+
+        self.assertTrue(queue_push_notification(user_id=user.pk,
+                                                notification=self._make_notification(type=Notification.FOLLOW)))
+
+        key = PUSH_NOTIFICATIONS_QUEUE_KEY % user.pk
+        redis = get_redis_connection('default')
+        redis.expire(key, 10)
+
+        self.assertFalse(queue_push_notification(user_id=user.pk,
+                                                 notification=self._make_notification(type=Notification.FOLLOW)))
+        self.assertLessEqual(redis.ttl(key), 10)
+
+        pop_queued_push_notifications(user_id=user.pk)
+
+    def _make_notification(self, type, group=None):
+        notification = onesignal_sdk.Notification(post_body={
+            "contents": {"en": fake.text(max_nb_chars=50)}
+        })
+
+        notification.set_parameter('data', {'type': type})
+
+        if group:
+            notification.set_parameter('!thread_id', group)
+            notification.set_parameter('android_group', group)
+
+        return notification
@@ -1,11 +1,15 @@
 import json
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from faker import Faker
 from rest_framework import status
 from openbook_common.tests.models import OpenbookAPITestCase
 
-from openbook_common.tests.helpers import make_user, make_authentication_headers_for_user, make_notification
+from openbook_common.tests.helpers import make_user, make_authentication_headers_for_user, make_notification, \
+    make_fake_post_text, make_fake_post_comment_text, make_emoji, make_reactions_emoji_group, make_moderation_penalty
 from openbook_notifications.models import Notification
 
 fake = Faker()
@@ -91,6 +95,42 @@ class NotificationsAPITests(OpenbookAPITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_retrieves_notifications_with_a_constant_amount_of_queries(self):
+        """
+        should retrieve the notifications with as many queries no matter how many there are and return 200
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+        post = user.create_public_post(text=make_fake_post_text())
+        emoji = make_emoji(group=make_reactions_emoji_group())
+
+        def make_notifications():
+            other_user = make_user()
+            other_user.comment_post_with_id(post_id=post.pk, text=make_fake_post_comment_text())
+            other_user.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+            other_user.follow_user_with_id(user_id=user.pk)
+
+        make_notifications()
+
+        url = self._get_url()
+
+        with CaptureQueriesContext(connection) as few_notifications_queries:
+            response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content)), 3)
+
+        for i in range(0, 2):
+            make_notifications()
+
+        with CaptureQueriesContext(connection) as more_notifications_queries:
+            response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content)), 9)
+
+        self.assertEqual(len(few_notifications_queries), len(more_notifications_queries))
+
     def test_can_delete_notifications(self):
         """
         should be able to delete all notifications and return 200
@@ -325,3 +365,90 @@ class ReadNotificationAPITests(OpenbookAPITestCase):
         return reverse('read-notification', kwargs={
             'notification_id': notification_id
         })
+
+
+class UnreadNotificationsCountAPITests(OpenbookAPITestCase):
+    """
+    UnreadNotificationsCountAPI
+    """
+
+    def test_can_retrieve_unread_notifications_count(self):
+        """
+        should be able to retrieve the unread notifications count and return 200
+        """
+        user = make_user()
+
+        headers = make_authentication_headers_for_user(user)
+
+        amount_of_followers = 3
+
+        for i in range(0, amount_of_followers):
+            follower = make_user()
+            follower.follow_user_with_id(user.pk)
+
+        url = self._get_url()
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        parsed_response = json.loads(response.content)
+
+        self.assertEqual(parsed_response['count'], amount_of_followers)
+
+    def test_cant_retrieve_unread_notifications_count_while_suspended(self):
+        """
+        should not be able to retrieve the unread notifications count while suspended and return 403
+        """
+        user = make_user()
+
+        headers = make_authentication_headers_for_user(user)
+
+        moderation_penalty = make_moderation_penalty(user=user)
+        moderation_penalty.expiration = timezone.now() + timezone.timedelta(days=1)
+        moderation_penalty.save()
+
+        url = self._get_url()
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_unread_notifications_count_follows_notifications_changes(self):
+        """
+        should keep the unread notifications count up to date as notifications are created, read and deleted
+        """
+        user = make_user()
+
+        headers = make_authentication_headers_for_user(user)
+        url = self._get_url()
+
+        first_follower = make_user()
+        first_follower.follow_user_with_id(user.pk)
+
+        # Cache the count before the changes
+        self.assertEqual(json.loads(self.client.get(url, **headers).content)['count'], 1)
+
+        followers = [make_user() for i in range(0, 3)]
+
+        for follower in followers:
+            follower.follow_user_with_id(user.pk)
+
+        self.assertEqual(json.loads(self.client.get(url, **headers).content)['count'], 4)
+
+        notification = user.notifications.filter(read=False).first()
+        user.read_notification_with_id(notification_id=notification.pk)
+        user.read_notification_with_id(notification_id=notification.pk)
+
+        self.assertEqual(json.loads(self.client.get(url, **headers).content)['count'], 3)
+
+        user.delete_notification_with_id(notification_id=user.notifications.filter(read=False).first().pk)
+
+        self.assertEqual(json.loads(self.client.get(url, **headers).content)['count'], 2)
+
+        user.read_notifications()
+
+        self.assertEqual(json.loads(self.client.get(url, **headers).content)['count'], 0)
+
+        self.assertEqual(user.notifications.filter(read=False).count(), 0)
+
+    def _get_url(self):
+        return reverse('unread-notifications-count')
@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.db import transaction
+from django_redis import get_redis_connection
+
+UNREAD_NOTIFICATIONS_COUNT_KEY_PREFIX = 'ob-api-unread-notifications-count-'
+
+# Counts are only maintained once cached, a count made from the database must not miss what was added meanwhile
+INCREMENT_EXISTING_COUNT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    local count = redis.call('INCRBY', KEYS[1], ARGV[1])
+    if count < 0 then
+        count = redis.call('INCRBY', KEYS[1], -count)
+    end
+    return count
+end
+return nil
+"""
+
+
+def get_cached_unread_notifications_count(user_id):
+    count = get_redis_connection('default').get(_make_unread_notifications_count_key(user_id))
+
+    if count is None:
+        return None
+
+    return int(count)
+
+
+def cache_unread_notifications_count(user_id, count, overwrite=False):
+    """
+    Caches a count made from the database for UNREAD_NOTIFICATIONS_COUNT_TTL.
+    Unless overwriting, a count cached meanwhile is kept as it's maintained since.
+    The count misses the notifications changed between counting and caching it, their increments found no count to
+    update, so it's kept for a short time only and then made again.
+    """
+    get_redis_connection('default').set(_make_unread_notifications_count_key(user_id), count,
+                                        ex=settings.UNREAD_NOTIFICATIONS_COUNT_TTL, nx=not overwrite)
+
+
+def increment_cached_unread_notifications_counts(users_ids_amounts):
+    """
+    Adds the amount to the cached count of every user id, if any, amounts can be negative.
+    Counts get updated once the current transaction, if any, commits.
+    """
+    users_ids_amounts = {user_id: amount for user_id, amount in users_ids_amounts.items() if amount}
+
+    if users_ids_amounts:
+        transaction.on_commit(lambda: _increment_cached_unread_notifications_counts(users_ids_amounts))
+
+
+def _increment_cached_unread_notifications_counts(users_ids_amounts):
+    redis = get_redis_connection('default')
+    increment_existing_count = redis.register_script(INCREMENT_EXISTING_COUNT_SCRIPT)
+    pipeline = redis.pipeline()
+
+    for user_id, amount in users_ids_amounts.items():
+        increment_existing_count(keys=[_make_unread_notifications_count_key(user_id)], args=[amount],
+                                 client=pipeline)
+
+    pipeline.execute()
+
+
+def delete_cached_unread_notifications_count(user_id):
+    get_redis_connection('default').delete(_make_unread_notifications_count_key(user_id))
+
+
+def get_cached_unread_notifications_counts_users_ids():
+    redis = get_redis_connection('default')
+    prefix_length = len(UNREAD_NOTIFICATIONS_COUNT_KEY_PREFIX)
+
+    return [int(key[prefix_length:]) for key in
+            redis.scan_iter(match=UNREAD_NOTIFICATIONS_COUNT_KEY_PREFIX + '*', count=1000)]
+
+
+def _make_unread_notifications_count_key(user_id):
+    return '%s%d' % (UNREAD_NOTIFICATIONS_COUNT_KEY_PREFIX, user_id)
@@ -7,8 +7,10 @@ from rest_framework.views import APIView
 
 from openbook_common.utils.helpers import normalize_list_value_in_request_data
 from openbook_moderation.permissions import IsNotSuspended
+from openbook_notifications.models import Notification
 from openbook_notifications.serializers import GetNotificationsSerializer, GetNotificationsNotificationSerializer, \
-    DeleteNotificationSerializer, ReadNotificationSerializer, ReadNotificationsSerializer
+    DeleteNotificationSerializer, ReadNotificationSerializer, ReadNotificationsSerializer, \
+    NOTIFICATIONS_CONTENT_OBJECTS_QUERYSETS
 
 
 class Notifications(APIView):
@@ -29,10 +31,17 @@ class Notifications(APIView):
         max_id = data.get('max_id')
         types = data.get('types')
 
-        notifications = user.get_notifications(max_id=max_id, types=types).order_by('-created')[:count]
+        notifications = list(user.get_notifications(max_id=max_id, types=types).order_by('-created')[:count])
+
+        Notification.prefetch_content_objects(notifications=notifications,
+                                              content_objects_querysets=NOTIFICATIONS_CONTENT_OBJECTS_QUERYSETS)
 
         response_serializer = GetNotificationsNotificationSerializer(notifications, many=True,
-                                                                     context={"request": request})
+                                                                     context={
+                                                                         "request": request,
+                                                                         "muted_post_comments_ids": set(
+                                                                             user.get_muted_post_comments_ids())
+                                                                     })
 
         return Response(response_serializer.data, status=status.HTTP_200_OK)
 
@@ -69,6 +78,17 @@ class ReadNotifications(APIView):
         return Response(status=status.HTTP_200_OK)
 
 
+class UnreadNotificationsCount(APIView):
+    permission_classes = (IsAuthenticated, IsNotSuspended)
+
+    def get(self, request):
+        user = request.user
+
+        return Response({
+            'count': user.count_unread_notifications()
+        }, status=status.HTTP_200_OK)
+
+
 class NotificationItem(APIView):
     permission_classes = (IsAuthenticated, IsNotSuspended)
 
@@ -0,0 +1,21 @@
+class PostAudience:
+    """
+    What decides who can see a post besides its own fields, compact enough to check its visibility in memory
+    """
+
+    def __init__(self, is_world, circles_ids, community_id, community_type, moderation_statuses, reporters_ids):
+        self.is_world = is_world
+        self.circles_ids = frozenset(circles_ids)
+        self.community_id = community_id
+        self.community_type = community_type
+        self.moderation_statuses = frozenset(moderation_statuses)
+        self.reporters_ids = frozenset(reporters_ids)
+
+    def is_community_audience(self):
+        return self.community_id is not None
+
+    def is_reported_by_user_with_id(self, user_id):
+        return user_id in self.reporters_ids
+
+    def has_moderation_status(self, status):
+        return status in self.moderation_statuses
@@ -2,7 +2,7 @@ from django.conf import settings
 from rest_framework.exceptions import ValidationError
 from django.utils.translation import ugettext_lazy as _
 
-from openbook_common.utils.model_loaders import get_post_model
+from openbook_common.utils.model_loaders import get_post_model, get_blocked_media_hash_model
 
 
 def check_can_be_updated(post, text=None):
@@ -54,3 +54,9 @@ def check_can_be_published(post):
 def check_mimetype_is_supported_media_mimetypes(mimetype):
     if not mimetype in settings.SUPPORTED_MEDIA_MIMETYPES:
         raise ValidationError(_('%s is not a supported mimetype') % mimetype, )
+
+
+def check_media_hash_is_not_blocked(hash):
+    BlockedMediaHash = get_blocked_media_hash_model()
+    if BlockedMediaHash.is_hash_blocked(hash=hash):
+        raise ValidationError(_('This media can not be posted'))
@@ -1,8 +1,15 @@
+from django.conf import settings
+from django.db.models import Q
 from django.utils import timezone
 from django_rq import job
+from rq import get_current_job
 from video_encoding import tasks
+from webpreview import URLUnreachable
 
-from openbook_common.utils.model_loaders import get_post_model, get_post_media_model
+from openbook_common.url_previews import get_cached_url_preview, fetch_url_preview
+from openbook_common.utils.model_loaders import get_post_model, get_post_media_model, get_follow_model, \
+    get_community_membership_model, get_post_comment_model, get_proxy_whitelist_domain_model, get_post_video_model
+from openbook_posts.timelines import add_post_to_timelines
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,6 +35,19 @@ def flush_draft_posts():
     return 'Flushed %s posts' % str(flushed_posts)
 
 
+@job
+def curate_trending_posts():
+    """
+    This job should be scheduled
+    """
+    # Recomputes the trending scores from the posts counters, drops the posts which are no longer trending
+    # and moves the scores epoch forward
+    Post = get_post_model()
+    Post.rebuild_trending_posts()
+
+    return 'Curated trending posts'
+
+
 @job
 def process_post_media(post_id):
     Post = get_post_model()
@@ -37,10 +57,192 @@ def process_post_media(post_id):
 
     post_media_videos = post.media.filter(type=PostMedia.MEDIA_TYPE_VIDEO)
 
-    for post_media_video in post_media_videos.iterator():
-        post_video = post_media_video.content_object
-        tasks.convert_video(post_video.file)
+    post_videos = [post_media_video.content_object for post_media_video in post_media_videos.iterator()]
+    formats_names = [options['name'] for options in tasks.get_formats_options()]
+
+    for post_video in post_videos:
+        if post_video.is_gif():
+            post_video.convert_gif_to_mp4()
+
+    # Created beforehand, so the post does not get published before the other formats get to be encoded.
+    # Videos identical to already processed ones come with their formats encoded.
+    formats_to_encode = []
+
+    for post_video in post_videos:
+        for format_name in formats_names:
+            video_format, created = tasks.get_or_create_format(fieldfile=post_video.file, format_name=format_name)
+            if not video_format.file:
+                formats_to_encode.append((post_video.pk, format_name))
 
-    # This updates the status and created attributes
-    post._publish()
+    # Each format gets encoded in a job of its own, so they get encoded in parallel by as many workers as running
+    for post_video_id, format_name in formats_to_encode:
+        encode_post_video_format.delay(post_id=post_id, post_video_id=post_video_id, format_name=format_name)
+
+    # This updates the status and created attributes, once there is no video to wait for
+    Post.publish_post_with_id_if_media_processed(post_id=post_id)
     logger.info('Processed media of post with id: %d' % post_id)
+
+
+@job
+def encode_post_video_format(post_id, post_video_id, format_name):
+    PostVideo = get_post_video_model()
+    post_video = PostVideo.objects.filter(pk=post_video_id).first()
+
+    if not post_video:
+        return 'Post video with id %d no longer exists' % post_video_id
+
+    logger.info('Encoding format %s of post video with id: %d' % (format_name, post_video_id))
+
+    tasks.convert_video_to_format(post_video.file, format_name=format_name, media_info=post_video.get_media_info())
+
+    # The post gets published with the first format ready to be played
+    Post = get_post_model()
+    Post.publish_post_with_id_if_media_processed(post_id=post_id)
+
+    return 'Encoded format %s of post video with id %d' % (format_name, post_video_id)
+
+
+@job
+def fan_out_post_to_timelines(post_id):
+    """
+    Adds a freshly published post to the materialized timelines of the users that might see it.
+    Visibility is enforced when the timelines are read.
+    """
+    Post = get_post_model()
+    post = Post.objects.filter(pk=post_id).only('id', 'creator_id', 'community_id').first()
+
+    if not post:
+        return 'Post with id %d no longer exists' % post_id
+
+    if post.community_id:
+        CommunityMembership = get_community_membership_model()
+        users_ids = CommunityMembership.objects.filter(community_id=post.community_id).values_list('user_id',
+                                                                                                  flat=True)
+    else:
+        Follow = get_follow_model()
+        users_ids = Follow.objects.filter(followed_user_id=post.creator_id).values_list('user_id', flat=True)
+
+    fanned_out_timelines = 0
+    users_ids_chunk = []
+
+    for user_id in users_ids.iterator():
+        users_ids_chunk.append(user_id)
+        if len(users_ids_chunk) == 1000:
+            add_post_to_timelines(post_id=post_id, users_ids=users_ids_chunk)
+            fanned_out_timelines = fanned_out_timelines + len(users_ids_chunk)
+            users_ids_chunk = []
+
+    add_post_to_timelines(post_id=post_id, users_ids=users_ids_chunk)
+    fanned_out_timelines = fanned_out_timelines + len(users_ids_chunk)
+
+    return 'Fanned out post with id %d to %d timelines' % (post_id, fanned_out_timelines)
+
+
+@job
+def process_post_text(post_id):
+    """
+    Creates the mentions and links of the text of a post
+    """
+    Post = get_post_model()
+    post = Post.objects.select_related('creator', 'community').filter(pk=post_id).first()
+
+    if not post:
+        return 'Post with id %d no longer exists' % post_id
+
+    post.process_text()
+
+    return 'Processed text of post with id %d' % post_id
+
+
+@job
+def process_post_comment_text(post_comment_id):
+    """
+    Creates the mentions of the text of a post comment
+    """
+    PostComment = get_post_comment_model()
+    post_comment = PostComment.objects.select_related('post', 'parent_comment').filter(pk=post_comment_id).first()
+
+    if not post_comment:
+        return 'Post comment with id %d no longer exists' % post_comment_id
+
+    post_comment.process_text()
+
+    return 'Processed text of post comment with id %d' % post_comment_id
+
+
+@job
+def fetch_post_links_previews(post_id):
+    """
+    Fetches the previews of the links of a post which can be previewed and are not cached yet
+    """
+    Post = get_post_model()
+    post = Post.objects.filter(pk=post_id).first()
+
+    if not post:
+        return 'Post with id %d no longer exists' % post_id
+
+    ProxyWhitelistDomain = get_proxy_whitelist_domain_model()
+    fetched_previews = 0
+
+    for link in post.post_links.values_list('link', flat=True):
+        if not ProxyWhitelistDomain.is_url_domain_whitelisted(link) or get_cached_url_preview(link) is not None:
+            continue
+
+        try:
+            fetch_url_preview(link)
+        except URLUnreachable:
+            # Left for the preview endpoints to fetch again
+            continue
+
+        fetched_previews = fetched_previews + 1
+
+    return 'Fetched %d link previews of post with id %d' % (fetched_previews, post_id)
+
+
+@job
+def soft_delete_posts(posts_query):
+    """
+    Soft deletes the posts matching the query in batches, reporting the progress in the job meta
+    """
+    Post = get_post_model()
+    soft_deleted_posts = _update_posts_in_batches(posts_query=posts_query,
+                                                  update_posts=Post.soft_delete_posts_with_ids)
+
+    return 'Soft deleted %d posts' % soft_deleted_posts
+
+
+@job
+def unsoft_delete_posts(posts_query):
+    """
+    Restores the soft deleted posts matching the query in batches, reporting the progress in the job meta
+    """
+    # Posts soft deleted by their own verified moderated object stay deleted
+    posts_query = posts_query & ~Q(moderated_object__verified=True)
+
+    Post = get_post_model()
+    unsoft_deleted_posts = _update_posts_in_batches(posts_query=posts_query,
+                                                    update_posts=Post.unsoft_delete_posts_with_ids)
+
+    return 'Unsoft deleted %d posts' % unsoft_deleted_posts
+
+
+def _update_posts_in_batches(posts_query, update_posts):
+    Post = get_post_model()
+    posts_ids = list(Post.objects.filter(posts_query).order_by('pk').values_list('pk', flat=True))
+    batch_size = settings.SOFT_DELETE_POSTS_BATCH_SIZE
+    current_job = get_current_job()
+
+    updated_posts = 0
+
+    for i in range(0, len(posts_ids), batch_size):
+        # Every batch is committed on its own, a failed job can be enqueued again to resume
+        update_posts(posts_ids=posts_ids[i:i + batch_size])
+        updated_posts = min(i + batch_size, len(posts_ids))
+
+        if current_job:
+            current_job.meta['progress'] = {'updated_posts': updated_posts, 'total_posts': len(posts_ids)}
+            current_job.save_meta()
+
+        logger.info('Updated %d out of %d posts' % (updated_posts, len(posts_ids)))
+
+    return updated_posts
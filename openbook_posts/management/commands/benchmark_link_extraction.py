@@ -0,0 +1,60 @@
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from urlextract import URLExtract
+
+from openbook_common.link_extraction import extract_urls_from_string, get_url_extractor, text_can_contain_urls
+from openbook_common.utils.model_loaders import get_post_model
+
+
+class Command(BaseCommand):
+    help = 'Times the extraction of links from the texts of the latest posts, ' \
+           'usage python manage.py benchmark_link_extraction --count 10000'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000, help='The amount of latest posts to extract links from')
+        parser.add_argument('--repeat', type=int, default=5, help='The amount of times to time the extraction')
+        parser.add_argument('--fresh-extractor', action='store_true',
+                            help='Also time creating an url extractor for every text, for comparison')
+
+    def handle(self, *args, **options):
+        Post = get_post_model()
+        texts = list(Post.objects.filter(text__isnull=False).order_by('-id').values_list('text', flat=True)[
+                     :options['count']])
+
+        if not texts:
+            self.stdout.write('There are no posts with text to extract links from')
+            return
+
+        # Loading the top level domains is a one off for the process, keep it out of the timings
+        get_url_extractor()
+
+        texts_with_urls = len([text for text in texts if text_can_contain_urls(text)])
+        self.stdout.write('Extracting links from %d post texts, %d of which can contain links' % (
+            len(texts), texts_with_urls))
+
+        self._report(name='extract_urls_from_string', texts=texts,
+                     timing=self._time(extract=extract_urls_from_string, texts=texts, repeat=options['repeat']))
+
+        if options['fresh_extractor']:
+            self._report(name='fresh extractor per text', texts=texts,
+                         timing=self._time(extract=self._extract_urls_with_fresh_extractor, texts=texts,
+                                           repeat=options['repeat']))
+
+    def _time(self, extract, texts, repeat):
+        timings = []
+
+        for i in range(repeat):
+            start = time.perf_counter()
+            for text in texts:
+                extract(text)
+            timings.append(time.perf_counter() - start)
+
+        return min(timings)
+
+    def _report(self, name, texts, timing):
+        self.stdout.write('%s: %.3fs in total, %.1fus per text' % (name, timing, timing / len(texts) * 1000000))
+
+    def _extract_urls_with_fresh_extractor(self, text):
+        return URLExtract(cache_dir=tempfile.gettempdir()).find_urls(text.lower())
@@ -0,0 +1,148 @@
+from django.core.management.base import BaseCommand
+import logging
+
+from django.db import transaction
+from django.db.models import Count
+
+from openbook_common.utils.model_loaders import get_post_model, get_post_comment_model, get_post_reaction_model, \
+    get_post_comment_reaction_model, get_post_reaction_emoji_count_model, \
+    get_post_comment_reaction_emoji_count_model
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the maintained reactions, comments, replies and emoji counts of posts and post comments ' \
+           'and fixes the ones that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='The amount of posts or post comments to reconcile at once')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        Post = get_post_model()
+        PostComment = get_post_comment_model()
+
+        reconciled_posts = 0
+        for posts_ids in self._get_ids_batches(model=Post, batch_size=batch_size):
+            with transaction.atomic():
+                reconciled_posts = reconciled_posts + self._reconcile_posts(posts_ids=posts_ids)
+
+        logger.info('Reconciled the counters of %d posts' % reconciled_posts)
+
+        reconciled_post_comments = 0
+        for post_comments_ids in self._get_ids_batches(model=PostComment, batch_size=batch_size):
+            with transaction.atomic():
+                reconciled_post_comments = reconciled_post_comments + self._reconcile_post_comments(
+                    post_comments_ids=post_comments_ids)
+
+        logger.info('Reconciled the counters of %d post comments' % reconciled_post_comments)
+
+    def _get_ids_batches(self, model, batch_size):
+        last_id = 0
+
+        while True:
+            ids = list(model.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+
+            if not ids:
+                return
+
+            yield ids
+            last_id = ids[-1]
+
+    def _reconcile_posts(self, posts_ids):
+        Post = get_post_model()
+        PostComment = get_post_comment_model()
+        PostReaction = get_post_reaction_model()
+        PostReactionEmojiCount = get_post_reaction_emoji_count_model()
+
+        reactions_counts = self._count_by(
+            queryset=PostReaction.objects.filter(post_id__in=posts_ids, reactor__is_deleted=False),
+            field='post_id')
+
+        comments_counts = self._count_by(
+            queryset=PostComment.objects.filter(post_id__in=posts_ids, parent_comment__isnull=True,
+                                                is_deleted=False),
+            field='post_id')
+
+        reconciled_posts = set()
+
+        for post_id, reactions_count, comments_count in Post.objects.filter(id__in=posts_ids).values_list(
+                'id', 'reactions_count', 'comments_count'):
+            actual_reactions_count = reactions_counts.get(post_id, 0)
+            actual_comments_count = comments_counts.get(post_id, 0)
+
+            if reactions_count != actual_reactions_count or comments_count != actual_comments_count:
+                Post.objects.filter(pk=post_id).update(reactions_count=actual_reactions_count,
+                                                       comments_count=actual_comments_count)
+                reconciled_posts.add(post_id)
+
+        reconciled_posts.update(self._reconcile_emoji_counts(
+            reactions_queryset=PostReaction.objects.filter(post_id__in=posts_ids),
+            emoji_counts_queryset=PostReactionEmojiCount.objects.filter(post_id__in=posts_ids),
+            emoji_count_model=PostReactionEmojiCount,
+            field='post_id'))
+
+        return len(reconciled_posts)
+
+    def _reconcile_post_comments(self, post_comments_ids):
+        PostComment = get_post_comment_model()
+        PostCommentReaction = get_post_comment_reaction_model()
+        PostCommentReactionEmojiCount = get_post_comment_reaction_emoji_count_model()
+
+        reactions_counts = self._count_by(
+            queryset=PostCommentReaction.objects.filter(post_comment_id__in=post_comments_ids,
+                                                        reactor__is_deleted=False),
+            field='post_comment_id')
+
+        replies_counts = self._count_by(
+            queryset=PostComment.objects.filter(parent_comment_id__in=post_comments_ids, is_deleted=False),
+            field='parent_comment_id')
+
+        reconciled_post_comments = set()
+
+        for post_comment_id, reactions_count, replies_count in PostComment.objects.filter(
+                id__in=post_comments_ids).values_list('id', 'reactions_count', 'replies_count'):
+            actual_reactions_count = reactions_counts.get(post_comment_id, 0)
+            actual_replies_count = replies_counts.get(post_comment_id, 0)
+
+            if reactions_count != actual_reactions_count or replies_count != actual_replies_count:
+                PostComment.objects.filter(pk=post_comment_id).update(reactions_count=actual_reactions_count,
+                                                                      replies_count=actual_replies_count)
+                reconciled_post_comments.add(post_comment_id)
+
+        reconciled_post_comments.update(self._reconcile_emoji_counts(
+            reactions_queryset=PostCommentReaction.objects.filter(post_comment_id__in=post_comments_ids),
+            emoji_counts_queryset=PostCommentReactionEmojiCount.objects.filter(
+                post_comment_id__in=post_comments_ids),
+            emoji_count_model=PostCommentReactionEmojiCount,
+            field='post_comment_id'))
+
+        return len(reconciled_post_comments)
+
+    def _reconcile_emoji_counts(self, reactions_queryset, emoji_counts_queryset, emoji_count_model, field):
+        actual_emoji_counts = {(emoji_count[field], emoji_count['emoji_id']): emoji_count['count'] for emoji_count in
+                               reactions_queryset.values(field, 'emoji_id').annotate(count=Count('id'))}
+
+        reconciled_ids = set()
+
+        for emoji_count_id, reacted_id, emoji_id, count in emoji_counts_queryset.values_list('id', field,
+                                                                                             'emoji_id', 'count'):
+            actual_count = actual_emoji_counts.pop((reacted_id, emoji_id), 0)
+
+            if count != actual_count:
+                emoji_count_model.objects.filter(pk=emoji_count_id).update(count=actual_count)
+                reconciled_ids.add(reacted_id)
+
+        missing_emoji_counts = [emoji_count_model(**{field: reacted_id, 'emoji_id': emoji_id, 'count': count}) for
+                                (reacted_id, emoji_id), count in actual_emoji_counts.items()]
+
+        emoji_count_model.objects.bulk_create(missing_emoji_counts)
+        reconciled_ids.update([getattr(emoji_count, field) for emoji_count in missing_emoji_counts])
+
+        return reconciled_ids
+
+    def _count_by(self, queryset, field):
+        return {count[field]: count['count'] for count in queryset.values(field).annotate(count=Count('id'))}
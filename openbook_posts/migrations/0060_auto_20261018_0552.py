@@ -0,0 +1,59 @@
+# Generated by Django 2.2.5 on 2026-10-18 03:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_common', '0019_auto_20190909_1236'),
+        ('openbook_posts', '0059_auto_20190910_1800'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='comments count'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reactions_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='reactions count'),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='reactions_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='reactions count'),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='replies_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='replies count'),
+        ),
+        migrations.CreateModel(
+            name='PostReactionEmojiCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('emoji', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='openbook_common.Emoji')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='emoji_counts', to='openbook_posts.Post')),
+            ],
+            options={
+                'unique_together': {('post', 'emoji')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PostCommentReactionEmojiCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('emoji', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='openbook_common.Emoji')),
+                ('post_comment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='emoji_counts', to='openbook_posts.PostComment')),
+            ],
+            options={
+                'unique_together': {('post_comment', 'emoji')},
+            },
+        ),
+    ]
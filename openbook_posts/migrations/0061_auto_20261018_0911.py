@@ -0,0 +1,23 @@
+# Generated by Django 2.2.5 on 2026-10-18 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_posts', '0060_auto_20261018_0552'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='postimage',
+            name='hash',
+            field=models.CharField(db_index=True, max_length=64, null=True, verbose_name='hash'),
+        ),
+        migrations.AlterField(
+            model_name='postvideo',
+            name='hash',
+            field=models.CharField(db_index=True, max_length=64, null=True, verbose_name='hash'),
+        ),
+    ]
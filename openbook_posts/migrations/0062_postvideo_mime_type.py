@@ -0,0 +1,18 @@
+# Generated by Django 2.2.5 on 2026-10-18 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_posts', '0061_auto_20261018_0911'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postvideo',
+            name='mime_type',
+            field=models.CharField(max_length=255, null=True, verbose_name='mime type'),
+        ),
+    ]
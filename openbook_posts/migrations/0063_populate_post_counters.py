@@ -0,0 +1,106 @@
+from django.db import migrations
+from django.db.models import Count
+
+BATCH_SIZE = 1000
+
+
+def _get_ids_batches(queryset):
+    last_id = 0
+
+    while True:
+        ids = list(queryset.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:BATCH_SIZE])
+
+        if not ids:
+            return
+
+        yield ids
+        last_id = ids[-1]
+
+
+def _count_by(queryset, field):
+    return {count[field]: count['count'] for count in queryset.values(field).annotate(count=Count('id'))}
+
+
+def _make_emoji_counts(reactions_queryset, emoji_count_model, field):
+    return [emoji_count_model(**{field: emoji_count[field], 'emoji_id': emoji_count['emoji_id'],
+                                 'count': emoji_count['count']})
+            for emoji_count in reactions_queryset.values(field, 'emoji_id').annotate(count=Count('id'))]
+
+
+def forwards_func(apps, schema_editor):
+    # We get the models from the versioned app registry;
+    # if we directly import them, they'll be the wrong version
+    Post = apps.get_model('openbook_posts', 'Post')
+    PostComment = apps.get_model('openbook_posts', 'PostComment')
+    PostReaction = apps.get_model('openbook_posts', 'PostReaction')
+    PostCommentReaction = apps.get_model('openbook_posts', 'PostCommentReaction')
+    PostReactionEmojiCount = apps.get_model('openbook_posts', 'PostReactionEmojiCount')
+    PostCommentReactionEmojiCount = apps.get_model('openbook_posts', 'PostCommentReactionEmojiCount')
+    db_alias = schema_editor.connection.alias
+
+    # Same counts as the reconcile_post_counters command, every counter starts at zero
+    for posts_ids in _get_ids_batches(queryset=Post.objects.using(db_alias)):
+        reactions_counts = _count_by(
+            queryset=PostReaction.objects.using(db_alias).filter(post_id__in=posts_ids, reactor__is_deleted=False),
+            field='post_id')
+
+        comments_counts = _count_by(
+            queryset=PostComment.objects.using(db_alias).filter(post_id__in=posts_ids,
+                                                                parent_comment__isnull=True, is_deleted=False),
+            field='post_id')
+
+        for post_id in set(reactions_counts.keys()) | set(comments_counts.keys()):
+            Post.objects.using(db_alias).filter(pk=post_id).update(
+                reactions_count=reactions_counts.get(post_id, 0),
+                comments_count=comments_counts.get(post_id, 0))
+
+        PostReactionEmojiCount.objects.using(db_alias).bulk_create(_make_emoji_counts(
+            reactions_queryset=PostReaction.objects.using(db_alias).filter(post_id__in=posts_ids),
+            emoji_count_model=PostReactionEmojiCount,
+            field='post_id'))
+
+    for post_comments_ids in _get_ids_batches(queryset=PostComment.objects.using(db_alias)):
+        reactions_counts = _count_by(
+            queryset=PostCommentReaction.objects.using(db_alias).filter(post_comment_id__in=post_comments_ids,
+                                                                        reactor__is_deleted=False),
+            field='post_comment_id')
+
+        replies_counts = _count_by(
+            queryset=PostComment.objects.using(db_alias).filter(parent_comment_id__in=post_comments_ids,
+                                                                is_deleted=False),
+            field='parent_comment_id')
+
+        for post_comment_id in set(reactions_counts.keys()) | set(replies_counts.keys()):
+            PostComment.objects.using(db_alias).filter(pk=post_comment_id).update(
+                reactions_count=reactions_counts.get(post_comment_id, 0),
+                replies_count=replies_counts.get(post_comment_id, 0))
+
+        PostCommentReactionEmojiCount.objects.using(db_alias).bulk_create(_make_emoji_counts(
+            reactions_queryset=PostCommentReaction.objects.using(db_alias).filter(
+                post_comment_id__in=post_comments_ids),
+            emoji_count_model=PostCommentReactionEmojiCount,
+            field='post_comment_id'))
+
+
+def reverse_func(apps, schema_editor):
+    Post = apps.get_model('openbook_posts', 'Post')
+    PostComment = apps.get_model('openbook_posts', 'PostComment')
+    PostReactionEmojiCount = apps.get_model('openbook_posts', 'PostReactionEmojiCount')
+    PostCommentReactionEmojiCount = apps.get_model('openbook_posts', 'PostCommentReactionEmojiCount')
+    db_alias = schema_editor.connection.alias
+
+    PostReactionEmojiCount.objects.using(db_alias).all().delete()
+    PostCommentReactionEmojiCount.objects.using(db_alias).all().delete()
+    Post.objects.using(db_alias).update(reactions_count=0, comments_count=0)
+    PostComment.objects.using(db_alias).update(reactions_count=0, replies_count=0)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('openbook_auth', '0047_populate_user_search_terms'),
+        ('openbook_posts', '0062_postvideo_mime_type'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards_func, reverse_func),
+    ]
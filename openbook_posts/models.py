@@ -9,11 +9,13 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.files import File
 from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile, SimpleUploadedFile
-from django.db import models
-from django.db.models import Q
+from django.db import models, transaction, IntegrityError
+from django.db.models import Q, F, Case, When, IntegerField
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 from django.db.models import Count
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 import ffmpy
 
 # Create your views here.
@@ -25,31 +27,42 @@ from django.conf import settings
 from video_encoding.backends import get_backend
 from video_encoding.fields import VideoField
 from video_encoding.models import Format
+from video_encoding.utils import get_fieldfile_local_path
 
 from openbook.storage_backends import S3PrivateMediaStorage
 from openbook_auth.models import User
 
 from openbook_common.models import Emoji, Language
 from openbook_common.utils.helpers import delete_file_field, sha256sum, extract_usernames_from_string, get_magic, \
-    write_in_memory_file_to_disk
+    write_in_memory_file_to_disk_with_sha256sum, get_in_memory_file_mime
 from openbook_common.utils.model_loaders import get_emoji_model, \
     get_circle_model, get_community_model, get_post_comment_notification_model, \
     get_post_comment_reply_notification_model, get_post_reaction_notification_model, get_moderated_object_model, \
     get_post_user_mention_notification_model, get_post_comment_user_mention_notification_model, get_user_model, \
-    get_post_user_mention_model, get_post_comment_user_mention_model
+    get_post_user_mention_model, get_post_comment_user_mention_model, get_notification_model, get_user_block_model, \
+    get_connection_circle_model, get_community_membership_model
 from imagekit.models import ProcessedImageField
 
 from openbook_moderation.models import ModeratedObject
 from openbook_notifications.helpers import send_post_comment_user_mention_push_notification, \
     send_post_user_mention_push_notification
+from openbook_posts.audiences import PostAudience
 from openbook_posts.checkers import check_can_be_updated, check_can_add_media, check_can_be_published, \
-    check_mimetype_is_supported_media_mimetypes
+    check_mimetype_is_supported_media_mimetypes, check_media_hash_is_not_blocked
 from openbook_posts.helpers import upload_to_post_image_directory, upload_to_post_video_directory, \
     upload_to_post_directory
-from openbook_posts.jobs import process_post_media
+from openbook_posts.jobs import process_post_media, fan_out_post_to_timelines, process_post_text, \
+    process_post_comment_text, fetch_post_links_previews
+from openbook_posts.timelines import add_post_to_timelines
+from openbook_translation.translations import delete_cached_post_translations, \
+    delete_cached_post_comment_translations
+from openbook_posts.trending import trending_posts_need_rebuild, fill_trending_posts, add_post_to_trending_posts, \
+    increment_trending_post_score, get_trending_posts_ids, remove_posts_from_trending_posts, \
+    TRENDING_POST_REACTION_SCORE, TRENDING_POST_COMMENT_SCORE
 
 magic = get_magic()
-from openbook_common.helpers import get_language_for_text, extract_urls_from_string, normalise_url
+from openbook_common.helpers import get_language_for_text, normalise_url
+from openbook_common.link_extraction import extract_urls_from_string
 
 post_image_storage = S3PrivateMediaStorage() if settings.IS_PRODUCTION else default_storage
 
@@ -85,6 +98,9 @@ class Post(models.Model):
                                           upload_to=upload_to_post_directory,
                                           blank=False, null=True, format='JPEG', options={'quality': 30},
                                           processors=[ResizeToFit(width=512, upscale=False)])
+    # Maintained on write, see reconcile_post_counters if they ever drift
+    reactions_count = models.PositiveIntegerField(_('reactions count'), default=0, editable=False)
+    comments_count = models.PositiveIntegerField(_('comments count'), default=0, editable=False)
 
     class Meta:
         index_together = [
@@ -143,8 +159,48 @@ class Post(models.Model):
 
         return post
 
+    @classmethod
+    def create_imported_posts(cls, creator, circles_ids, posts):
+        """
+        Creates the published text posts of an imported archive at once out of (text, created) tuples.
+        The posts which were imported before are skipped, so archives can be imported again.
+        """
+        posts = list(dict.fromkeys(posts))
+
+        if not posts:
+            return []
+
+        posts_created = [created for text, created in posts]
+
+        # The posts imported before, found with a single query
+        imported_posts = set(cls.objects.filter(creator=creator, created__gte=min(posts_created),
+                                                created__lte=max(posts_created)).values_list('text', 'created'))
+
+        new_posts = [cls(creator=creator, text=text, created=created, status=cls.STATUS_PUBLISHED,
+                         language=get_language_for_text(text)) for text, created in posts if
+                     (text, created) not in imported_posts]
+
+        cls.objects.bulk_create(new_posts)
+
+        # Bulk inserts do not give back the ids of the posts in every database
+        new_posts = list(cls.objects.filter(uuid__in=[post.uuid for post in new_posts]))
+
+        PostCircle = cls.circles.through
+        PostCircle.objects.bulk_create([PostCircle(post_id=post.pk, circle_id=circle_id) for post in new_posts for
+                                        circle_id in circles_ids])
+
+        for post in new_posts:
+            # The jobs read the posts, wait for them to be committed
+            transaction.on_commit(lambda post_id=post.pk: process_post_text.delay(post_id=post_id))
+            post._add_to_timelines()
+
+        return new_posts
+
     @classmethod
     def get_emoji_counts_for_post_with_id(cls, post_id, emoji_id=None, reactor_id=None):
+        if not reactor_id:
+            return PostReactionEmojiCount.get_emoji_counts_for_post_with_id(post_id=post_id, emoji_id=emoji_id)
+
         Emoji = get_emoji_model()
         return Emoji.get_emoji_counts_for_post_with_id(post_id=post_id, emoji_id=emoji_id, reactor_id=reactor_id)
 
@@ -162,14 +218,33 @@ class Post(models.Model):
         return cls._get_trending_posts_with_query(query=trending_posts_query)
 
     @classmethod
-    def _get_trending_posts_with_query(cls, query):
-        return cls.objects.annotate(Count('reactions')).filter(query).order_by(
-            '-reactions__count', '-created')
+    def _get_trending_posts_with_query(cls, query, max_count=100):
+        if trending_posts_need_rebuild():
+            cls.rebuild_trending_posts()
+
+        trending_posts_ids = get_trending_posts_ids(count=max_count)
+
+        if not trending_posts_ids:
+            return cls.objects.none()
+
+        # Keep the order of the scores
+        trending_posts_order = Case(*[When(pk=post_id, then=position) for position, post_id in
+                                      enumerate(trending_posts_ids)], output_field=IntegerField())
+
+        return cls.objects.filter(query, id__in=trending_posts_ids).order_by(trending_posts_order)
+
+    @classmethod
+    def rebuild_trending_posts(cls):
+        trending_posts = cls.objects.filter(cls._get_trending_posts_query(), is_closed=False,
+                                            is_deleted=False).values_list('id', 'created', 'reactions_count',
+                                                                          'comments_count')
+
+        fill_trending_posts(posts=trending_posts.iterator())
 
     @classmethod
     def _get_trending_posts_query(cls):
         trending_posts_query = Q(created__gte=timezone.now() - timedelta(
-            hours=12))
+            hours=settings.TRENDING_POSTS_MAX_AGE_HOURS))
 
         Community = get_community_model()
 
@@ -220,21 +295,22 @@ class Post(models.Model):
         return PostComment.count_comments_for_post_with_id(self.pk)
 
     def count_comments_with_user(self, user):
-        # Only count top level comments
-        count_query = Q(parent_comment__isnull=True)
+        # The maintained count only has top level and not soft deleted comments
+        comments_count = self.count_comments()
 
-        if self.community:
+        # Dont count items we have reported
+        hidden_comments_query = Q(moderated_object__reports__reporter_id=user.pk)
+
+        if self.community_id:
             # Don't count items that have been reported and approved by community moderators
             ModeratedObject = get_moderated_object_model()
-            count_query.add(~Q(moderated_object__status=ModeratedObject.STATUS_APPROVED), Q.AND)
+            hidden_comments_query.add(Q(moderated_object__status=ModeratedObject.STATUS_APPROVED), Q.OR)
 
-        # Dont count soft deleted items
-        count_query.add(Q(is_deleted=False), Q.AND)
+        hidden_comments_query.add(Q(parent_comment__isnull=True, is_deleted=False), Q.AND)
 
-        # Dont count items we have reported
-        count_query.add(~Q(moderated_object__reports__reporter_id=user.pk), Q.AND)
+        hidden_comments_count = self.comments.filter(hidden_comments_query).distinct().count()
 
-        return self.comments.filter(count_query).count()
+        return max(comments_count - hidden_comments_count, 0)
 
     def count_reactions(self, reactor_id=None):
         return PostReaction.count_reactions_for_post_with_id(self.pk, reactor_id=reactor_id)
@@ -278,6 +354,10 @@ class Post(models.Model):
     def is_public_post(self):
         Circle = get_circle_model()
         world_circle_id = Circle.get_world_circle_id()
+
+        if 'circles' in getattr(self, '_prefetched_objects_cache', {}):
+            return any(circle.pk == world_circle_id for circle in self.circles.all())
+
         if self.circles.filter(id=world_circle_id).exists():
             return True
         return False
@@ -288,8 +368,135 @@ class Post(models.Model):
             link_url = normalise_url(link_url)
             PostLink.create_link(link=link_url, post_id=self.pk)
 
+        post_id = self.pk
+        transaction.on_commit(lambda: fetch_post_links_previews.delay(post_id=post_id))
+
     def is_encircled_post(self):
-        return not self.is_public_post() and not self.community
+        return not self.is_public_post() and not self.community_id
+
+    def get_audience(self):
+        """
+        Returns what decides who can see the post, loaded once per instance as its visibility is usually checked
+        for several users or several times in a row
+        """
+        audience = getattr(self, '_audience', None)
+
+        if audience is None:
+            audience = self._make_audience()
+            self._audience = audience
+
+        return audience
+
+    def clear_audience(self):
+        self._audience = None
+
+    def _make_audience(self):
+        Circle = get_circle_model()
+        world_circle_id = Circle.get_world_circle_id()
+
+        circles_ids = [] if self.community_id else [circle.pk for circle in self.circles.all()]
+        community_type = self.community.type if self.community_id else None
+
+        moderation_statuses = set()
+        reporters_ids = set()
+
+        for status, reporter_id in self.moderated_object.values_list('status', 'reports__reporter_id'):
+            moderation_statuses.add(status)
+            if reporter_id is not None:
+                reporters_ids.add(reporter_id)
+
+        return PostAudience(is_world=world_circle_id in circles_ids, circles_ids=circles_ids,
+                            community_id=self.community_id, community_type=community_type,
+                            moderation_statuses=moderation_statuses, reporters_ids=reporters_ids)
+
+    def get_users_who_can_see(self, users):
+        """
+        Returns the given users who can see the post, decided from its audience with a handful of queries whatever
+        the amount of users instead of from the relationships of every one of them. Mirrors User.can_see_post.
+        """
+        users = [user for user in users if user.pk == self.creator_id or not self.is_deleted]
+
+        if self.status != Post.STATUS_PUBLISHED:
+            return [user for user in users if user.pk == self.creator_id]
+
+        audience = self.get_audience()
+
+        if audience.is_community_audience():
+            return self._get_users_who_can_see_community_post(users=users, audience=audience)
+
+        return self._get_users_who_can_see_circles_post(users=users, audience=audience)
+
+    def _get_users_who_can_see_circles_post(self, users, audience):
+        users = [user for user in users if
+                 user.pk == self.creator_id or not audience.is_reported_by_user_with_id(user.pk)]
+        users_ids = [user.pk for user in users]
+
+        UserBlock = get_user_block_model()
+        blocked_users_ids = UserBlock.get_users_ids_blocked_with_user_with_id(user_id=self.creator_id,
+                                                                             users_ids=users_ids)
+        users = [user for user in users if user.pk not in blocked_users_ids]
+
+        if audience.is_world:
+            return users
+
+        # Posted to circles the creator put the users in, once they confirmed the connection
+        ConnectionCircle = get_connection_circle_model()
+        confirmed_users_ids = set(ConnectionCircle.objects.filter(
+            connection__user_id__in=users_ids, connection__target_user_id=self.creator_id).values_list(
+            'connection__user_id', flat=True))
+        in_circles_users_ids = set(ConnectionCircle.objects.filter(
+            connection__target_user_id__in=users_ids, circle_id__in=audience.circles_ids).values_list(
+            'connection__target_user_id', flat=True))
+
+        return [user for user in users if user.pk == self.creator_id or (
+                user.pk in confirmed_users_ids and user.pk in in_circles_users_ids)]
+
+    def _get_users_who_can_see_community_post(self, users, audience):
+        if audience.has_moderation_status(ModeratedObject.STATUS_APPROVED):
+            return [user for user in users if user.pk == self.creator_id]
+
+        users = [user for user in users if
+                 user.pk == self.creator_id or not audience.is_reported_by_user_with_id(user.pk)]
+        users_ids = [user.pk for user in users]
+
+        CommunityMembership = get_community_membership_model()
+        members_ids = set()
+        staff_ids = set()
+
+        for user_id, is_administrator, is_moderator in CommunityMembership.objects.filter(
+                community_id=audience.community_id, user_id__in=users_ids).values_list('user_id', 'is_administrator',
+                                                                                       'is_moderator'):
+            members_ids.add(user_id)
+            if is_administrator or is_moderator:
+                staff_ids.add(user_id)
+
+        Community = get_community_model()
+        banned_users_ids = set(Community.banned_users.through.objects.filter(
+            community_id=audience.community_id, user_id__in=users_ids).values_list('user_id', flat=True))
+
+        UserBlock = get_user_block_model()
+        blocked_users_ids = UserBlock.get_users_ids_blocked_with_user_with_id(user_id=self.creator_id,
+                                                                             users_ids=users_ids)
+        # Posts of staff members can be seen even if blocked with them
+        if blocked_users_ids and self.creator.is_staff_of_community_with_id(audience.community_id):
+            blocked_users_ids = set()
+
+        users_who_can_see = []
+
+        for user in users:
+            if user.pk != self.creator_id:
+                if user.pk in banned_users_ids:
+                    continue
+
+                if user.pk not in members_ids and audience.community_type != Community.COMMUNITY_TYPE_PUBLIC:
+                    continue
+
+                if user.pk not in staff_ids and (self.is_closed or user.pk in blocked_users_ids):
+                    continue
+
+            users_who_can_see.append(user)
+
+        return users_who_can_see
 
     def update(self, text=None):
         check_can_be_updated(post=self, text=text)
@@ -297,6 +504,7 @@ class Post(models.Model):
         self.is_edited = True
         self.language = get_language_for_text(text)
         self.save()
+        delete_cached_post_translations(post_id=self.pk)
 
     def get_media(self):
         return self.media
@@ -307,37 +515,21 @@ class Post(models.Model):
         is_in_memory_file = isinstance(file, InMemoryUploadedFile) or isinstance(file, SimpleUploadedFile)
 
         if is_in_memory_file:
-            file_mime = magic.from_buffer(file.read())
+            file_mime = get_in_memory_file_mime(file)
         elif isinstance(file, TemporaryUploadedFile):
             file_mime = magic.from_file(file.temporary_file_path())
         else:
             file_mime = magic.from_file(file.name)
 
         check_mimetype_is_supported_media_mimetypes(file_mime)
-        # Mime check moved pointer
-        file.seek(0)
 
         file_mime_types = file_mime.split('/')
 
         file_mime_type = file_mime_types[0]
         file_mime_subtype = file_mime_types[1]
 
-        temp_files_to_close = []
-
         if file_mime_subtype == 'gif':
-            if is_in_memory_file:
-                file = write_in_memory_file_to_disk(file)
-
-            temp_dir = tempfile.gettempdir()
-            converted_gif_file_name = os.path.join(temp_dir, str(uuid.uuid4()) + '.mp4')
-
-            ff = ffmpy.FFmpeg(
-                inputs={file.temporary_file_path() if hasattr(file, 'temporary_file_path') else file.name: None},
-                outputs={converted_gif_file_name: None})
-            ff.run()
-            converted_gif_file = open(converted_gif_file_name, 'rb')
-            temp_files_to_close.append(converted_gif_file)
-            file = File(file=converted_gif_file)
+            # Gifs are added as videos, they get converted to mp4 when the media of the post is processed
             file_mime_type = 'video'
 
         has_other_media = self.media.exists()
@@ -349,7 +541,7 @@ class Post(models.Model):
                 self.media_height = post_image.height
                 self.media_thumbnail = file
         elif file_mime_type == 'video':
-            post_video = self._add_media_video(video=file, order=order)
+            post_video = self._add_media_video(video=file, order=order, mime_type=file_mime)
             if not has_other_media:
                 self.media_width = post_video.width
                 self.media_height = post_video.height
@@ -359,9 +551,6 @@ class Post(models.Model):
                 _('Unsupported media file type')
             )
 
-        for file_to_close in temp_files_to_close:
-            file_to_close.close()
-
         self.save()
 
     def get_first_media(self):
@@ -370,8 +559,8 @@ class Post(models.Model):
     def _add_media_image(self, image, order):
         return PostImage.create_post_media_image(image=image, post_id=self.pk, order=order)
 
-    def _add_media_video(self, video, order):
-        return PostVideo.create_post_media_video(file=video, post_id=self.pk, order=order)
+    def _add_media_video(self, video, order, mime_type):
+        return PostVideo.create_post_media_video(file=video, post_id=self.pk, order=order, mime_type=mime_type)
 
     def count_media(self):
         return self.media.count()
@@ -387,10 +576,42 @@ class Post(models.Model):
         else:
             self._publish()
 
+    @classmethod
+    def publish_post_with_id_if_media_processed(cls, post_id):
+        """
+        Publishes the post once its media is processed, if it is still processing.
+        Meant to be called as each piece of its media gets processed, possibly at the same time.
+        """
+        with transaction.atomic():
+            post = cls.objects.select_for_update().filter(pk=post_id).first()
+
+            if not post or post.status != cls.STATUS_PROCESSING or not post.is_media_processed():
+                return False
+
+            post._publish()
+
+        return True
+
+    def is_media_processed(self):
+        return all(post_video.is_processed() for post_video in self.videos.all())
+
     def _publish(self):
         self.status = Post.STATUS_PUBLISHED
         self.created = timezone.now()
         self.save()
+        self._add_to_timelines()
+        self._add_to_trending_posts()
+
+    def _add_to_timelines(self):
+        # The creator should see its post right away, everyone else gets it in the background
+        add_post_to_timelines(post_id=self.pk, users_ids=[self.creator_id])
+        fan_out_post_to_timelines.delay(post_id=self.pk)
+
+    def _add_to_trending_posts(self):
+        Community = get_community_model()
+
+        if self.community_id and self.community.type == Community.COMMUNITY_TYPE_PUBLIC:
+            add_post_to_trending_posts(post_id=self.pk, post_created=self.created)
 
     def is_draft(self):
         return self.status == Post.STATUS_DRAFT
@@ -410,48 +631,157 @@ class Post(models.Model):
 
         post = super(Post, self).save(*args, **kwargs)
 
-        self._process_post_mentions()
-        self._process_post_links()
+        if self._text_needs_processing():
+            # The job reads the post, wait for it to be committed
+            post_id = self.pk
+            transaction.on_commit(lambda: process_post_text.delay(post_id=post_id))
+
+        self._processed_text_and_status = (self.__dict__.get('text'), self.__dict__.get('status'))
 
         return post
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super(Post, cls).from_db(db, field_names, values)
+        post._processed_text_and_status = (post.__dict__.get('text'), post.__dict__.get('status'))
+        return post
+
+    def _text_needs_processing(self):
+        # The status matters too, publishing a post changes who can be mentioned in it
+        processed_text, processed_status = getattr(self, '_processed_text_and_status', (None, None))
+        text = self.__dict__.get('text')
+
+        if text != processed_text:
+            return True
+
+        return bool(text) and self.__dict__.get('status') != processed_status
+
     def delete(self, *args, **kwargs):
         self.delete_media()
         super(Post, self).delete(*args, **kwargs)
 
     def delete_media(self):
-        if self.has_image():
-            delete_file_field(self.image.image)
+        post_images = PostImage.objects.filter(post_id=self.pk)
+        post_videos = self.videos.all()
+
+        # Identical media of other posts keeps the files it shares
+        for post_image in post_images:
+            post_image.delete_unshared_files()
+
+        for post_video in post_videos:
+            post_video.delete_unshared_files()
+            post_video.format_set.all().delete()
+
+        # So that they neither get reused nor count as sharing the files of identical media anymore
+        post_images.update(hash=None)
+        post_videos.update(hash=None)
+
+        if self.media_thumbnail:
+            delete_file_field(self.media_thumbnail)
+            self.media_thumbnail = None
+
+    def get_media_hashes(self):
+        images_hashes = PostImage.objects.filter(post_id=self.pk, hash__isnull=False).values_list('hash', flat=True)
+        videos_hashes = self.videos.filter(hash__isnull=False).values_list('hash', flat=True)
+        return list(images_hashes) + list(videos_hashes)
 
     def soft_delete(self):
-        self.delete_notifications()
-        for comment in self.comments.all().iterator():
-            comment.soft_delete()
+        self.soft_delete_posts_with_ids(posts_ids=[self.pk])
         self.is_deleted = True
-        self.save()
+        self.comments_count = 0
 
     def unsoft_delete(self):
-        self.is_deleted = False
-        for comment in self.comments.all().iterator():
-            comment.unsoft_delete()
-        self.save()
+        self.unsoft_delete_posts_with_ids(posts_ids=[self.pk])
+        self.refresh_from_db(fields=['is_deleted', 'comments_count'])
+
+    @classmethod
+    def soft_delete_posts_with_ids(cls, posts_ids):
+        """
+        Soft deletes the posts along with their comments and notifications with a handful of queries,
+        whatever the amount of posts and comments
+        """
+        modified = timezone.now()
+
+        with transaction.atomic():
+            cls.delete_notifications_for_posts_with_ids(posts_ids=posts_ids)
+
+            # The comments of soft deleted posts are not counted
+            PostComment.objects.filter(post_id__in=posts_ids).update(is_deleted=True, replies_count=0,
+                                                                     modified=modified)
+            cls.objects.filter(pk__in=posts_ids).update(is_deleted=True, comments_count=0, modified=modified)
+
+        transaction.on_commit(lambda: remove_posts_from_trending_posts(posts_ids=posts_ids))
+
+    @classmethod
+    def unsoft_delete_posts_with_ids(cls, posts_ids):
+        """
+        Restores the posts along with their comments, recounting the comments and replies of every post and
+        comment with a query per distinct count
+        """
+        modified = timezone.now()
+
+        with transaction.atomic():
+            post_comments = PostComment.objects.filter(post_id__in=posts_ids)
+            # Comments soft deleted by their own verified moderated object stay deleted
+            post_comments.exclude(moderated_object__verified=True).update(is_deleted=False, modified=modified)
+            restored_post_comments = post_comments.filter(is_deleted=False)
+
+            replies_counts = restored_post_comments.filter(parent_comment__isnull=False).order_by().values(
+                'parent_comment_id').annotate(count=Count('id'))
+            cls._update_counter(queryset=post_comments, counter_field='replies_count',
+                                counts={count['parent_comment_id']: count['count'] for count in replies_counts})
+
+            comments_counts = restored_post_comments.filter(parent_comment__isnull=True).order_by().values(
+                'post_id').annotate(count=Count('id'))
+            posts = cls.objects.filter(pk__in=posts_ids)
+            posts.update(is_deleted=False, modified=modified)
+            cls._update_counter(queryset=posts, counter_field='comments_count',
+                                counts={count['post_id']: count['count'] for count in comments_counts})
+
+    @classmethod
+    def _update_counter(cls, queryset, counter_field, counts):
+        # Rows are grouped by count as MySQL can't update a table from a subquery on that same table
+        ids_by_count = {}
+        for pk, count in counts.items():
+            ids_by_count.setdefault(count, []).append(pk)
+
+        queryset.exclude(pk__in=counts.keys()).update(**{counter_field: 0})
+
+        for count, ids in ids_by_count.items():
+            queryset.filter(pk__in=ids).update(**{counter_field: count})
+
+    @classmethod
+    def delete_notifications_for_posts_with_ids(cls, posts_ids):
+        Notification = get_notification_model()
 
-    def delete_notifications(self):
         # Remove all post comment notifications
         PostCommentNotification = get_post_comment_notification_model()
-        PostCommentNotification.objects.filter(post_comment__post_id=self.pk).delete()
+        Notification.delete_notifications_for_content_objects(
+            content_objects=PostCommentNotification.objects.filter(post_comment__post_id__in=posts_ids))
 
         # Remove all post reaction notifications
         PostReactionNotification = get_post_reaction_notification_model()
-        PostReactionNotification.objects.filter(post_reaction__post_id=self.pk).delete()
+        Notification.delete_notifications_for_content_objects(
+            content_objects=PostReactionNotification.objects.filter(post_reaction__post_id__in=posts_ids))
 
         # Remove all post comment reply notifications
-        PostCommentReplyNotification = get_post_comment_notification_model()
-        PostCommentReplyNotification.objects.filter(post_comment__post_id=self.pk).delete()
+        PostCommentReplyNotification = get_post_comment_reply_notification_model()
+        Notification.delete_notifications_for_content_objects(
+            content_objects=PostCommentReplyNotification.objects.filter(post_comment__post_id__in=posts_ids))
 
         # Remove all post user mention notifications
         PostUserMentionNotification = get_post_user_mention_notification_model()
-        PostUserMentionNotification.objects.filter(post_user_mention__post_id=self.pk).delete()
+        Notification.delete_notifications_for_content_objects(
+            content_objects=PostUserMentionNotification.objects.filter(post_user_mention__post_id__in=posts_ids))
+
+        # Remove all post comment user mention notifications
+        PostCommentUserMentionNotification = get_post_comment_user_mention_notification_model()
+        Notification.delete_notifications_for_content_objects(
+            content_objects=PostCommentUserMentionNotification.objects.filter(
+                post_comment_user_mention__post_comment__post_id__in=posts_ids))
+
+    def delete_notifications(self):
+        self.delete_notifications_for_posts_with_ids(posts_ids=[self.pk])
 
     def delete_notifications_for_user(self, user):
         # Remove all post comment notifications
@@ -488,35 +818,29 @@ class Post(models.Model):
 
         return result
 
+    def process_text(self):
+        self._process_post_mentions()
+        self._process_post_links()
+
     def _process_post_mentions(self):
-        if not self.text:
-            self.user_mentions.all().delete()
-        else:
-            usernames = extract_usernames_from_string(string=self.text)
-            if not usernames:
-                self.user_mentions.all().delete()
-            else:
-                existing_mention_usernames = []
-                for existing_mention in self.user_mentions.only('id', 'user__username').all().iterator():
-                    if existing_mention.user.username not in usernames:
-                        existing_mention.delete()
-                    else:
-                        existing_mention_usernames.append(existing_mention.user.username)
-
-                PostUserMention = get_post_user_mention_model()
-                User = get_user_model()
-
-                for username in usernames:
-                    username = username.lower()
-                    if username not in existing_mention_usernames:
-                        try:
-                            user = User.objects.only('id', 'username').get(username=username)
-                            user_is_post_creator = user.pk == self.creator_id
-                            if user.can_see_post(post=self) and not user_is_post_creator:
-                                PostUserMention.create_post_user_mention(user=user, post=self)
-                                existing_mention_usernames.append(username)
-                        except User.DoesNotExist:
-                            pass
+        usernames = set([username.lower() for username in extract_usernames_from_string(string=self.text or '')])
+
+        self.user_mentions.exclude(user__username__in=usernames).delete()
+
+        if not usernames:
+            return
+
+        existing_mention_usernames = self.user_mentions.values_list('user__username', flat=True)
+
+        User = get_user_model()
+        users = User.objects.only('id', 'username').filter(username__in=usernames).exclude(
+            username__in=existing_mention_usernames).exclude(pk=self.creator_id)
+
+        mentioned_users = self.get_users_who_can_see(users=users)
+
+        if mentioned_users:
+            PostUserMention = get_post_user_mention_model()
+            PostUserMention.create_post_user_mentions(users=mentioned_users, post=self)
 
     def _process_post_links(self):
         if self.has_text() and not self.has_image() and not self.has_video():
@@ -525,6 +849,12 @@ class Post(models.Model):
                 self.create_links(link_urls)
 
 
+@receiver(post_delete, sender=Post, dispatch_uid='post_deleted_remove_from_trending_posts')
+def remove_post_from_trending_posts(sender, instance, **kwargs):
+    if instance.community_id and instance.status == Post.STATUS_PUBLISHED:
+        remove_posts_from_trending_posts(posts_ids=[instance.pk])
+
+
 class PostMedia(OrderedModel):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='media')
     order_with_respect_to = 'post'
@@ -549,6 +879,25 @@ class PostMedia(OrderedModel):
         return cls.objects.create(type=type, content_object=content_object, post_id=post_id, order=order)
 
 
+def _is_post_media_file_shared(post_media, field_name):
+    """
+    Whether the image or video of another post has the file in the field, identical media shares its processed files
+    """
+    file = getattr(post_media, field_name)
+
+    if not file:
+        return False
+
+    other_posts_media = post_media.__class__.objects.filter(**{field_name: file.name}).exclude(
+        post_id=post_media.post_id)
+
+    if post_media.hash:
+        # Only identical media shares the files, media with the files deleted by moderation has no hash anymore
+        other_posts_media = other_posts_media.filter(hash=post_media.hash)
+
+    return other_posts_media.exists()
+
+
 class PostImage(models.Model):
     post = models.OneToOneField(Post, on_delete=models.CASCADE, related_name='image', null=True)
     image = ProcessedImageField(verbose_name=_('image'), storage=post_image_storage,
@@ -559,7 +908,7 @@ class PostImage(models.Model):
                                 processors=[ResizeToFit(width=1024, upscale=False)])
     width = models.PositiveIntegerField(editable=False, null=False, blank=False)
     height = models.PositiveIntegerField(editable=False, null=False, blank=False)
-    hash = models.CharField(_('hash'), max_length=64, blank=False, null=True)
+    hash = models.CharField(_('hash'), max_length=64, blank=False, null=True, db_index=True)
     thumbnail = ProcessedImageField(verbose_name=_('thumbnail'), storage=post_image_storage,
                                     upload_to=upload_to_post_image_directory,
                                     blank=False, null=True, format='JPEG', options={'quality': 30},
@@ -570,22 +919,53 @@ class PostImage(models.Model):
     @classmethod
     def create_post_image(cls, image, post_id):
         hash = sha256sum(file=image.file)
+        check_media_hash_is_not_blocked(hash=hash)
         return cls.objects.create(image=image, post_id=post_id, hash=hash)
 
     @classmethod
     def create_post_media_image(cls, image, post_id, order):
         hash = sha256sum(file=image.file)
-        post_image = cls.objects.create(image=image, post_id=post_id, hash=hash, thumbnail=image)
+        check_media_hash_is_not_blocked(hash=hash)
+
+        processed_post_image = cls.get_processed_post_image_with_hash(hash=hash)
+
+        if processed_post_image:
+            # Identical images share the processed files rather than getting processed and stored again
+            post_image = cls.objects.create(image=processed_post_image.image.name,
+                                            thumbnail=processed_post_image.thumbnail.name,
+                                            width=processed_post_image.width, height=processed_post_image.height,
+                                            post_id=post_id, hash=hash)
+        else:
+            post_image = cls.objects.create(image=image, post_id=post_id, hash=hash, thumbnail=image)
+
         PostMedia.create_post_media(type=PostMedia.MEDIA_TYPE_IMAGE,
                                     content_object=post_image,
                                     post_id=post_id, order=order)
         return post_image
 
+    @classmethod
+    def get_processed_post_image_with_hash(cls, hash):
+        return cls.objects.filter(hash=hash).exclude(image='').exclude(image__isnull=True).exclude(
+            thumbnail='').exclude(thumbnail__isnull=True).order_by('pk').first()
+
+    def delete_unshared_files(self):
+        """
+        Deletes the files of the image which no image of another post shares
+        """
+        for field_name in ('image', 'thumbnail'):
+            if not _is_post_media_file_shared(post_media=self, field_name=field_name):
+                delete_file_field(getattr(self, field_name))
+
+
+@receiver(post_delete, sender=PostImage, dispatch_uid='post_image_deleted_delete_unshared_files')
+def delete_post_image_unshared_files(sender, instance, **kwargs):
+    instance.delete_unshared_files()
+
 
 class PostVideo(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='videos', null=True)
 
-    hash = models.CharField(_('hash'), max_length=64, blank=False, null=True)
+    hash = models.CharField(_('hash'), max_length=64, blank=False, null=True, db_index=True)
 
     media = GenericRelation(PostMedia)
 
@@ -593,6 +973,9 @@ class PostVideo(models.Model):
     height = models.PositiveIntegerField(editable=False, null=True)
     duration = models.FloatField(editable=False, null=True)
 
+    # As sniffed from the uploaded file
+    mime_type = models.CharField(_('mime type'), max_length=255, blank=False, null=True)
+
     file = VideoField(width_field='width', height_field='height',
                       duration_field='duration', storage=post_image_storage,
                       upload_to=upload_to_post_video_directory, blank=False, null=True)
@@ -610,24 +993,168 @@ class PostVideo(models.Model):
     thumbnail_height = models.PositiveIntegerField(editable=False, null=False, blank=False)
 
     @classmethod
-    def create_post_media_video(cls, file, post_id, order):
-        hash = sha256sum(file=file.file)
-        video_backend = get_backend()
+    def create_post_media_video(cls, file, post_id, order, mime_type):
+        in_disk_file = None
 
         if isinstance(file, InMemoryUploadedFile):
-            # If its in memory, doing read shouldn't be an issue as the file should be small.
-            in_disk_file = write_in_memory_file_to_disk(file)
-            thumbnail_path = video_backend.get_thumbnail(video_path=in_disk_file.name, at_time=0.0)
+            # ffmpeg needs it on disk, it gets hashed while written there
+            in_disk_file, hash = write_in_memory_file_to_disk_with_sha256sum(file)
+            video_path = in_disk_file.name
         else:
-            thumbnail_path = video_backend.get_thumbnail(video_path=file.file.name, at_time=0.0)
+            hash = sha256sum(file=file.file)
+            video_path = file.file.name
+
+        try:
+            check_media_hash_is_not_blocked(hash=hash)
+
+            processed_post_video = cls.get_processed_post_video_with_hash(hash=hash)
+
+            if processed_post_video:
+                # Identical videos share the thumbnail and the encoded formats rather than getting encoded and
+                # stored again
+                post_video = processed_post_video._copy_for_post_with_id(post_id=post_id)
+            else:
+                post_video = cls._create_post_video(file=file, video_path=video_path, post_id=post_id, hash=hash,
+                                                    mime_type=mime_type)
+        finally:
+            if in_disk_file:
+                os.remove(in_disk_file.name)
 
-        with open(thumbnail_path, 'rb+') as thumbnail_file:
-            post_video = cls.objects.create(file=file, post_id=post_id, hash=hash, thumbnail=File(thumbnail_file), )
         PostMedia.create_post_media(type=PostMedia.MEDIA_TYPE_VIDEO,
                                     content_object=post_video,
                                     post_id=post_id, order=order)
         return post_video
 
+    @classmethod
+    def _create_post_video(cls, file, video_path, post_id, hash, mime_type):
+        video_backend = get_backend()
+
+        # Probed once for the thumbnail, the dimension fields and the encoding of the formats
+        media_info = video_backend.get_media_info(video_path)
+        thumbnail_path = video_backend.get_thumbnail(video_path=video_path, at_time=0.0, media_info=media_info)
+
+        with open(thumbnail_path, 'rb+') as thumbnail_file:
+            # The dimension fields are saved before the file sets them, so they are given here too. Otherwise they
+            # remain empty in the database and the video gets probed every time it is loaded
+            post_video = cls(file=file, post_id=post_id, hash=hash, mime_type=mime_type,
+                             thumbnail=File(thumbnail_file), width=media_info['width'],
+                             height=media_info['height'], duration=media_info['duration'])
+            post_video.file.video_info = media_info
+            post_video.save()
+
+        return post_video
+
+    @classmethod
+    def get_processed_post_video_with_hash(cls, hash):
+        """
+        Returns a video with the hash which got all of its formats encoded. Gifs have no formats until converted.
+        """
+        return cls.objects.filter(hash=hash, format_set__isnull=False).exclude(
+            format_set__progress__lt=100).order_by('pk').first()
+
+    def _copy_for_post_with_id(self, post_id):
+        post_video = PostVideo.objects.create(file=self.file.name, thumbnail=self.thumbnail.name,
+                                              width=self.width, height=self.height, duration=self.duration,
+                                              thumbnail_width=self.thumbnail_width,
+                                              thumbnail_height=self.thumbnail_height,
+                                              post_id=post_id, hash=self.hash, mime_type=self.mime_type)
+
+        post_video_content_type = ContentType.objects.get_for_model(PostVideo)
+
+        Format.objects.bulk_create([
+            Format(object_id=post_video.pk, content_type=post_video_content_type, field_name=video_format.field_name,
+                   format=video_format.format, progress=video_format.progress, file=video_format.file.name,
+                   width=video_format.width, height=video_format.height, duration=video_format.duration)
+            for video_format in self.format_set.all()
+        ])
+
+        return post_video
+
+    def is_gif(self):
+        if self.mime_type is None:
+            # Videos added before their mime type got stored are told apart by their magic bytes
+            with self.file.open('rb') as file:
+                return file.read(6) in (b'GIF87a', b'GIF89a')
+
+        return self.mime_type == 'image/gif'
+
+    def convert_gif_to_mp4(self):
+        """
+        Replaces the gif of the video with its conversion to mp4, done when processing the media of the post as it can
+        take a while
+        """
+        gif_name = self.file.name
+        gif_path, gif_temp_file = get_fieldfile_local_path(fieldfile=self.file)
+        converted_gif_path = os.path.join(tempfile.gettempdir(), str(uuid.uuid4()) + '.mp4')
+
+        try:
+            ff = ffmpy.FFmpeg(inputs={gif_path: None}, outputs={converted_gif_path: None})
+            ff.run()
+        finally:
+            if gif_temp_file:
+                os.unlink(gif_temp_file.name)
+                gif_temp_file.close()
+
+        media_info = get_backend().get_media_info(converted_gif_path)
+
+        self.width = media_info['width']
+        self.height = media_info['height']
+        self.duration = media_info['duration']
+        self.mime_type = 'video/mp4'
+
+        with open(converted_gif_path, 'rb') as converted_gif_file:
+            self.file.video_info = media_info
+            self.file.save(os.path.basename(converted_gif_path), File(converted_gif_file), save=False)
+
+        os.remove(converted_gif_path)
+
+        self.save()
+        self.file.storage.delete(gif_name)
+
+    def is_processed(self):
+        """
+        Whether the video can be played, which is once any of its formats got encoded rather than all of them.
+        Formats which could not be encoded get deleted, there is nothing to wait for once none is left.
+        """
+        formats_files = list(self.format_set.values_list('file', flat=True))
+        return not formats_files or any(formats_files)
+
+    def get_media_info(self):
+        """
+        Returns the information about the video probed when it was created, None when it is not known
+        """
+        if self.duration is None:
+            return None
+
+        return {
+            'duration': self.duration,
+            'width': self.width,
+            'height': self.height,
+        }
+
+    def delete_unshared_files(self):
+        """
+        Deletes the files of the video which no video of another post shares, its formats delete their own
+        """
+        for field_name in ('file', 'thumbnail'):
+            if not _is_post_media_file_shared(post_media=self, field_name=field_name):
+                delete_file_field(getattr(self, field_name))
+
+
+@receiver(post_delete, sender=PostVideo, dispatch_uid='post_video_deleted_delete_unshared_files')
+def delete_post_video_unshared_files(sender, instance, **kwargs):
+    instance.delete_unshared_files()
+
+
+@receiver(post_delete, sender=Format, dispatch_uid='video_format_deleted_delete_unshared_file')
+def delete_video_format_unshared_file(sender, instance, **kwargs):
+    """
+    Formats get deleted along with their video, the formats of identical videos share their files
+    """
+    if instance.file and not Format.objects.filter(format=instance.format, file=instance.file.name).exclude(
+            pk=instance.pk).exists():
+        delete_file_field(instance.file)
+
 
 class PostComment(models.Model):
     moderated_object = GenericRelation(ModeratedObject, related_query_name='post_comments')
@@ -641,6 +1168,9 @@ class PostComment(models.Model):
     is_edited = models.BooleanField(default=False, null=False, blank=False)
     # This only happens if the comment was reported and found with critical severity content
     is_deleted = models.BooleanField(default=False)
+    # Maintained on write, see reconcile_post_counters if they ever drift
+    replies_count = models.PositiveIntegerField(_('replies count'), default=0, editable=False)
+    reactions_count = models.PositiveIntegerField(_('reactions count'), default=0, editable=False)
 
     @classmethod
     def create_comment(cls, text, commenter, post, parent_comment=None):
@@ -653,33 +1183,37 @@ class PostComment(models.Model):
 
     @classmethod
     def count_comments_for_post_with_id(cls, post_id):
-        count_query = Q(post_id=post_id, parent_comment__isnull=True, is_deleted=False)
-
-        return cls.objects.filter(count_query).count()
+        return Post.objects.values_list('comments_count', flat=True).get(pk=post_id)
 
     @classmethod
     def get_emoji_counts_for_post_comment_with_id(cls, post_comment_id, emoji_id=None, reactor_id=None):
+        if not reactor_id:
+            return PostCommentReactionEmojiCount.get_emoji_counts_for_post_comment_with_id(
+                post_comment_id=post_comment_id, emoji_id=emoji_id)
+
         return Emoji.get_emoji_counts_for_post_comment_with_id(post_comment_id=post_comment_id, emoji_id=emoji_id,
                                                                reactor_id=reactor_id)
 
     def count_replies(self):
-        return self.replies.count()
+        return PostComment.objects.values_list('replies_count', flat=True).get(pk=self.pk)
 
     def count_replies_with_user(self, user):
-        count_query = Q()
+        # The maintained count only has not soft deleted replies
+        replies_count = self.count_replies()
+
+        # Dont count items we have reported
+        hidden_replies_query = Q(moderated_object__reports__reporter_id=user.pk)
 
         if self.post.community_id:
             # Don't count items that have been reported and approved by community moderators
             ModeratedObject = get_moderated_object_model()
-            count_query.add(~Q(moderated_object__status=ModeratedObject.STATUS_APPROVED), Q.AND)
+            hidden_replies_query.add(Q(moderated_object__status=ModeratedObject.STATUS_APPROVED), Q.OR)
 
-        # Dont count soft deleted items
-        count_query.add(Q(is_deleted=False), Q.AND)
+        hidden_replies_query.add(Q(is_deleted=False), Q.AND)
 
-        # Dont count items we have reported
-        count_query.add(~Q(moderated_object__reports__reporter_id=user.pk), Q.AND)
+        hidden_replies_count = self.replies.filter(hidden_replies_query).distinct().count()
 
-        return self.replies.filter(count_query).count()
+        return max(replies_count - hidden_replies_count, 0)
 
     def reply_to_comment(self, commenter, text):
         post_comment = PostComment.create_comment(text=text, commenter=commenter, post=self.post, parent_comment=self)
@@ -692,77 +1226,157 @@ class PostComment(models.Model):
         return PostCommentReaction.create_reaction(reactor=reactor, emoji_id=emoji_id, post_comment=self)
 
     def save(self, *args, **kwargs):
-        ''' On save, update timestamps '''
-        if not self.id:
+        ''' On save, update timestamps and counters '''
+        is_new = not self.id
+
+        if is_new:
             self.created = timezone.now()
 
         self.modified = timezone.now()
 
+        with transaction.atomic():
+            post_comment = super(PostComment, self).save(*args, **kwargs)
+
+            if is_new and not self.is_deleted:
+                self._update_comments_count(amount=1)
+
+        if self.__dict__.get('text') != getattr(self, '_processed_text', None):
+            # The job reads the post comment, wait for it to be committed
+            post_comment_id = self.pk
+            transaction.on_commit(lambda: process_post_comment_text.delay(post_comment_id=post_comment_id))
+            self._processed_text = self.__dict__.get('text')
+
+        if is_new and not self.parent_comment_id:
+            increment_trending_post_score(post_id=self.post_id, post_created=self.post.created,
+                                          score=TRENDING_POST_COMMENT_SCORE)
+
+        return post_comment
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            if not self.is_deleted:
+                self._update_comments_count(amount=-1)
+            return super(PostComment, self).delete(*args, **kwargs)
+
+    def _update_comments_count(self, amount):
+        if self.parent_comment_id:
+            counter_queryset = PostComment.objects.filter(pk=self.parent_comment_id)
+            counter_field = 'replies_count'
+        else:
+            counter_queryset = Post.objects.filter(pk=self.post_id)
+            counter_field = 'comments_count'
+
+        if amount < 0:
+            counter_queryset = counter_queryset.filter(**{'%s__gte' % counter_field: -amount})
+
+        counter_queryset.update(**{counter_field: F(counter_field) + amount})
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post_comment = super(PostComment, cls).from_db(db, field_names, values)
+        post_comment._processed_text = post_comment.__dict__.get('text')
+        return post_comment
+
+    def process_text(self):
         self._process_post_comment_mentions()
-        return super(PostComment, self).save(*args, **kwargs)
+
+    def get_users_who_can_see(self, users):
+        """
+        Returns the given users who can see the post comment with a handful of queries whatever the amount of users.
+        Mirrors User.can_see_post_comment.
+        """
+        if self.is_deleted:
+            return []
+
+        post = self.post
+        users = post.get_users_who_can_see(users=users)
+        users_ids = [user.pk for user in users]
+
+        reporters_ids = set(self.moderated_object.filter(reports__reporter_id__in=users_ids).values_list(
+            'reports__reporter_id', flat=True))
+        users = [user for user in users if user.pk not in reporters_ids]
+
+        UserBlock = get_user_block_model()
+        blocked_users_ids = UserBlock.get_users_ids_blocked_with_user_with_id(user_id=self.commenter_id,
+                                                                             users_ids=users_ids)
+
+        if not post.community_id:
+            return [user for user in users if user.pk not in blocked_users_ids]
+
+        # Comments of staff members can be seen even if blocked with them
+        if blocked_users_ids and self.commenter.is_staff_of_community_with_id(post.community_id):
+            blocked_users_ids = set()
+
+        is_approved = self.moderated_object.filter(status=ModeratedObject.STATUS_APPROVED).exists()
+
+        CommunityMembership = get_community_membership_model()
+        staff_ids = set(CommunityMembership.objects.filter(Q(is_administrator=True) | Q(is_moderator=True),
+                                                           community_id=post.community_id,
+                                                           user_id__in=users_ids).values_list('user_id', flat=True))
+
+        return [user for user in users if
+                user.pk in staff_ids or (not is_approved and user.pk not in blocked_users_ids)]
 
     def _process_post_comment_mentions(self):
-        usernames = extract_usernames_from_string(string=self.text)
+        usernames = set([username.lower() for username in extract_usernames_from_string(string=self.text)])
+
+        self.user_mentions.exclude(user__username__in=usernames).delete()
 
         if not usernames:
-            self.user_mentions.all().delete()
+            return
+
+        existing_mention_usernames = self.user_mentions.values_list('user__username', flat=True)
+
+        User = get_user_model()
+        users = list(User.objects.only('id', 'username').filter(username__in=usernames).exclude(
+            username__in=existing_mention_usernames).exclude(pk=self.commenter_id))
+
+        if not users:
+            return
+
+        users_ids = [user.pk for user in users]
+
+        if self.parent_comment_id:
+            # Its a reply to a comment, if the user previously replied to the comment
+            # or if he's the creator of the parent comment he will already be alerted of the reply,
+            # no need for mention
+            alerted_users_ids = set(self.parent_comment.replies.filter(commenter_id__in=users_ids).values_list(
+                'commenter_id', flat=True))
+            alerted_users_ids.add(self.parent_comment.commenter_id)
         else:
-            existing_mention_usernames = []
-            for existing_mention in self.user_mentions.only('id', 'user__username').all().iterator():
-                if existing_mention.user.username not in usernames:
-                    existing_mention.delete()
-                else:
-                    existing_mention_usernames.append(existing_mention.user.username)
+            # Its a comment to a post, if the user previously commented on the post
+            # he will already be alerted of the comment, no need for mention
+            alerted_users_ids = set(self.post.comments.filter(commenter_id__in=users_ids).values_list(
+                'commenter_id', flat=True))
+
+        mentioned_users = self.get_users_who_can_see(
+            users=[user for user in users if user.pk not in alerted_users_ids])
 
+        if mentioned_users:
             PostCommentUserMention = get_post_comment_user_mention_model()
-            User = get_user_model()
-
-            for username in usernames:
-                username = username.lower()
-                if username not in existing_mention_usernames:
-                    try:
-                        user = User.objects.only('id', 'username').get(username=username)
-                        user_can_see_post_comment = user.can_see_post_comment(post_comment=self)
-                        user_is_commenter = user.pk == self.commenter_id
-
-                        if not user_can_see_post_comment or user_is_commenter:
-                            continue
-
-                        if self.parent_comment:
-                            user_is_parent_comment_creator = self.parent_comment.commenter_id == user.pk
-                            user_has_replied_before = self.parent_comment.replies.filter(commenter_id=user.pk).exists()
-
-                            if user_has_replied_before or user_is_parent_comment_creator:
-                                # Its a reply to a comment, if the user previously replied to the comment
-                                # or if he's the creator of the parent comment he will already be alerted of the reply,
-                                # no need for mention
-                                continue
-                        else:
-                            user_has_commented_before = self.post.comments.filter(commenter_id=user.pk).exists()
-                            if user_has_commented_before:
-                                # Its a comment to a post, if the user previously commented on the post
-                                # he will already be alerted of the comment, no need for mention
-                                continue
-
-                        PostCommentUserMention.create_post_comment_user_mention(user=user, post_comment=self)
-                        existing_mention_usernames.append(username)
-                    except User.DoesNotExist:
-                        pass
+            PostCommentUserMention.create_post_comment_user_mentions(users=mentioned_users, post_comment=self)
 
     def update_comment(self, text):
         self.text = text
         self.is_edited = True
         self.language = get_language_for_text(text)
         self.save()
+        delete_cached_post_comment_translations(post_comment_id=self.pk)
 
     def soft_delete(self):
-        self.is_deleted = True
-        self.delete_notifications()
-        self.save()
+        with transaction.atomic():
+            if not self.is_deleted:
+                self._update_comments_count(amount=-1)
+            self.is_deleted = True
+            self.delete_notifications()
+            self.save()
 
     def unsoft_delete(self):
-        self.is_deleted = False
-        self.save()
+        with transaction.atomic():
+            if self.is_deleted:
+                self._update_comments_count(amount=1)
+            self.is_deleted = False
+            self.save()
 
     def delete_notifications(self):
         # Delete all post comment reply notifications
@@ -796,18 +1410,79 @@ class PostReaction(models.Model):
 
     @classmethod
     def count_reactions_for_post_with_id(cls, post_id, reactor_id=None):
-        count_query = Q(post_id=post_id, reactor__is_deleted=False)
+        if not reactor_id:
+            return Post.objects.values_list('reactions_count', flat=True).get(pk=post_id)
 
-        if reactor_id:
-            count_query.add(Q(reactor_id=reactor_id), Q.AND)
+        count_query = Q(post_id=post_id, reactor__is_deleted=False, reactor_id=reactor_id)
 
         return cls.objects.filter(count_query).count()
 
     def save(self, *args, **kwargs):
-        ''' On save, update timestamps '''
-        if not self.id:
-            self.created = timezone.now()
-        return super(PostReaction, self).save(*args, **kwargs)
+        ''' On save, update timestamps and counters '''
+        with transaction.atomic():
+            if not self.id:
+                self.created = timezone.now()
+                post_reaction = super(PostReaction, self).save(*args, **kwargs)
+                Post.objects.filter(pk=self.post_id).update(reactions_count=F('reactions_count') + 1)
+                PostReactionEmojiCount.update_count(post_id=self.post_id, emoji_id=self.emoji_id, amount=1)
+                increment_trending_post_score(post_id=self.post_id, post_created=self.post.created,
+                                              score=TRENDING_POST_REACTION_SCORE)
+                return post_reaction
+
+            previous_emoji_id = PostReaction.objects.values_list('emoji_id', flat=True).get(pk=self.pk)
+            post_reaction = super(PostReaction, self).save(*args, **kwargs)
+
+            if previous_emoji_id != self.emoji_id:
+                PostReactionEmojiCount.update_count(post_id=self.post_id, emoji_id=previous_emoji_id, amount=-1)
+                PostReactionEmojiCount.update_count(post_id=self.post_id, emoji_id=self.emoji_id, amount=1)
+
+            return post_reaction
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            Post.objects.filter(pk=self.post_id, reactions_count__gt=0).update(
+                reactions_count=F('reactions_count') - 1)
+            PostReactionEmojiCount.update_count(post_id=self.post_id, emoji_id=self.emoji_id, amount=-1)
+            return super(PostReaction, self).delete(*args, **kwargs)
+
+
+class PostReactionEmojiCount(models.Model):
+    """
+    The maintained amount of reactions with an emoji on a post
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='emoji_counts')
+    emoji = models.ForeignKey(Emoji, on_delete=models.CASCADE, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('post', 'emoji',)
+
+    @classmethod
+    def update_count(cls, post_id, emoji_id, amount):
+        emoji_count_queryset = cls.objects.filter(post_id=post_id, emoji_id=emoji_id)
+
+        if amount < 0:
+            emoji_count_queryset.filter(count__gte=-amount).update(count=F('count') + amount)
+            return
+
+        if not emoji_count_queryset.update(count=F('count') + amount):
+            try:
+                with transaction.atomic():
+                    cls.objects.create(post_id=post_id, emoji_id=emoji_id, count=amount)
+            except IntegrityError:
+                # Created concurrently
+                emoji_count_queryset.update(count=F('count') + amount)
+
+    @classmethod
+    def get_emoji_counts_for_post_with_id(cls, post_id, emoji_id=None):
+        emoji_counts_query = Q(post_id=post_id, count__gt=0)
+
+        if emoji_id:
+            emoji_counts_query.add(Q(emoji_id=emoji_id), Q.AND)
+
+        emoji_counts = cls.objects.select_related('emoji').filter(emoji_counts_query).order_by('-count')
+
+        return [{'emoji': emoji_count.emoji, 'count': emoji_count.count} for emoji_count in emoji_counts]
 
 
 class PostCommentReaction(models.Model):
@@ -825,18 +1500,81 @@ class PostCommentReaction(models.Model):
 
     @classmethod
     def count_reactions_for_post_with_id(cls, post_comment_id, reactor_id=None):
-        count_query = Q(post_comment_id=post_comment_id, reactor__is_deleted=False)
+        if not reactor_id:
+            return PostComment.objects.values_list('reactions_count', flat=True).get(pk=post_comment_id)
 
-        if reactor_id:
-            count_query.add(Q(reactor_id=reactor_id), Q.AND)
+        count_query = Q(post_comment_id=post_comment_id, reactor__is_deleted=False, reactor_id=reactor_id)
 
         return cls.objects.filter(count_query).count()
 
     def save(self, *args, **kwargs):
-        ''' On save, update timestamps '''
-        if not self.id:
-            self.created = timezone.now()
-        return super(PostCommentReaction, self).save(*args, **kwargs)
+        ''' On save, update timestamps and counters '''
+        with transaction.atomic():
+            if not self.id:
+                self.created = timezone.now()
+                post_comment_reaction = super(PostCommentReaction, self).save(*args, **kwargs)
+                PostComment.objects.filter(pk=self.post_comment_id).update(reactions_count=F('reactions_count') + 1)
+                PostCommentReactionEmojiCount.update_count(post_comment_id=self.post_comment_id,
+                                                           emoji_id=self.emoji_id, amount=1)
+                return post_comment_reaction
+
+            previous_emoji_id = PostCommentReaction.objects.values_list('emoji_id', flat=True).get(pk=self.pk)
+            post_comment_reaction = super(PostCommentReaction, self).save(*args, **kwargs)
+
+            if previous_emoji_id != self.emoji_id:
+                PostCommentReactionEmojiCount.update_count(post_comment_id=self.post_comment_id,
+                                                           emoji_id=previous_emoji_id, amount=-1)
+                PostCommentReactionEmojiCount.update_count(post_comment_id=self.post_comment_id,
+                                                           emoji_id=self.emoji_id, amount=1)
+
+            return post_comment_reaction
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            PostComment.objects.filter(pk=self.post_comment_id, reactions_count__gt=0).update(
+                reactions_count=F('reactions_count') - 1)
+            PostCommentReactionEmojiCount.update_count(post_comment_id=self.post_comment_id, emoji_id=self.emoji_id,
+                                                       amount=-1)
+            return super(PostCommentReaction, self).delete(*args, **kwargs)
+
+
+class PostCommentReactionEmojiCount(models.Model):
+    """
+    The maintained amount of reactions with an emoji on a post comment
+    """
+    post_comment = models.ForeignKey(PostComment, on_delete=models.CASCADE, related_name='emoji_counts')
+    emoji = models.ForeignKey(Emoji, on_delete=models.CASCADE, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('post_comment', 'emoji',)
+
+    @classmethod
+    def update_count(cls, post_comment_id, emoji_id, amount):
+        emoji_count_queryset = cls.objects.filter(post_comment_id=post_comment_id, emoji_id=emoji_id)
+
+        if amount < 0:
+            emoji_count_queryset.filter(count__gte=-amount).update(count=F('count') + amount)
+            return
+
+        if not emoji_count_queryset.update(count=F('count') + amount):
+            try:
+                with transaction.atomic():
+                    cls.objects.create(post_comment_id=post_comment_id, emoji_id=emoji_id, count=amount)
+            except IntegrityError:
+                # Created concurrently
+                emoji_count_queryset.update(count=F('count') + amount)
+
+    @classmethod
+    def get_emoji_counts_for_post_comment_with_id(cls, post_comment_id, emoji_id=None):
+        emoji_counts_query = Q(post_comment_id=post_comment_id, count__gt=0)
+
+        if emoji_id:
+            emoji_counts_query.add(Q(emoji_id=emoji_id), Q.AND)
+
+        emoji_counts = cls.objects.select_related('emoji').filter(emoji_counts_query).order_by('-count')
+
+        return [{'emoji': emoji_count.emoji, 'count': emoji_count.count} for emoji_count in emoji_counts]
 
 
 class PostMute(models.Model):
@@ -881,13 +1619,21 @@ class PostUserMention(models.Model):
         unique_together = ('user', 'post',)
 
     @classmethod
-    def create_post_user_mention(cls, user, post):
-        post_user_mention = cls.objects.create(user=user, post=post)
-        PostUserMentionNotification = get_post_user_mention_notification_model()
-        PostUserMentionNotification.create_post_user_mention_notification(post_user_mention_id=post_user_mention.pk,
-                                                                          owner_id=user.pk)
-        send_post_user_mention_push_notification(post_user_mention=post_user_mention)
-        return post_user_mention
+    def create_post_user_mentions(cls, users, post):
+        with transaction.atomic():
+            # Another job of the same post might have created some of the mentions meanwhile, those are left to it
+            cls.objects.bulk_create([cls(user=user, post=post) for user in users], ignore_conflicts=True)
+
+            post_user_mentions = list(cls.objects.select_related('user', 'post').filter(
+                post=post, user__in=users, postusermentionnotification__isnull=True))
+
+            PostUserMentionNotification = get_post_user_mention_notification_model()
+            PostUserMentionNotification.create_post_user_mention_notifications(post_user_mentions=post_user_mentions)
+
+        for post_user_mention in post_user_mentions:
+            send_post_user_mention_push_notification(post_user_mention=post_user_mention)
+
+        return post_user_mentions
 
 
 class PostCommentUserMention(models.Model):
@@ -898,11 +1644,21 @@ class PostCommentUserMention(models.Model):
         unique_together = ('user', 'post_comment',)
 
     @classmethod
-    def create_post_comment_user_mention(cls, user, post_comment):
-        post_comment_user_mention = cls.objects.create(user=user, post_comment=post_comment)
-        PostCommentUserMentionNotification = get_post_comment_user_mention_notification_model()
-        PostCommentUserMentionNotification.create_post_comment_user_mention_notification(
-            post_comment_user_mention_id=post_comment_user_mention.pk,
-            owner_id=user.pk)
-        send_post_comment_user_mention_push_notification(post_comment_user_mention=post_comment_user_mention)
-        return post_comment_user_mention
+    def create_post_comment_user_mentions(cls, users, post_comment):
+        with transaction.atomic():
+            # Another job of the same post comment might have created some of the mentions meanwhile, those are left
+            # to it
+            cls.objects.bulk_create([cls(user=user, post_comment=post_comment) for user in users],
+                                    ignore_conflicts=True)
+
+            post_comment_user_mentions = list(cls.objects.select_related('user', 'post_comment').filter(
+                post_comment=post_comment, user__in=users, postcommentusermentionnotification__isnull=True))
+
+            PostCommentUserMentionNotification = get_post_comment_user_mention_notification_model()
+            PostCommentUserMentionNotification.create_post_comment_user_mention_notifications(
+                post_comment_user_mentions=post_comment_user_mentions)
+
+        for post_comment_user_mention in post_comment_user_mentions:
+            send_post_comment_user_mention_push_notification(post_comment_user_mention=post_comment_user_mention)
+
+        return post_comment_user_mentions
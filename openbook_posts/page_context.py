@@ -0,0 +1,226 @@
+from django.db.models import Q, Count
+
+from openbook_common.utils.model_loaders import get_post_reaction_model, get_post_comment_model, \
+    get_post_mute_model, get_community_membership_model, get_user_block_model, get_emoji_model, \
+    get_moderated_object_model, get_post_model, get_post_reaction_emoji_count_model
+
+
+class PostsPageContext:
+    """
+    Loads what the post serializer fields need for a whole page of posts in a handful of grouped queries,
+    instead of running those queries once per post.
+
+    Every piece of data is loaded the first time a field asks for it.
+    """
+
+    def __init__(self, posts, user):
+        self.posts = posts
+        self.user = user
+        self.posts_ids = [post.pk for post in posts]
+
+        self._reactions = None
+        self._comments_counts = None
+        self._emoji_counts = None
+        self._muted_posts_ids = None
+        self._creators_memberships = None
+        self._circles = None
+
+    def get_reaction_for_post(self, post):
+        if self._reactions is None:
+            self._reactions = self._load_reactions()
+        return self._reactions.get(post.pk)
+
+    def get_comments_count_for_post(self, post):
+        if self._comments_counts is None:
+            self._comments_counts = self._load_comments_counts()
+        return self._comments_counts.get(post.pk, 0)
+
+    def get_emoji_counts_for_post(self, post):
+        if self._emoji_counts is None:
+            self._emoji_counts = self._load_emoji_counts()
+        return self._emoji_counts.get(post.pk, [])
+
+    def is_post_muted(self, post):
+        if self._muted_posts_ids is None:
+            self._muted_posts_ids = self._load_muted_posts_ids()
+        return post.pk in self._muted_posts_ids
+
+    def get_creator_membership_for_post(self, post):
+        if self._creators_memberships is None:
+            self._creators_memberships = self._load_creators_memberships()
+        return self._creators_memberships.get((post.community_id, post.creator_id))
+
+    def get_circles_for_post(self, post):
+        if self._circles is None:
+            self._circles = self._load_circles()
+        return self._circles.get(post.pk, [])
+
+    def _load_reactions(self):
+        if self.user.is_anonymous:
+            return {}
+
+        PostReaction = get_post_reaction_model()
+        reactions = PostReaction.objects.select_related('emoji').filter(reactor_id=self.user.pk,
+                                                                         post_id__in=self.posts_ids)
+
+        return {reaction.post_id: reaction for reaction in reactions}
+
+    def _load_comments_counts(self):
+        Post = get_post_model()
+        comments_counts = dict(Post.objects.filter(id__in=self.posts_ids).values_list('id', 'comments_count'))
+
+        if self.user.is_anonymous:
+            return comments_counts
+
+        # The maintained counts only have top level and not soft deleted comments
+        hidden_comments_query = Q(post_id__in=self.posts_ids, parent_comment__isnull=True, is_deleted=False)
+
+        # Dont count items we have reported
+        hidden_query = Q(moderated_object__reports__reporter_id=self.user.pk)
+
+        # Don't count items that have been reported and approved by community moderators
+        ModeratedObject = get_moderated_object_model()
+        hidden_query.add(Q(post__community__isnull=False, moderated_object__status=ModeratedObject.STATUS_APPROVED),
+                         Q.OR)
+
+        hidden_comments_query.add(hidden_query, Q.AND)
+
+        PostComment = get_post_comment_model()
+        hidden_comments_counts = PostComment.objects.filter(hidden_comments_query).values('post_id').annotate(
+            count=Count('id', distinct=True))
+
+        for hidden_comments_count in hidden_comments_counts:
+            post_id = hidden_comments_count['post_id']
+            comments_counts[post_id] = max(comments_counts.get(post_id, 0) - hidden_comments_count['count'], 0)
+
+        return comments_counts
+
+    def _load_emoji_counts(self):
+        if self.user.is_anonymous:
+            posts_ids = [post.pk for post in self.posts if post.public_reactions]
+        else:
+            posts_ids = self.posts_ids
+
+        if not posts_ids:
+            return {}
+
+        PostReactionEmojiCount = get_post_reaction_emoji_count_model()
+        counts = PostReactionEmojiCount.objects.filter(post_id__in=posts_ids, count__gt=0).values_list(
+            'post_id', 'emoji_id', 'count')
+
+        posts_emoji_counts = {}
+
+        for post_id, emoji_id, count in counts:
+            post_emoji_counts = posts_emoji_counts.setdefault(post_id, {})
+            post_emoji_counts[emoji_id] = count
+
+        if not self.user.is_anonymous:
+            self._subtract_hidden_reactions(posts_emoji_counts=posts_emoji_counts)
+
+        Emoji = get_emoji_model()
+        emojis_ids = set()
+        for post_emoji_counts in posts_emoji_counts.values():
+            emojis_ids.update(post_emoji_counts.keys())
+        emojis = Emoji.objects.in_bulk(list(emojis_ids))
+
+        emoji_counts = {}
+
+        for post_id, post_emoji_counts in posts_emoji_counts.items():
+            sorted_emoji_counts = sorted(post_emoji_counts.items(), key=lambda emoji_count: emoji_count[1],
+                                         reverse=True)
+            emoji_counts[post_id] = [{'emoji': emojis[emoji_id], 'count': count} for emoji_id, count in
+                                     sorted_emoji_counts if count > 0]
+
+        return emoji_counts
+
+    def _subtract_hidden_reactions(self, posts_emoji_counts):
+        """
+        The reactions of blocked users are not counted, except in communities when they come from staff members
+        or when we are staff members ourselves
+        """
+        UserBlock = get_user_block_model()
+        blocks = UserBlock.objects.filter(Q(blocker_id=self.user.pk) | Q(blocked_user_id=self.user.pk)).values_list(
+            'blocker_id', 'blocked_user_id')
+
+        blocked_users_ids = set()
+        for blocker_id, blocked_user_id in blocks:
+            blocked_users_ids.add(blocked_user_id if blocker_id == self.user.pk else blocker_id)
+
+        if not blocked_users_ids:
+            return
+
+        PostReaction = get_post_reaction_model()
+        hidden_reactions = PostReaction.objects.filter(post_id__in=list(posts_emoji_counts.keys()),
+                                                       reactor_id__in=blocked_users_ids).values_list('post_id',
+                                                                                                     'emoji_id',
+                                                                                                     'reactor_id')
+
+        posts_communities = {post.pk: post.community_id for post in self.posts}
+        communities_staff = self._load_communities_staff(communities_ids=set(posts_communities.values()))
+
+        for post_id, emoji_id, reactor_id in hidden_reactions:
+            community_id = posts_communities.get(post_id)
+
+            if community_id:
+                community_staff = communities_staff.get(community_id, set())
+                if self.user.pk in community_staff or reactor_id in community_staff:
+                    continue
+
+            if emoji_id in posts_emoji_counts[post_id]:
+                posts_emoji_counts[post_id][emoji_id] -= 1
+
+    def _load_communities_staff(self, communities_ids):
+        communities_ids = [community_id for community_id in communities_ids if community_id]
+
+        if not communities_ids:
+            return {}
+
+        CommunityMembership = get_community_membership_model()
+        staff_memberships = CommunityMembership.objects.filter(
+            Q(community_id__in=communities_ids) & Q(Q(is_administrator=True) | Q(is_moderator=True))).values_list(
+            'community_id', 'user_id')
+
+        communities_staff = {}
+        for community_id, user_id in staff_memberships:
+            communities_staff.setdefault(community_id, set()).add(user_id)
+
+        return communities_staff
+
+    def _load_muted_posts_ids(self):
+        if self.user.is_anonymous:
+            return set()
+
+        PostMute = get_post_mute_model()
+        return set(PostMute.objects.filter(muter_id=self.user.pk, post_id__in=self.posts_ids).values_list('post_id',
+                                                                                                         flat=True))
+
+    def _load_creators_memberships(self):
+        communities_ids = set([post.community_id for post in self.posts if post.community_id])
+
+        if not communities_ids:
+            return {}
+
+        creators_ids = set([post.creator_id for post in self.posts if post.community_id])
+
+        CommunityMembership = get_community_membership_model()
+        memberships = CommunityMembership.objects.filter(community_id__in=communities_ids, user_id__in=creators_ids)
+
+        return {(membership.community_id, membership.user_id): membership for membership in memberships}
+
+    def _load_circles(self):
+        if self.user.is_anonymous:
+            return {}
+
+        own_posts_ids = [post.pk for post in self.posts if post.creator_id == self.user.pk]
+
+        if not own_posts_ids:
+            return {}
+
+        Post = get_post_model()
+        posts_circles = Post.circles.through.objects.select_related('circle').filter(post_id__in=own_posts_ids)
+
+        circles = {}
+        for post_circle in posts_circles:
+            circles.setdefault(post_circle.post_id, []).append(post_circle.circle)
+
+        return circles
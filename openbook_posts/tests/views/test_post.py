@@ -1,9 +1,11 @@
 # Create your tests here.
 import json
 import tempfile
+import uuid
 from os import access, F_OK
 
 from PIL import Image
+from django.core.management import call_command
 from django.urls import reverse
 from django_rq import get_worker
 from faker import Faker
@@ -21,12 +23,14 @@ from rq import SimpleWorker
 
 from openbook_common.tests.helpers import make_authentication_headers_for_user, make_fake_post_text, \
     make_fake_post_comment_text, make_user, make_circle, make_community, make_moderation_category, \
-    get_test_videos, get_test_image, make_proxy_whitelisted_domain
+    get_test_videos, get_test_video, get_test_image, make_proxy_whitelisted_domain, serve_test_website, make_test_website_url
 from openbook_common.utils.model_loaders import get_language_model
 from openbook_communities.models import Community
 from openbook_notifications.models import PostUserMentionNotification, Notification
 from openbook_posts.models import Post, PostUserMention, PostMedia
 from openbook_common.models import ProxyWhitelistDomain
+from openbook_translation import translation_strategy
+from video_encoding.backends.ffmpeg import FFmpegBackend
 
 logger = logging.getLogger(__name__)
 fake = Faker()
@@ -682,6 +686,39 @@ class PostItemAPITests(OpenbookAPITestCase):
 
             self.assertFalse(Post.objects.filter(pk=post.pk).exists())
 
+    def test_delete_image_post_keeps_files_of_identical_image_post(self):
+        """
+        should share the files of identical images and only delete them along with the last post having them
+        """
+        user = make_user()
+
+        image = Image.new('RGB', (100, 100))
+        tmp_file = tempfile.NamedTemporaryFile(suffix='.jpg')
+        image.save(tmp_file)
+        tmp_file.seek(0)
+
+        post = user.create_public_post(text=make_fake_post_text(), image=ImageFile(tmp_file))
+        tmp_file.seek(0)
+        identical_post = user.create_public_post(text=make_fake_post_text(), image=ImageFile(tmp_file))
+
+        post_image = post.image
+        identical_post_image = identical_post.image
+
+        self.assertEqual(post_image.image.name, identical_post_image.image.name)
+        self.assertEqual(post_image.thumbnail.name, identical_post_image.thumbnail.name)
+
+        storage = post_image.image.storage
+
+        user.delete_post(post=post)
+
+        self.assertTrue(storage.exists(identical_post_image.image.name))
+        self.assertTrue(storage.exists(identical_post_image.thumbnail.name))
+
+        user.delete_post(post=identical_post)
+
+        self.assertFalse(storage.exists(identical_post_image.image.name))
+        self.assertFalse(storage.exists(identical_post_image.thumbnail.name))
+
     def test_can_delete_post_of_community_if_mod(self):
         """
         should be able to delete a community post if moderator and return 200
@@ -820,6 +857,22 @@ class PostItemAPITests(OpenbookAPITestCase):
         self.client.patch(url, data, **headers)
         get_language_for_text_call.assert_called_with(edited_text)
 
+    def test_assign_language_assigns_detected_language_to_posts(self):
+        """
+        should assign the detected language to posts without one
+        """
+        user = make_user()
+        post = user.create_public_post(text='Ik ben en man 😀. Jij bent en vrouw.')
+        other_post = user.create_public_post(text=make_fake_post_text())
+        Post.objects.filter(pk__in=[post.pk, other_post.pk]).update(language=None)
+
+        call_command('assign_language', type='posts', batch_size=1)
+
+        post.refresh_from_db()
+        other_post.refresh_from_db()
+        self.assertEqual(post.language.code, 'nl')
+        self.assertEqual(other_post.language.code, 'no')
+
     def test_editing_own_post_updates_mentions(self):
         """
         should update mentions when updating text
@@ -833,6 +886,8 @@ class PostItemAPITests(OpenbookAPITestCase):
 
         post = user.create_public_post(text=post_text)
 
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post_user_mention = PostUserMention.objects.get(user_id=mentioned_user.pk, post_id=post.pk)
 
         newly_mentioned_user = make_user()
@@ -849,6 +904,8 @@ class PostItemAPITests(OpenbookAPITestCase):
 
         self.assertEqual(status.HTTP_200_OK, response.status_code)
 
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post = Post.objects.get(text=post_text, creator_id=user.pk)
         new_post_user_mention = PostUserMention.objects.get(user_id=newly_mentioned_user.pk, post_id=post.pk)
 
@@ -900,6 +957,8 @@ class PostItemAPITests(OpenbookAPITestCase):
 
         post = user.create_public_post(text=post_text)
 
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post_user_mention = PostUserMention.objects.get(user_id=mentioned_user.pk, post_id=post.pk)
 
         data = {
@@ -912,6 +971,8 @@ class PostItemAPITests(OpenbookAPITestCase):
 
         self.assertEqual(status.HTTP_200_OK, response.status_code)
 
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post = Post.objects.get(text=post_text, creator_id=user.pk)
 
         self.assertEqual(PostUserMention.objects.filter(user_id=mentioned_user.pk, post_id=post.pk).count(), 1)
@@ -1777,6 +1838,32 @@ class TranslatePostAPITests(OpenbookAPITestCase):
         response_post = json.loads(response.content)
         self.assertEqual(response_post['translated_text'], 'I am a man 😀. You\'re a woman.')
 
+    def test_translates_post_text_again_once_edited(self):
+        """
+        should not reuse the translation of a post once it got edited and return 200
+        """
+        user = make_user()
+        Language = get_language_model()
+        user.translation_language = Language.objects.get(code='en')
+        user.save()
+        text = 'Ik ben en man 😀. Jij bent en vrouw.'
+        headers = make_authentication_headers_for_user(user)
+        post = user.create_public_post(text=text)
+
+        url = self._get_url(post=post)
+        self.client.post(url, **headers)
+
+        user.update_post(post=post, text=text)
+
+        with mock.patch.object(translation_strategy, 'translate_text',
+                               wraps=translation_strategy.translate_text) as translate_text_call:
+            response = self.client.post(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response_post = json.loads(response.content)
+        self.assertEqual(response_post['translated_text'], 'I am a man 😀. You\'re a woman.')
+        translate_text_call.assert_called_once()
+
     def test_cannot_translate_post_text_without_user_language(self):
         """
         should not translate post text and return 400 if user language is not set
@@ -2454,6 +2541,197 @@ class PublishPostAPITests(OpenbookAPITestCase):
                 self.assertEqual(post_media_video.height, test_file['height'])
                 self.assertTrue(post_media_video.format_set.exists())
 
+    def test_publishing_draft_video_post_probes_video_once(self):
+        """
+        should probe the video once when adding it and not again when processing it
+        """
+        user = make_user()
+
+        headers = make_authentication_headers_for_user(user)
+
+        test_file = get_test_video()
+
+        with mock.patch.object(FFmpegBackend, 'get_media_info', autospec=True,
+                               side_effect=FFmpegBackend.get_media_info) as mock_get_media_info:
+            with open(test_file['path'], 'rb') as file:
+                post = user.create_public_post(video=File(file), is_draft=True)
+
+            self.assertEqual(mock_get_media_info.call_count, 1)
+
+            mock_get_media_info.reset_mock()
+
+            url = self._get_url(post=post)
+
+            response = self.client.post(url, **headers, format='multipart')
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        post_video = post.media.get(type=PostMedia.MEDIA_TYPE_VIDEO).content_object
+        formats = post_video.format_set.all()
+
+        self.assertTrue(formats.exists())
+        self.assertTrue(all(video_format.progress == 100 for video_format in formats))
+
+        # Only the encoded formats get probed, for their own dimensions
+        probed_paths = [call[0][1] for call in mock_get_media_info.call_args_list]
+        self.assertEqual(len(probed_paths), len(formats))
+        self.assertNotIn(post_video.file.path, probed_paths)
+
+    def test_publishing_draft_video_post_publishes_with_first_format(self):
+        """
+        should publish a draft video post as soon as the first format of its video is encoded
+        """
+        user = make_user()
+
+        headers = make_authentication_headers_for_user(user)
+
+        test_file = get_test_video()
+
+        formats_options = settings.VIDEO_ENCODING_FORMATS['FFmpeg']
+        other_format_options = dict(formats_options[0], name='mp4_other')
+
+        with self.settings(VIDEO_ENCODING_FORMATS={'FFmpeg': formats_options + [other_format_options]}):
+            with open(test_file['path'], 'rb') as file:
+                post = user.create_public_post(video=File(file), is_draft=True)
+
+            url = self._get_url(post=post)
+
+            response = self.client.post(url, **headers, format='multipart')
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            # Processing the media and encoding the first format
+            get_worker(worker_class=SimpleWorker).work(burst=True, max_jobs=2)
+
+            post.refresh_from_db()
+            self.assertEqual(post.status, Post.STATUS_PUBLISHED)
+
+            post_video = post.media.get(type=PostMedia.MEDIA_TYPE_VIDEO).content_object
+            self.assertEqual(1, len([video_format for video_format in post_video.format_set.all() if
+                                     video_format.file]))
+
+            get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        self.assertEqual(2, len([video_format for video_format in post_video.format_set.all() if
+                                 video_format.file]))
+
+    def test_publishing_draft_gif_post_converts_gif_to_mp4(self):
+        """
+        should convert the gif of a draft post to a mp4 video when publishing
+        """
+        user = make_user()
+
+        headers = make_authentication_headers_for_user(user)
+
+        test_file = get_test_videos()[2]
+
+        with open(test_file['path'], 'rb') as file:
+            post = user.create_public_post(video=File(file), is_draft=True)
+
+        url = self._get_url(post=post)
+
+        response = self.client.post(url, **headers, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        post.refresh_from_db()
+
+        self.assertEqual(post.status, Post.STATUS_PUBLISHED)
+
+        post_video = post.media.get(type=PostMedia.MEDIA_TYPE_VIDEO).content_object
+
+        self.assertTrue(post_video.file.name.endswith('.mp4'))
+        self.assertEqual(post_video.duration, test_file['duration'])
+        self.assertEqual(post_video.width, test_file['width'])
+        self.assertEqual(post_video.height, test_file['height'])
+        self.assertTrue(post_video.format_set.exists())
+
+    def test_publishing_draft_gif_post_converts_gif_named_otherwise_to_mp4(self):
+        """
+        should tell a gif apart by its content rather than its file name and convert it to a mp4 video when publishing
+        """
+        user = make_user()
+
+        headers = make_authentication_headers_for_user(user)
+
+        test_file = get_test_videos()[2]
+
+        with open(test_file['path'], 'rb') as file, tempfile.NamedTemporaryFile(suffix='.mp4') as misnamed_file:
+            misnamed_file.write(file.read())
+            misnamed_file.seek(0)
+            post = user.create_public_post(video=File(misnamed_file), is_draft=True)
+
+        response = self.client.post(self._get_url(post=post), **headers, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        post.refresh_from_db()
+
+        self.assertEqual(post.status, Post.STATUS_PUBLISHED)
+
+        post_video = post.media.get(type=PostMedia.MEDIA_TYPE_VIDEO).content_object
+
+        self.assertEqual(post_video.mime_type, 'video/mp4')
+        self.assertEqual(post_video.duration, test_file['duration'])
+        self.assertTrue(post_video.format_set.exists())
+
+    def test_publishing_identical_draft_video_post_reuses_formats(self):
+        """
+        should reuse the thumbnail and the encoded formats of an identical video rather than processing it again
+        """
+        user = make_user()
+
+        headers = make_authentication_headers_for_user(user)
+
+        test_file = get_test_video()
+
+        with open(test_file['path'], 'rb') as file:
+            post = user.create_public_post(video=File(file), is_draft=True)
+
+        response = self.client.post(self._get_url(post=post), **headers, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        with mock.patch.object(FFmpegBackend, 'get_thumbnail') as mock_get_thumbnail, \
+                mock.patch.object(FFmpegBackend, 'encode') as mock_encode:
+            with open(test_file['path'], 'rb') as file:
+                identical_post = user.create_public_post(video=File(file), is_draft=True)
+
+            response = self.client.post(self._get_url(post=identical_post), **headers, format='multipart')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            get_worker(worker_class=SimpleWorker).work(burst=True)
+
+            mock_get_thumbnail.assert_not_called()
+            mock_encode.assert_not_called()
+
+        identical_post.refresh_from_db()
+        self.assertEqual(identical_post.status, Post.STATUS_PUBLISHED)
+
+        post_video = post.media.get(type=PostMedia.MEDIA_TYPE_VIDEO).content_object
+        identical_post_video = identical_post.media.get(type=PostMedia.MEDIA_TYPE_VIDEO).content_object
+
+        self.assertEqual(post_video.file.name, identical_post_video.file.name)
+        self.assertEqual(post_video.thumbnail.name, identical_post_video.thumbnail.name)
+
+        formats_files = sorted(video_format.file.name for video_format in identical_post_video.format_set.all())
+        self.assertTrue(formats_files)
+        self.assertEqual(sorted(video_format.file.name for video_format in post_video.format_set.all()), formats_files)
+
+        storage = identical_post_video.file.storage
+
+        user.delete_post(post=post)
+
+        for file_name in [identical_post_video.file.name] + formats_files:
+            self.assertTrue(storage.exists(file_name))
+
     def test_can_publish_draft_text_post(self):
         """
         should be able to publish a draft text post and return 200
@@ -2650,10 +2928,14 @@ class GetPostPreviewDataAPITests(OpenbookAPITestCase):
         """
         should retrieve preview data for a post and return 200
         """
+        serve_test_website(self)
         user = make_user()
         headers = make_authentication_headers_for_user(user)
-        post_text = 'im a text with link www.okuna.io'
+        post_text = 'im a text with link %s' % make_test_website_url()
         post = user.create_public_post(text=post_text)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         make_proxy_whitelisted_domain(domain='okuna.io')
 
         url = self._get_url(post)
@@ -2666,6 +2948,57 @@ class GetPostPreviewDataAPITests(OpenbookAPITestCase):
         self.assertTrue('image_url' in preview_data.keys())
         self.assertTrue('favicon_url' in preview_data.keys())
         self.assertTrue('domain_url' in preview_data.keys())
+        self.assertEqual(preview_data['title'], 'Okuna')
+
+    def test_retrieves_post_preview_data_fetched_when_creating_post(self):
+        """
+        should retrieve the preview data fetched when the post got created, without fetching it again and return 200
+        """
+        website = serve_test_website(self)
+        make_proxy_whitelisted_domain(domain='okuna.io')
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+        post_text = 'im a text with link %s' % make_test_website_url()
+        post = user.create_public_post(text=post_text)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        website.shutdown()
+
+        url = self._get_url(post)
+        response = self.client.get(url, **headers)
+        preview_data = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(preview_data['title'], 'Okuna')
+        self.assertEqual(preview_data['description'], 'Ethical social network')
+        self.assertEqual(preview_data['domain_url'], 'www.okuna.io')
+
+    def test_retrieves_post_preview_data_of_not_found_link_once(self):
+        """
+        should remember a post link was not found and return 400
+        """
+        website = serve_test_website(self)
+        make_proxy_whitelisted_domain(domain='okuna.io')
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+        post_text = 'im a text with link %s' % make_test_website_url(path='not-found/%s' % uuid.uuid4().hex)
+        post = user.create_public_post(text=post_text)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        url = self._get_url(post)
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        website.shutdown()
+
+        response = self.client.get(url, **headers)
+        response_message = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response_message['message'], 'The linked url associated for preview was not found.')
 
     def test_cannot_retrieve_post_preview_data_for_domain_not_in_whitelist(self):
         """
@@ -2676,6 +3009,8 @@ class GetPostPreviewDataAPITests(OpenbookAPITestCase):
         post_text = 'im a text with link www.google.nl www.testsite.com'
         post = user.create_public_post(text=post_text)
 
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         url = self._get_url(post)
         response = self.client.get(url, **headers)
 
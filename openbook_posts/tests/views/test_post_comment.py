@@ -1,5 +1,7 @@
 from django.urls import reverse
+from django_rq import get_worker
 from faker import Faker
+from rq import SimpleWorker
 from rest_framework import status
 from openbook_common.tests.models import OpenbookAPITestCase
 from unittest import mock
@@ -693,8 +695,11 @@ class PostCommentItemAPITests(OpenbookAPITestCase):
         post_comment_text = 'Hello @' + mentioned_user.username
 
         post = user.create_public_post(text=make_fake_post_text())
+
         post_comment = user.comment_post(post=post, text=post_comment_text)
 
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post_comment_user_mention = PostCommentUserMention.objects.get(user_id=mentioned_user.pk,
                                                                        post_comment_id=post_comment.pk)
 
@@ -712,6 +717,8 @@ class PostCommentItemAPITests(OpenbookAPITestCase):
 
         self.assertEqual(status.HTTP_200_OK, response.status_code)
 
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post_comment = PostComment.objects.get(text=post_comment_text, commenter_id=user.pk)
 
         self.assertFalse(
@@ -769,8 +776,11 @@ class PostCommentItemAPITests(OpenbookAPITestCase):
         post_comment_text = 'Hello @' + mentioned_user.username
 
         post = user.create_public_post(text=make_fake_post_text())
+
         post_comment = user.comment_post(post=post, text=post_comment_text)
 
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post_comment_user_mention = PostCommentUserMention.objects.get(user_id=mentioned_user.pk,
                                                                        post_comment_id=post_comment.pk)
 
@@ -784,6 +794,8 @@ class PostCommentItemAPITests(OpenbookAPITestCase):
 
         self.assertEqual(status.HTTP_200_OK, response.status_code)
 
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post_comment = PostComment.objects.get(text=post_comment_text, commenter_id=user.pk)
 
         self.assertEqual(
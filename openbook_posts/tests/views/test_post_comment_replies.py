@@ -5,7 +5,9 @@ from unittest import mock
 from unittest.mock import ANY
 
 from django.urls import reverse
+from django_rq import get_worker
 from faker import Faker
+from rq import SimpleWorker
 from rest_framework import status
 from openbook_common.tests.models import OpenbookAPITestCase
 
@@ -1855,6 +1857,8 @@ class PostCommentRepliesAPITests(OpenbookAPITestCase):
         parent_comment_creator = make_user()
         parent_comment = parent_comment_creator.comment_post(post=post, text=make_fake_post_comment_text())
 
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         reply_comment_text = 'Hello @' + post_creator.username
 
         data = self._get_create_post_comment_request_data(reply_comment_text)
@@ -1863,6 +1867,9 @@ class PostCommentRepliesAPITests(OpenbookAPITestCase):
         response = self.client.put(url, data, **headers)
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         self.assertTrue(PostComment.objects.filter(post_id=post.pk,
                                                    parent_comment_id=parent_comment.pk,
                                                    text=reply_comment_text).count() == 1)
@@ -1,7 +1,9 @@
 # Create your tests here.
 import json
 from django.urls import reverse
+from django_rq import get_worker
 from faker import Faker
+from rq import SimpleWorker
 from rest_framework import status
 from unittest import mock
 from unittest.mock import ANY
@@ -16,6 +18,7 @@ from openbook_common.tests.helpers import make_authentication_headers_for_user,
 from openbook_moderation.models import ModeratedObject
 from openbook_notifications.models import PostCommentNotification, PostCommentReplyNotification, \
     PostCommentUserMentionNotification, Notification
+from openbook_common.utils.model_loaders import get_language_model
 from openbook_posts.models import PostComment, PostCommentUserMention
 
 logger = logging.getLogger(__name__)
@@ -602,6 +605,8 @@ class PostCommentsAPITests(OpenbookAPITestCase):
 
             self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+            get_worker(worker_class=SimpleWorker).work(burst=True)
+
             post_comment = PostComment.objects.get(text=post_text, commenter_id=user.pk)
 
             self.assertEqual(
@@ -627,6 +632,8 @@ class PostCommentsAPITests(OpenbookAPITestCase):
         response = self.client.put(url, data, **headers, format='multipart')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post_comment = PostComment.objects.get(text=post_comment_text, commenter_id=user.pk)
 
         self.assertEqual(
@@ -729,6 +736,8 @@ class PostCommentsAPITests(OpenbookAPITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post_comment = PostComment.objects.get(text=post_comment_text, commenter_id=user.pk)
 
         post_comment_user_mention = PostCommentUserMention.objects.get(user_id=test_user.pk,
@@ -2152,3 +2161,69 @@ class PostCommentsDisableAPITests(OpenbookAPITestCase):
         return reverse('disable-post-comments', kwargs={
             'post_uuid': post.uuid
         })
+
+
+class TranslatePostCommentsAPITests(OpenbookAPITestCase):
+    """
+    TranslatePostCommentsAPI
+    """
+
+    fixtures = [
+        'openbook_common/fixtures/languages.json'
+    ]
+
+    def test_translates_post_comments_text(self):
+        """
+        should translate the text of every post comment and return 200
+        """
+        user = make_user()
+        Language = get_language_model()
+        user.translation_language = Language.objects.get(code='en')
+        user.save()
+        headers = make_authentication_headers_for_user(user)
+
+        text = 'Ik ben en man 😀. Jij bent en vrouw.'
+        post = user.create_public_post(text=make_fake_post_text())
+        post_comments = [user.comment_post(post=post, text=text) for i in range(2)]
+
+        url = self._get_url(post=post)
+        response = self.client.post(url, {
+            'post_comment_id': ','.join([str(post_comment.pk) for post_comment in post_comments])
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_post_comments = json.loads(response.content)
+
+        self.assertEqual(set([post_comment.pk for post_comment in post_comments]),
+                         set([response_post_comment['id'] for response_post_comment in response_post_comments]))
+
+        for response_post_comment in response_post_comments:
+            self.assertEqual(response_post_comment['translated_text'], 'I am a man 😀. You\'re a woman.')
+
+    def test_cannot_translate_comments_of_other_post(self):
+        """
+        should not translate post comments which do not belong to the post and return 400
+        """
+        user = make_user()
+        Language = get_language_model()
+        user.translation_language = Language.objects.get(code='en')
+        user.save()
+        headers = make_authentication_headers_for_user(user)
+
+        text = 'Ik ben en man 😀. Jij bent en vrouw.'
+        post = user.create_public_post(text=make_fake_post_text())
+        other_post = user.create_public_post(text=make_fake_post_text())
+        post_comment = user.comment_post(post=other_post, text=text)
+
+        url = self._get_url(post=post)
+        response = self.client.post(url, {
+            'post_comment_id': str(post_comment.pk)
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def _get_url(self, post):
+        return reverse('translate-post-comments', kwargs={
+            'post_uuid': post.uuid
+        })
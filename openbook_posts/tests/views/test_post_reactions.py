@@ -1,5 +1,6 @@
 # Create your tests here.
 import json
+from django.core.management import call_command
 from django.urls import reverse
 from faker import Faker
 from rest_framework import status
@@ -10,7 +11,7 @@ from openbook_common.tests.helpers import make_authentication_headers_for_user,
     make_fake_post_comment_text, make_user, make_circle, make_emoji, make_emoji_group, make_reactions_emoji_group, \
     make_community
 from openbook_notifications.models import PostReactionNotification
-from openbook_posts.models import PostReaction
+from openbook_posts.models import Post, PostReaction, PostReactionEmojiCount
 
 logger = logging.getLogger(__name__)
 fake = Faker()
@@ -846,6 +847,73 @@ class PostReactionsEmojiCountAPITests(OpenbookAPITestCase):
         self.assertEqual(response_emoji_id, emoji.pk)
         self.assertEqual(1, response_emoji_count)
 
+    def test_reactions_emoji_count_follows_changed_and_deleted_reactions(self):
+        """
+        should retrieve the emoji counts after reactions get changed and deleted
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+        post = user.create_public_post(text=make_fake_post_text())
+        emoji_group = make_reactions_emoji_group()
+
+        emoji = make_emoji(group=emoji_group)
+        other_emoji = make_emoji(group=emoji_group)
+
+        reactor = make_user()
+        other_reactor = make_user()
+
+        reactor.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+        other_reaction = other_reactor.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+        reactor.react_to_post_with_id(post_id=post.pk, emoji_id=other_emoji.pk)
+        other_reactor.delete_reaction_with_id_for_post_with_id(post_reaction_id=other_reaction.pk, post_id=post.pk)
+
+        url = self._get_url(post)
+
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_emojis_counts = json.loads(response.content)
+
+        self.assertEqual(len(response_emojis_counts), 1)
+        self.assertEqual(response_emojis_counts[0]['emoji']['id'], other_emoji.pk)
+        self.assertEqual(response_emojis_counts[0]['count'], 1)
+
+        post.refresh_from_db()
+        self.assertEqual(post.reactions_count, 1)
+
+    def test_reconcile_post_counters_fixes_drifted_counts(self):
+        """
+        should fix drifted reactions counts and emoji counts when reconciling the post counters
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+        post = user.create_public_post(text=make_fake_post_text())
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        reactor = make_user()
+        reactor.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+
+        Post.objects.filter(pk=post.pk).update(reactions_count=5)
+        PostReactionEmojiCount.objects.filter(post_id=post.pk).delete()
+
+        call_command('reconcile_post_counters')
+
+        url = self._get_url(post)
+
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_emojis_counts = json.loads(response.content)
+
+        self.assertEqual(len(response_emojis_counts), 1)
+        self.assertEqual(response_emojis_counts[0]['count'], 1)
+
+        post.refresh_from_db()
+        self.assertEqual(post.reactions_count, 1)
+
     def _get_url(self, post):
         return reverse('post-reactions-emoji-count', kwargs={
             'post_uuid': post.uuid
@@ -1,11 +1,14 @@
 # Create your tests here.
 import tempfile
+from datetime import timedelta
 from unittest import mock
 
 from PIL import Image
+from django.conf import settings
 from django.core.files import File
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
+from django.utils import timezone
 from django_rq import get_worker
 from faker import Faker
 from rest_framework import status
@@ -25,13 +28,18 @@ from openbook_circles.models import Circle
 from openbook_common.helpers import normalise_url
 from openbook_common.tests.helpers import make_user, make_users, make_fake_post_text, \
     make_authentication_headers_for_user, make_circle, make_community, make_list, make_moderation_category, \
-    get_test_usernames, get_test_videos, get_test_image, get_post_links, make_global_moderator
+    get_test_usernames, get_test_videos, get_test_image, get_post_links, make_global_moderator, \
+    make_reactions_emoji_group, make_emoji, make_fake_post_comment_text
 from openbook_common.utils.helpers import sha256sum
+from openbook_common.utils.model_loaders import get_language_model
 from openbook_communities.models import Community
 from openbook_lists.models import List
 from openbook_moderation.models import ModeratedObject
 from openbook_notifications.models import PostUserMentionNotification, Notification
+from openbook_posts.jobs import curate_trending_posts
 from openbook_posts.models import Post, PostUserMention, PostMedia, PostLink
+from openbook_posts.trending import get_trending_posts_ids
+from openbook_translation import translation_strategy
 
 logger = logging.getLogger(__name__)
 fake = Faker()
@@ -151,6 +159,8 @@ class PostsAPITests(OpenbookAPITestCase):
 
             self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+            get_worker(worker_class=SimpleWorker).work(burst=True)
+
             post = Post.objects.get(text=post_text, creator_id=user.pk)
 
             self.assertEqual(PostUserMention.objects.filter(user_id=test_user.pk, post_id=post.pk).count(), 1)
@@ -174,6 +184,9 @@ class PostsAPITests(OpenbookAPITestCase):
         url = self._get_url()
         response = self.client.put(url, data, **headers, format='multipart')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post = Post.objects.get(text=post_text, creator_id=user.pk)
 
         self.assertTrue(PostUserMention.objects.filter(post_id=post.pk, user_id=mentioned_user.pk).exists())
@@ -220,6 +233,8 @@ class PostsAPITests(OpenbookAPITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post = Post.objects.get(text=post_text, creator_id=user.pk)
 
         post_user_mention = PostUserMention.objects.get(user_id=test_user.pk, post_id=post.pk)
@@ -278,10 +293,73 @@ class PostsAPITests(OpenbookAPITestCase):
         url = self._get_url()
         response = self.client.put(url, data, **headers, format='multipart')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post = Post.objects.get(text=post_text, creator_id=user.pk)
 
         self.assertTrue(PostUserMention.objects.filter(post_id=post.pk, user_id=mentioned_user.pk).exists())
 
+    def test_create_text_detect_mentions_of_the_users_who_can_see_encircled_post_only(self):
+        """
+        should only detect the mentions of the users who can see the encircled post among several mentioned ones
+        """
+        user = make_user()
+
+        headers = make_authentication_headers_for_user(user=user)
+        circle = make_circle(creator=user)
+        other_circle = make_circle(creator=user)
+
+        in_circle_user = make_user()
+        user.connect_with_user_with_id(user_id=in_circle_user.pk, circles_ids=[circle.pk])
+        in_circle_user.confirm_connection_with_user_with_id(user_id=user.pk)
+
+        unconfirmed_in_circle_user = make_user()
+        user.connect_with_user_with_id(user_id=unconfirmed_in_circle_user.pk, circles_ids=[circle.pk])
+
+        in_other_circle_user = make_user()
+        user.connect_with_user_with_id(user_id=in_other_circle_user.pk, circles_ids=[other_circle.pk])
+        in_other_circle_user.confirm_connection_with_user_with_id(user_id=user.pk)
+
+        not_connected_user = make_user()
+
+        post_text = 'Hello @%s @%s @%s @%s' % (in_circle_user.username, unconfirmed_in_circle_user.username,
+                                               in_other_circle_user.username, not_connected_user.username)
+
+        data = {
+            'text': post_text,
+            'circle_id': circle.pk
+        }
+
+        url = self._get_url()
+        response = self.client.put(url, data, **headers, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        post = Post.objects.get(text=post_text, creator_id=user.pk)
+
+        self.assertEqual([in_circle_user.pk],
+                         list(PostUserMention.objects.filter(post_id=post.pk).values_list('user_id', flat=True)))
+
+    def test_create_post_user_mentions_leaves_existing_mentions_alone(self):
+        """
+        should not create a mention nor notify again when the mention was already created by another job
+        """
+        user = make_user()
+        mentioned_user = make_user()
+
+        post = user.create_public_post(text=make_fake_post_text())
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        PostUserMention.create_post_user_mentions(users=[mentioned_user], post=post)
+        PostUserMention.create_post_user_mentions(users=[mentioned_user], post=post)
+
+        self.assertEqual(1, PostUserMention.objects.filter(post_id=post.pk, user_id=mentioned_user.pk).count())
+        self.assertEqual(1, PostUserMentionNotification.objects.filter(
+            post_user_mention__post_id=post.pk, post_user_mention__user_id=mentioned_user.pk).count())
+
     def test_create_text_detect_mention_if_public(self):
         """
         should detect mention if the post is public
@@ -301,6 +379,9 @@ class PostsAPITests(OpenbookAPITestCase):
         url = self._get_url()
         response = self.client.put(url, data, **headers, format='multipart')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post = Post.objects.get(text=post_text, creator_id=user.pk)
 
         self.assertTrue(PostUserMention.objects.filter(post_id=post.pk, user_id=mentioned_user.pk).exists())
@@ -347,6 +428,9 @@ class PostsAPITests(OpenbookAPITestCase):
         url = self._get_url()
         response = self.client.put(url, data, **headers, format='multipart')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post = Post.objects.get(text=post_text, creator_id=user.pk)
         post_links = PostLink.objects.filter(post_id=post.pk)
         result_links = [post_link.link for post_link in post_links]
@@ -373,6 +457,9 @@ class PostsAPITests(OpenbookAPITestCase):
         url = self._get_url()
         response = self.client.put(url, data, **headers, format='multipart')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
         post = Post.objects.get(text=post_text, creator_id=user.pk)
         post_links = PostLink.objects.filter(post_id=post.pk)
         result_links = [post_link.link for post_link in post_links]
@@ -383,6 +470,31 @@ class PostsAPITests(OpenbookAPITestCase):
 
         self.assertEqual(len(result_links), 1)
 
+    def test_create_text_post_skips_all_non_http_urls(self):
+        """
+        should skip every url with a scheme other than http or https while creating post links models
+        """
+        user = make_user()
+
+        headers = make_authentication_headers_for_user(user=user)
+
+        post_text = 'ftp://files.okuna.io ftp://backup.okuna.io https://www.okuna.io'
+
+        data = {
+            'text': post_text
+        }
+
+        url = self._get_url()
+        response = self.client.put(url, data, **headers, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        get_worker(worker_class=SimpleWorker).work(burst=True)
+
+        post = Post.objects.get(text=post_text, creator_id=user.pk)
+        result_links = [post_link.link for post_link in PostLink.objects.filter(post_id=post.pk)]
+
+        self.assertEqual(result_links, ['https://www.okuna.io'])
+
     def test_create_post_is_added_to_world_circle(self):
         """
         the created text post should automatically added to world circle
@@ -984,6 +1096,138 @@ class PostsAPITests(OpenbookAPITestCase):
         for response_post in response_posts:
             self.assertIn(response_post.get('id'), all_posts_ids)
 
+    def test_get_all_posts_includes_posts_published_after_timeline_was_retrieved(self):
+        """
+        should retrieve the posts published by followed users and communities after the timeline was retrieved
+        """
+        user = make_user()
+
+        following_user = make_user()
+        user.follow_user_with_id(user_id=following_user.pk)
+
+        community = make_community(creator=make_user())
+        user.join_community_with_name(community_name=community.name)
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(0, len(json.loads(response.content)))
+
+        own_post = user.create_public_post(text=make_fake_post_text())
+        following_user_post = following_user.create_public_post(text=make_fake_post_text())
+        community_post = community.creator.create_community_post(text=make_fake_post_text(),
+                                                                 community_name=community.name)
+
+        get_worker('default', worker_class=SimpleWorker).work(burst=True)
+
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_posts_ids = [response_post['id'] for response_post in json.loads(response.content)]
+
+        self.assertEqual([community_post.pk, following_user_post.pk, own_post.pk], response_posts_ids)
+
+    def test_get_all_posts_does_not_retrieve_posts_reported_after_timeline_was_retrieved(self):
+        """
+        should not retrieve posts that were already in the timeline but got reported afterwards
+        """
+        user = make_user()
+
+        following_user = make_user()
+        user.follow_user_with_id(user_id=following_user.pk)
+
+        following_user_post = following_user.create_public_post(text=make_fake_post_text())
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(1, len(json.loads(response.content)))
+
+        user.report_post(post=following_user_post, category_id=make_moderation_category().pk)
+
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(0, len(json.loads(response.content)))
+
+    def test_get_all_posts_with_max_id_beyond_trimmed_timeline(self):
+        """
+        should retrieve the older posts that no longer fit the timeline
+        """
+        user = make_user()
+
+        posts_ids = [user.create_public_post(text=make_fake_post_text()).pk for i in range(0, 5)]
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+
+        with self.settings(USER_TIMELINE_MAX_LENGTH=2):
+            response = self.client.get(url, {'count': 4}, **headers)
+            response_posts_ids = [response_post['id'] for response_post in json.loads(response.content)]
+
+            self.assertEqual(list(reversed(posts_ids))[:4], response_posts_ids)
+
+            response = self.client.get(url, {'count': 4, 'max_id': posts_ids[2]}, **headers)
+            response_posts_ids = [response_post['id'] for response_post in json.loads(response.content)]
+
+            self.assertEqual([posts_ids[1], posts_ids[0]], response_posts_ids)
+
+    def test_get_all_posts_serializes_viewer_context(self):
+        """
+        should retrieve the reaction, emoji counts, comments count and mute status of every post for the viewer
+        """
+        user = make_user()
+
+        following_user = make_user()
+        user.follow_user_with_id(user_id=following_user.pk)
+
+        reacted_post = following_user.create_public_post(text=make_fake_post_text())
+        muted_post = following_user.create_public_post(text=make_fake_post_text())
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+        other_emoji = make_emoji(group=emoji_group)
+
+        user.react_to_post_with_id(post_id=reacted_post.pk, emoji_id=emoji.pk)
+        make_user().react_to_post_with_id(post_id=reacted_post.pk, emoji_id=emoji.pk)
+        make_user().react_to_post_with_id(post_id=reacted_post.pk, emoji_id=other_emoji.pk)
+
+        blocked_user = make_user()
+        blocked_user.react_to_post_with_id(post_id=reacted_post.pk, emoji_id=other_emoji.pk)
+        user.block_user_with_id(user_id=blocked_user.pk)
+
+        user.comment_post_with_id(post_id=reacted_post.pk, text=make_fake_post_text())
+        following_user.comment_post_with_id(post_id=reacted_post.pk, text=make_fake_post_text())
+
+        user.mute_post_with_id(post_id=muted_post.pk)
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_posts = {response_post['id']: response_post for response_post in json.loads(response.content)}
+
+        response_reacted_post = response_posts[reacted_post.pk]
+        self.assertEqual(response_reacted_post['reaction']['emoji']['id'], emoji.pk)
+        self.assertEqual(response_reacted_post['comments_count'], 2)
+        self.assertFalse(response_reacted_post['is_muted'])
+
+        response_emoji_counts = [(emoji_count['emoji']['id'], emoji_count['count']) for emoji_count in
+                                 response_reacted_post['reactions_emoji_counts']]
+        self.assertEqual([(emoji.pk, 2), (other_emoji.pk, 1)], response_emoji_counts)
+
+        response_muted_post = response_posts[muted_post.pk]
+        self.assertIsNone(response_muted_post['reaction'])
+        self.assertEqual(response_muted_post['comments_count'], 0)
+        self.assertEqual(response_muted_post['reactions_emoji_counts'], [])
+        self.assertTrue(response_muted_post['is_muted'])
+
     def test_get_all_circle_posts(self):
         """
         should be able to retrieve all posts for a given circle
@@ -3507,5 +3751,145 @@ class TrendingPostsAPITests(OpenbookAPITestCase):
 
         self.assertEqual(0, len(response_posts))
 
+    def test_displays_posts_with_more_reactions_and_comments_first(self):
+        """
+        should display the posts with more reactions and comments before newer posts with less of them
+        """
+        user = make_user()
+        community = make_community(creator=user)
+
+        post = user.create_community_post(community_name=community.name, text=make_fake_post_text())
+        newer_post = user.create_community_post(community_name=community.name, text=make_fake_post_text())
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        for i in range(2):
+            reactor = make_user()
+            reactor.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+            reactor.comment_post_with_id(post_id=post.pk, text=make_fake_post_comment_text())
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_posts = json.loads(response.content)
+
+        self.assertEqual([post.pk, newer_post.pk], [response_post['id'] for response_post in response_posts])
+
+    def test_takes_deleted_posts_out_of_trending_posts(self):
+        """
+        should take deleted and soft deleted posts out of the trending posts right away
+        """
+        user = make_user()
+        community = make_community(creator=user)
+
+        Post.rebuild_trending_posts()
+
+        post = user.create_community_post(community_name=community.name, text=make_fake_post_text())
+        soft_deleted_post = user.create_community_post(community_name=community.name, text=make_fake_post_text())
+        deleted_post = user.create_community_post(community_name=community.name, text=make_fake_post_text())
+
+        soft_deleted_post.soft_delete()
+        user.delete_post_with_uuid(post_uuid=deleted_post.uuid)
+
+        self.assertEqual([post.pk], get_trending_posts_ids(count=100))
+
+    def test_curating_takes_expired_posts_out_of_trending_posts(self):
+        """
+        should take the posts which got too old out of the trending posts when curating them
+        """
+        user = make_user()
+        community = make_community(creator=user)
+
+        Post.rebuild_trending_posts()
+
+        post = user.create_community_post(community_name=community.name, text=make_fake_post_text())
+        expired_post = user.create_community_post(community_name=community.name, text=make_fake_post_text())
+
+        Post.objects.filter(pk=expired_post.pk).update(
+            created=timezone.now() - timedelta(hours=settings.TRENDING_POSTS_MAX_AGE_HOURS + 1))
+
+        curate_trending_posts()
+
+        self.assertEqual([post.pk], get_trending_posts_ids(count=100))
+
     def _get_url(self):
         return reverse('trending-posts')
+
+
+class TranslatePostsAPITests(OpenbookAPITestCase):
+    """
+    TranslatePostsAPI
+    """
+
+    fixtures = [
+        'openbook_common/fixtures/languages.json'
+    ]
+
+    def test_translates_posts_text(self):
+        """
+        should translate the text of every post and return 200
+        """
+        user = make_user()
+        Language = get_language_model()
+        user.translation_language = Language.objects.get(code='en')
+        user.save()
+        headers = make_authentication_headers_for_user(user)
+
+        text = 'Ik ben en man 😀. Jij bent en vrouw.'
+        posts = []
+
+        for i in range(2):
+            post = user.create_public_post(text=make_fake_post_text())
+            user.update_post(post=post, text=text)
+            posts.append(post)
+
+        url = self._get_url()
+
+        with mock.patch.object(translation_strategy, 'translate_text',
+                               wraps=translation_strategy.translate_text) as translate_text_call:
+            response = self.client.post(url, {
+                'post_uuid': ','.join([str(post.uuid) for post in posts])
+            }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_posts = json.loads(response.content)
+
+        self.assertEqual(set([str(post.uuid) for post in posts]),
+                         set([response_post['uuid'] for response_post in response_posts]))
+
+        for response_post in response_posts:
+            self.assertEqual(response_post['translated_text'], 'I am a man 😀. You\'re a woman.')
+
+        # Posts with the same text get translated once
+        translate_text_call.assert_called_once()
+
+    def test_cannot_translate_encircled_posts(self):
+        """
+        should not translate any post when one of them is encircled and return 400
+        """
+        user = make_user()
+        Language = get_language_model()
+        user.translation_language = Language.objects.get(code='en')
+        user.save()
+        headers = make_authentication_headers_for_user(user)
+
+        text = 'Ik ben en man 😀. Jij bent en vrouw.'
+        circle = make_circle(creator=user)
+        post = user.create_public_post(text=text)
+        encircled_post = user.create_encircled_post(text=text, circles_ids=[circle.pk])
+
+        url = self._get_url()
+        response = self.client.post(url, {
+            'post_uuid': ','.join([str(post.uuid), str(encircled_post.uuid)])
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def _get_url(self):
+        return reverse('translate-posts')
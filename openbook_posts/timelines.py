@@ -0,0 +1,96 @@
+from django.conf import settings
+from django_redis import get_redis_connection
+
+TIMELINE_KEY = 'ob-api-timeline-%d'
+
+# Member stored with score 0 so that an existing but empty timeline can be told apart from a missing one
+TIMELINE_SENTINEL = '0'
+
+
+def get_timeline_key(user_id):
+    return TIMELINE_KEY % user_id
+
+
+def timeline_exists(user_id):
+    return get_redis_connection('default').exists(get_timeline_key(user_id))
+
+
+def timeline_is_truncated(user_id):
+    """
+    A full timeline might have lost its oldest posts when it got trimmed
+    """
+    length = get_redis_connection('default').zcard(get_timeline_key(user_id)) - 1
+    return length >= settings.USER_TIMELINE_MAX_LENGTH
+
+
+def fill_timeline(user_id, posts_ids):
+    """
+    Replaces the timeline of the given user with the given posts ids
+    """
+    key = get_timeline_key(user_id)
+    mapping = {str(post_id): post_id for post_id in posts_ids}
+    mapping[TIMELINE_SENTINEL] = 0
+
+    pipeline = get_redis_connection('default').pipeline()
+    pipeline.delete(key)
+    pipeline.zadd(key, mapping)
+    _trim_timeline(pipeline=pipeline, key=key)
+    pipeline.expire(key, settings.USER_TIMELINE_TTL)
+    pipeline.execute()
+
+
+def add_post_to_timelines(post_id, users_ids):
+    """
+    Adds the post to the timelines of the given users which are currently materialized.
+    Timelines which do not exist are left alone, they get rebuilt from the database when read.
+    """
+    if not users_ids:
+        return
+
+    redis = get_redis_connection('default')
+    keys = [get_timeline_key(user_id) for user_id in users_ids]
+
+    pipeline = redis.pipeline()
+    for key in keys:
+        pipeline.exists(key)
+    existing_keys = [key for key, exists in zip(keys, pipeline.execute()) if exists]
+
+    if not existing_keys:
+        return
+
+    pipeline = redis.pipeline()
+    for key in existing_keys:
+        pipeline.zadd(key, {str(post_id): post_id})
+        _trim_timeline(pipeline=pipeline, key=key)
+    pipeline.execute()
+
+
+def get_timeline_posts_ids(user_id, max_id=None, min_id=None, count=10):
+    """
+    Returns the ids of the timeline posts, newest first
+    """
+    max_score = '(%d' % max_id if max_id else '+inf'
+    min_score = '(%d' % min_id if min_id else '(0'
+
+    key = get_timeline_key(user_id)
+    redis = get_redis_connection('default')
+
+    pipeline = redis.pipeline()
+    pipeline.zrevrangebyscore(key, max_score, min_score, start=0, num=count)
+    pipeline.expire(key, settings.USER_TIMELINE_TTL)
+    posts_ids = pipeline.execute()[0]
+
+    return [int(post_id) for post_id in posts_ids]
+
+
+def delete_timeline(user_id):
+    delete_timelines(users_ids=[user_id])
+
+
+def delete_timelines(users_ids):
+    get_redis_connection('default').delete(*[get_timeline_key(user_id) for user_id in users_ids])
+
+
+def _trim_timeline(pipeline, key):
+    # The sentinel always has the lowest rank, keep it and the newest posts
+    pipeline.zremrangebyrank(key, 1, -(settings.USER_TIMELINE_MAX_LENGTH + 1))
@@ -0,0 +1,126 @@
+from django.conf import settings
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+TRENDING_POSTS_KEY = 'ob-api-trending-posts'
+TRENDING_POSTS_EPOCH_KEY = 'ob-api-trending-posts-epoch'
+
+# Member stored with score 0 so that an existing but empty trending posts set can be told apart from a missing one
+TRENDING_POSTS_SENTINEL = '0'
+
+TRENDING_POST_PUBLISHED_SCORE = 1
+TRENDING_POST_REACTION_SCORE = 1
+TRENDING_POST_COMMENT_SCORE = 2
+
+
+def get_trending_post_score(post_created, epoch, reactions_count=0, comments_count=0):
+    """
+    The engagement of the post, doubled for every TRENDING_POSTS_HALF_LIFE_HOURS it got published after the epoch.
+    Comparing the scores of two posts is then the same as comparing their engagement halved every
+    TRENDING_POSTS_HALF_LIFE_HOURS of age, without having to decay the stored scores.
+    """
+    score = TRENDING_POST_PUBLISHED_SCORE + reactions_count * TRENDING_POST_REACTION_SCORE + \
+            comments_count * TRENDING_POST_COMMENT_SCORE
+
+    return score * _get_growth(post_created=post_created, epoch=epoch)
+
+
+def trending_posts_need_rebuild():
+    """
+    The trending posts need to be rebuilt when they are missing or when their epoch got too old,
+    which also keeps the scores from growing out of bounds
+    """
+    return _get_epoch() is None
+
+
+def fill_trending_posts(posts):
+    """
+    Replaces the trending posts with the given (post id, created, reactions count, comments count) tuples.
+    The epoch moves to now so the scores stay small.
+    """
+    epoch = timezone.now()
+
+    mapping = {
+        str(post_id): get_trending_post_score(post_created=created, epoch=epoch, reactions_count=reactions_count,
+                                              comments_count=comments_count)
+        for post_id, created, reactions_count, comments_count in posts
+    }
+    mapping[TRENDING_POSTS_SENTINEL] = 0
+
+    pipeline = get_redis_connection('default').pipeline()
+    pipeline.delete(TRENDING_POSTS_KEY)
+    pipeline.zadd(TRENDING_POSTS_KEY, mapping)
+    pipeline.set(TRENDING_POSTS_EPOCH_KEY, epoch.timestamp())
+    pipeline.execute()
+
+
+def add_post_to_trending_posts(post_id, post_created):
+    """
+    Adds a freshly published post. Trending posts which need to be rebuilt are left alone,
+    they get rebuilt from the database when read.
+    """
+    epoch = _get_epoch()
+
+    if not epoch:
+        return
+
+    get_redis_connection('default').zadd(TRENDING_POSTS_KEY, {
+        str(post_id): get_trending_post_score(post_created=post_created, epoch=epoch)
+    }, nx=True)
+
+
+def increment_trending_post_score(post_id, post_created, score):
+    """
+    Increments the score of the post if it is currently trending
+    """
+    epoch = _get_epoch()
+
+    if not epoch:
+        return
+
+    get_redis_connection('default').zadd(TRENDING_POSTS_KEY, {
+        str(post_id): score * _get_growth(post_created=post_created, epoch=epoch)
+    }, xx=True, incr=True)
+
+
+def remove_posts_from_trending_posts(posts_ids):
+    """
+    Takes deleted posts out of the trending posts right away, instead of letting them take the place of trending
+    posts until the next curation
+    """
+    if not posts_ids:
+        return
+
+    get_redis_connection('default').zrem(TRENDING_POSTS_KEY, *[str(post_id) for post_id in posts_ids])
+
+
+def get_trending_posts_ids(count):
+    """
+    Returns the ids of the trending posts, highest score first
+    """
+    posts_ids = get_redis_connection('default').zrevrangebyscore(TRENDING_POSTS_KEY, '+inf', '(0', start=0,
+                                                                 num=count)
+
+    return [int(post_id) for post_id in posts_ids]
+
+
+def _get_epoch():
+    pipeline = get_redis_connection('default').pipeline()
+    pipeline.exists(TRENDING_POSTS_KEY)
+    pipeline.get(TRENDING_POSTS_EPOCH_KEY)
+    exists, epoch = pipeline.execute()
+
+    if not exists or not epoch:
+        return None
+
+    epoch = timezone.datetime.fromtimestamp(float(epoch), tz=timezone.utc)
+
+    if epoch < timezone.now() - timezone.timedelta(hours=settings.TRENDING_POSTS_MAX_AGE_HOURS):
+        return None
+
+    return epoch
+
+
+def _get_growth(post_created, epoch):
+    hours_since_epoch = (post_created - epoch).total_seconds() / 3600
+    return 2 ** (hours_since_epoch / settings.TRENDING_POSTS_HALF_LIFE_HOURS)
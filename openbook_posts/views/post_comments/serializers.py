@@ -206,3 +206,16 @@ class EnableCommentsPostSerializer(serializers.Serializer):
         validators=[post_uuid_exists],
         required=True,
     )
+
+
+class TranslatePostCommentsSerializer(serializers.Serializer):
+    post_uuid = serializers.UUIDField(
+        validators=[post_uuid_exists],
+        required=True,
+    )
+    post_comment_id = serializers.ListField(
+        required=True,
+        allow_empty=False,
+        max_length=settings.TRANSLATE_MAX_ITEMS,
+        child=serializers.IntegerField(),
+    )
@@ -1,4 +1,5 @@
 from django.db import transaction
+from django.utils.translation import ugettext_lazy as _
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -8,11 +9,15 @@ import operator
 
 # TODO Use post uuid also internally, not only as API resource identifier
 # In order to prevent enumerable posts API in alpha, this is done as a hotfix
+from openbook_common.responses import ApiMessageResponse
+from openbook_common.utils.helpers import normalise_request_data, normalize_list_value_in_request_data
 from openbook_common.utils.model_loaders import get_post_model
 from openbook_moderation.permissions import IsNotSuspended
 from openbook_posts.views.post_comments.serializers import EnableDisableCommentsPostSerializer, \
     EnableCommentsPostSerializer, DisableCommentsPostSerializer, GetPostCommentsSerializer, PostCommentSerializer, \
-    CommentPostSerializer
+    CommentPostSerializer, TranslatePostCommentsSerializer
+from openbook_translation.strategies.base import TranslationClientError, UnsupportedLanguagePairException, \
+    MaxTextLengthExceededError
 
 
 def get_post_id_for_post_uuid(post_uuid):
@@ -143,3 +148,39 @@ class PostCommentsEnable(APIView):
 
         post_serializer = EnableDisableCommentsPostSerializer(post, context={"request": request})
         return Response(post_serializer.data, status=status.HTTP_200_OK)
+
+
+class TranslatePostComments(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, post_uuid):
+        request_data = normalise_request_data(request.data)
+        normalize_list_value_in_request_data('post_comment_id', request_data)
+        request_data['post_uuid'] = post_uuid
+
+        serializer = TranslatePostCommentsSerializer(data=request_data)
+        serializer.is_valid(raise_exception=True)
+
+        user = request.user
+        data = serializer.validated_data
+        post_uuid = data.get('post_uuid')
+        post_comments_ids = data.get('post_comment_id')
+        post_id = get_post_id_for_post_uuid(post_uuid)
+
+        try:
+            translated_post_comments = user.translate_comments_with_ids_for_post_with_id(
+                post_id=post_id, post_comments_ids=post_comments_ids)
+        except UnsupportedLanguagePairException:
+            return ApiMessageResponse(_('Translation between these languages is not supported.'),
+                                      status=status.HTTP_400_BAD_REQUEST)
+        except TranslationClientError:
+            return ApiMessageResponse(_('Translation service returned an error'),
+                                      status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        except MaxTextLengthExceededError:
+            return ApiMessageResponse(_('Max length of translation text exceeded.'),
+                                      status=status.HTTP_400_BAD_REQUEST)
+
+        return Response([{
+            'id': post_comment.pk,
+            'translated_text': translated_text
+        } for post_comment, translated_text in translated_post_comments], status=status.HTTP_200_OK)
@@ -14,6 +14,7 @@ from openbook_communities.models import Community, CommunityMembership
 from openbook_communities.serializers_fields import CommunityMembershipsField
 from openbook_lists.validators import list_id_exists
 from openbook_posts.models import PostImage, Post, PostReaction, PostVideo, PostLink
+from openbook_posts.validators import post_uuid_exists
 
 
 class GetPostsSerializer(serializers.Serializer):
@@ -275,3 +276,12 @@ class UnauthenticatedUserPostSerializer(serializers.ModelSerializer):
             # Temp backwards compat
             'image',
         )
+
+
+class TranslatePostsSerializer(serializers.Serializer):
+    post_uuid = serializers.ListField(
+        required=True,
+        allow_empty=False,
+        max_length=settings.TRANSLATE_MAX_ITEMS,
+        child=serializers.UUIDField(validators=[post_uuid_exists]),
+    )
@@ -1,16 +1,22 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.utils.translation import ugettext_lazy as _
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from openbook_common.responses import ApiMessageResponse
+from openbook_common.utils.model_loaders import get_post_model
 from openbook_moderation.permissions import IsNotSuspended
-from openbook_common.utils.helpers import normalize_list_value_in_request_data
+from openbook_common.utils.helpers import normalize_list_value_in_request_data, normalise_request_data
+from openbook_posts.page_context import PostsPageContext
 from openbook_posts.permissions import IsGetOrIsAuthenticated
 from openbook_posts.views.posts.serializers import AuthenticatedUserPostSerializer, \
-    GetPostsSerializer, UnauthenticatedUserPostSerializer, CreatePostSerializer
+    GetPostsSerializer, UnauthenticatedUserPostSerializer, CreatePostSerializer, TranslatePostsSerializer
+from openbook_translation.strategies.base import TranslationClientError, UnsupportedLanguagePairException, \
+    MaxTextLengthExceededError
 
 
 class Posts(APIView):
@@ -79,9 +85,13 @@ class Posts(APIView):
                 count=count
             )
 
-        posts = posts.order_by('-id')[:count]
+        posts = list(posts.order_by('-id')[:count])
 
-        post_serializer_data = AuthenticatedUserPostSerializer(posts, many=True, context={"request": request}).data
+        posts_page_context = PostsPageContext(posts=posts, user=user)
+
+        post_serializer_data = AuthenticatedUserPostSerializer(posts, many=True, context={
+            "request": request,
+            "posts_page_context": posts_page_context}).data
 
         return Response(post_serializer_data, status=status.HTTP_200_OK)
 
@@ -98,12 +108,16 @@ class Posts(APIView):
 
         User = get_user_model()
 
-        posts = User.get_unauthenticated_public_posts_for_user_with_username(
+        posts = list(User.get_unauthenticated_public_posts_for_user_with_username(
             max_id=max_id,
             username=username
-        ).order_by('-created')[:count]
+        ).order_by('-created')[:count])
+
+        posts_page_context = PostsPageContext(posts=posts, user=request.user)
 
-        post_serializer = UnauthenticatedUserPostSerializer(posts, many=True, context={"request": request})
+        post_serializer = UnauthenticatedUserPostSerializer(posts, many=True, context={
+            "request": request,
+            "posts_page_context": posts_page_context})
 
         return Response(post_serializer.data, status=status.HTTP_200_OK)
 
@@ -114,6 +128,44 @@ class TrendingPosts(APIView):
     def get(self, request):
         user = request.user
 
-        posts = user.get_trending_posts()[:30]
-        posts_serializer = AuthenticatedUserPostSerializer(posts, many=True, context={"request": request})
+        posts = list(user.get_trending_posts()[:30])
+        posts_page_context = PostsPageContext(posts=posts, user=user)
+        posts_serializer = AuthenticatedUserPostSerializer(posts, many=True, context={
+            "request": request,
+            "posts_page_context": posts_page_context})
         return Response(posts_serializer.data, status=status.HTTP_200_OK)
+
+
+class TranslatePosts(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        request_data = normalise_request_data(request.data)
+        normalize_list_value_in_request_data('post_uuid', request_data)
+
+        serializer = TranslatePostsSerializer(data=request_data)
+        serializer.is_valid(raise_exception=True)
+
+        user = request.user
+        data = serializer.validated_data
+        posts_uuids = data.get('post_uuid')
+
+        Post = get_post_model()
+        posts_ids = Post.objects.filter(uuid__in=posts_uuids).values_list('id', flat=True)
+
+        try:
+            translated_posts = user.translate_posts_with_ids(posts_ids=posts_ids)
+        except UnsupportedLanguagePairException:
+            return ApiMessageResponse(_('Translation between these languages is not supported.'),
+                                      status=status.HTTP_400_BAD_REQUEST)
+        except TranslationClientError:
+            return ApiMessageResponse(_('Translation service returned an error'),
+                                      status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        except MaxTextLengthExceededError:
+            return ApiMessageResponse(_('Max length of translation text exceeded.'),
+                                      status=status.HTTP_400_BAD_REQUEST)
+
+        return Response([{
+            'uuid': post.uuid,
+            'translated_text': translated_text
+        } for post, translated_text in translated_posts], status=status.HTTP_200_OK)
@@ -1,49 +1,68 @@
+from multiprocessing import Pool
+
 from django.core.management.base import BaseCommand
-from langdetect.lang_detect_exception import LangDetectException
+import logging
 
-from openbook_common.helpers import get_language_for_text
+from openbook_common.language_detection import language_detector
 from openbook_common.utils.model_loaders import get_post_model, get_post_comment_model
 
+logger = logging.getLogger(__name__)
+
 
 class Command(BaseCommand):
     help = 'Assigns Language to Post and PostComment models, usage python manage.py assign_language --type posts|comments'
 
     def add_arguments(self, parser):
         parser.add_argument('--type', type=str, help='Type of model to assign lang to, valid values: posts, comments')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='The amount of posts or post comments to assign the language to at once')
+        parser.add_argument('--processes', type=int, default=1,
+                            help='The amount of processes detecting languages, defaults to detecting them in this one')
 
     def handle(self, *args, **options):
-        if options['type'] == 'posts':
-            self.assign_language_posts()
-
-        if options['type'] == 'comments':
-            self.assign_language_comments()
-
-    def assign_language_posts(self):
-        Post = get_post_model()
-        posts = Post.objects.filter(text__isnull=False)
-        for post in posts:
-            try:
-                language = get_language_for_text(post.text)
-            except LangDetectException as e:
-                print('Caught exception while detecting language, skipping')
-
-            if language:
-                post.language = language
-                post.save()
-            else:
-                print('Could not detect language for id', post.id)
-
-    def assign_language_comments(self):
-        PostComment = get_post_comment_model()
-        post_comments = PostComment.objects.filter(text__isnull=False)
-        for post_comment in post_comments:
-            try:
-                language = get_language_for_text(post_comment.text)
-            except LangDetectException as e:
-                print('Caught exception while detecting language, skipping')
-
-            if language:
-                post_comment.language = language
-                post_comment.save()
-            else:
-                print('Could not detect language for id', post_comment.id)
+        batch_size = options['batch_size']
+        processes = options['processes']
+
+        pool = Pool(processes=processes) if processes > 1 else None
+
+        try:
+            if options['type'] == 'posts':
+                self.assign_language(model=get_post_model(), batch_size=batch_size, pool=pool)
+
+            if options['type'] == 'comments':
+                self.assign_language(model=get_post_comment_model(), batch_size=batch_size, pool=pool)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
+    def assign_language(self, model, batch_size, pool):
+        last_id = 0
+        assigned = 0
+        undetected = 0
+
+        while True:
+            rows = list(model.objects.filter(id__gt=last_id, text__isnull=False).order_by('id').values_list(
+                'id', 'text')[:batch_size])
+
+            if not rows:
+                break
+
+            last_id = rows[-1][0]
+
+            texts = [text for row_id, text in rows]
+            languages = language_detector.get_languages_for_texts(texts=texts, pool=pool)
+
+            ids_by_language = {}
+            for (row_id, text), language in zip(rows, languages):
+                if language:
+                    ids_by_language.setdefault(language, []).append(row_id)
+                else:
+                    logger.info('Could not detect language for id %d' % row_id)
+                    undetected = undetected + 1
+
+            for language, ids in ids_by_language.items():
+                assigned = assigned + model.objects.filter(id__in=ids).update(language=language)
+
+        logger.info('Assigned language to %d %s, could not detect it for %d' % (
+            assigned, model._meta.verbose_name_plural, undetected))
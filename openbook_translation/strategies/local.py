@@ -0,0 +1,44 @@
+import time
+
+from langdetect import DetectorFactory, detect
+
+from openbook_translation.strategies.base import BaseTranslationStrategy, MaxTextLengthExceededError
+
+# seed the language detector
+DetectorFactory.seed = 0
+
+
+class LocalTranslate(BaseTranslationStrategy):
+    """
+    Translates without calling any translation service, by tagging the text with the target language code.
+    Meant to run and benchmark the translation code paths offline, LATENCY simulates the round trip in seconds.
+    """
+
+    def __init__(self, params):
+        self.latency = float(params.pop('LATENCY', 0))
+        super().__init__(params)
+
+    def get_detected_language_code(self, text):
+        return detect(text)
+
+    def get_default_translation_language_code(self):
+        return self.default_translation_language_code
+
+    def get_supported_translation_language_code(self, language_code):
+        return language_code
+
+    def translate_text(self, text, source_language_code, target_language_code):
+
+        if len(text) > self.text_max_length:
+            raise MaxTextLengthExceededError('MaxTextLengthExceededError')
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        result = {
+            'translated_text': '[%s] %s' % (target_language_code, text),
+            'source_language_code': source_language_code,
+            'target_language_code': target_language_code
+        }
+
+        return result
@@ -0,0 +1,110 @@
+import hashlib
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from openbook_translation import translation_strategy
+
+TRANSLATIONS_KEY = 'ob-api-translations-%s-%d'
+
+POST_TRANSLATIONS = 'post'
+POST_COMMENT_TRANSLATIONS = 'post-comment'
+
+
+def translate_post(post, target_language_code):
+    return translate_posts(posts=[post], target_language_code=target_language_code)[post.pk]
+
+
+def translate_posts(posts, target_language_code):
+    """
+    Returns the translated text of every post, by post id
+    """
+    return translate_contents(contents_type=POST_TRANSLATIONS, contents=[
+        (post.pk, post.text, post.language.code) for post in posts
+    ], target_language_code=target_language_code)
+
+
+def translate_post_comment(post_comment, target_language_code):
+    return translate_post_comments(post_comments=[post_comment], target_language_code=target_language_code)[
+        post_comment.pk]
+
+
+def translate_post_comments(post_comments, target_language_code):
+    """
+    Returns the translated text of every post comment, by post comment id
+    """
+    return translate_contents(contents_type=POST_COMMENT_TRANSLATIONS, contents=[
+        (post_comment.pk, post_comment.text, post_comment.language.code) for post_comment in post_comments
+    ], target_language_code=target_language_code)
+
+
+def translate_contents(contents_type, contents, target_language_code):
+    """
+    Translates the given (content id, text, source language code) tuples and returns the translated texts by
+    content id.
+
+    Translations are cached by content id, text hash and language pair. The texts which are not cached
+    get translated once, no matter how many of the contents share them.
+    """
+    redis = get_redis_connection('default')
+    translated_texts = {}
+
+    pipeline = redis.pipeline()
+    for content_id, text, source_language_code in contents:
+        pipeline.hget(_make_translations_key(contents_type=contents_type, content_id=content_id),
+                      _make_translation_field(text=text, source_language_code=source_language_code,
+                                              target_language_code=target_language_code))
+    cached_translated_texts = pipeline.execute()
+
+    untranslated_contents_ids = {}
+
+    for (content_id, text, source_language_code), cached_translated_text in zip(contents, cached_translated_texts):
+        if cached_translated_text is not None:
+            translated_texts[content_id] = cached_translated_text.decode('utf-8')
+        else:
+            untranslated_contents_ids.setdefault((text, source_language_code), []).append(content_id)
+
+    pipeline = redis.pipeline()
+
+    for (text, source_language_code), contents_ids in untranslated_contents_ids.items():
+        result = translation_strategy.translate_text(
+            source_language_code=source_language_code,
+            target_language_code=target_language_code,
+            text=text
+        )
+        translated_text = result.get('translated_text')
+
+        for content_id in contents_ids:
+            translated_texts[content_id] = translated_text
+
+            if translated_text is None:
+                continue
+
+            translations_key = _make_translations_key(contents_type=contents_type, content_id=content_id)
+            pipeline.hset(translations_key,
+                          _make_translation_field(text=text, source_language_code=source_language_code,
+                                                  target_language_code=target_language_code), translated_text)
+            pipeline.expire(translations_key, settings.TRANSLATIONS_TTL)
+
+    pipeline.execute()
+
+    return translated_texts
+
+
+def delete_cached_post_translations(post_id):
+    get_redis_connection('default').delete(
+        _make_translations_key(contents_type=POST_TRANSLATIONS, content_id=post_id))
+
+
+def delete_cached_post_comment_translations(post_comment_id):
+    get_redis_connection('default').delete(
+        _make_translations_key(contents_type=POST_COMMENT_TRANSLATIONS, content_id=post_comment_id))
+
+
+def _make_translations_key(contents_type, content_id):
+    return TRANSLATIONS_KEY % (contents_type, content_id)
+
+
+def _make_translation_field(text, source_language_code, target_language_code):
+    text_hash = hashlib.sha1(text.encode('utf-8')).hexdigest()
+    return '%s:%s:%s' % (text_hash, source_language_code, target_language_code)
@@ -12,10 +12,11 @@ class BaseEncodingBackend(six.with_metaclass(abc.ABCMeta)):
         return []
 
     @abc.abstractmethod
-    def encode(self, source_path, target_path, params):  # pragma: no cover
+    def encode(self, source_path, target_path, params, media_info=None):  # pragma: no cover
         """
         Encodes a video to a specified file. All encoder specific options
-        are passed in using `params`.
+        are passed in using `params`. The `media_info` of the source video
+        spares probing it again when given.
         """
         pass
 
@@ -27,11 +28,12 @@ class BaseEncodingBackend(six.with_metaclass(abc.ABCMeta)):
         pass
 
     @abc.abstractmethod
-    def get_thumbnail(self, video_path):  # pragma: no cover
+    def get_thumbnail(self, video_path, media_info=None):  # pragma: no cover
         """
         Extracts an image of a video and returns its path.
 
         If the requested thumbnail is not within the duration of the video
-        an `InvalidTimeError` is thrown.
+        an `InvalidTimeError` is thrown. The `media_info` of the video spares
+        probing it again when given.
         """
         pass
@@ -1,3 +1,4 @@
+import codecs
 import json
 import locale
 import logging
@@ -16,6 +17,7 @@ from .base import BaseEncodingBackend
 
 logger = logging.getLogger(__name__)
 RE_TIMECODE = re.compile(r'time=(\d+:\d+:\d+.\d+) ')
+RE_LINE_SEPARATOR = re.compile(r'[\r\n]')
 
 console_encoding = locale.getdefaultlocale()[1] or 'UTF-8'
 
@@ -81,12 +83,18 @@ class FFmpegBackend(BaseEncodingBackend):
         return self.stdout, self.stderr
 
     # TODO reduce complexity
-    def encode(self, source_path, target_path, params):  # NOQA: C901
+    def encode(self, source_path, target_path, params, media_info=None):  # NOQA: C901
         """
         Encodes a video to a specified file. All encoder specific options
         are passed in using `params`.
+
+        The source video is probed for its duration unless its `media_info`
+        is given.
         """
-        total_time = self.get_media_info(source_path)['duration']
+        if media_info is None:
+            media_info = self.get_media_info(source_path)
+
+        total_time = media_info['duration']
 
         cmds = [self.ffmpeg_path, '-i', source_path]
         cmds.extend(self.params)
@@ -96,33 +104,37 @@ class FFmpegBackend(BaseEncodingBackend):
         process = self._spawn(cmds)
 
         buf = output = ''
+        # a character can be split between two chunks
+        decoder = codecs.getincrementaldecoder(console_encoding)()
         # update progress
         while True:
-            # any more data?
-            out = process.stderr.read(10)
+            # any more data? returns whatever is available instead of waiting
+            # for a fixed amount
+            out = process.stderr.read1(4096)
             if not out:
                 break
 
-            out = out.decode(console_encoding)
+            out = decoder.decode(out)
             output += out
             buf += out
 
-            try:
-                line, buf = buf.split('\r', 1)
-            except ValueError:
-                continue
+            # a chunk can hold several lines, the last one possibly cut
+            # short, only the latest progress matters
+            lines = RE_LINE_SEPARATOR.split(buf)
+            buf = lines.pop()
 
-            try:
-                time_str = RE_TIMECODE.findall(line)[0]
-            except IndexError:
+            time_strs = RE_TIMECODE.findall('\n'.join(lines))
+            if not time_strs:
                 continue
 
+            time_str = time_strs[-1]
+
             # convert progress to percent
             time = 0
             for part in time_str.split(':'):
                 time = 60 * time + float(part)
 
-            percent = time / total_time
+            percent = min(time / total_time * 100, 100)
             logger.debug('yield {}%'.format(percent))
             yield percent
 
@@ -168,18 +180,22 @@ class FFmpegBackend(BaseEncodingBackend):
             'height': int(media_info['video'][0]['height']),
         }
 
-    def get_thumbnail(self, video_path, at_time=0.5):
+    def get_thumbnail(self, video_path, at_time=0.5, media_info=None):
         """
         Extracts an image of a video and returns its path.
 
         If the requested thumbnail is not within the duration of the video
-        an `InvalidTimeError` is thrown.
+        an `InvalidTimeError` is thrown. The video is probed for its duration
+        unless its `media_info` is given.
         """
         filename = os.path.basename(video_path)
         filename, __ = os.path.splitext(filename)
         _, image_path = tempfile.mkstemp(suffix='_{}.jpg'.format(filename))
 
-        video_duration = self.get_media_info(video_path)['duration']
+        if media_info is None:
+            media_info = self.get_media_info(video_path)
+
+        video_duration = media_info['duration']
         if at_time > video_duration:
             raise exceptions.InvalidTimeError()
         thumbnail_time = at_time
@@ -4,7 +4,9 @@ from django.conf import settings  # NOQA
 
 class VideoEncodingAppConf(AppConf):
     THREADS = 1
+    # progress gets saved every PROGRESS_UPDATE seconds or PROGRESS_UPDATE_STEP percent
     PROGRESS_UPDATE = 30
+    PROGRESS_UPDATE_STEP = 5
     BACKEND = 'video_encoding.backends.ffmpeg.FFmpegBackend'
     BACKEND_PARAMS = {}
     FORMATS = {
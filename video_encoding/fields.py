@@ -7,7 +7,17 @@ from .files import VideoFile
 
 
 class VideoFileDescriptor(ImageFileDescriptor):
-    pass
+    def __set__(self, instance, value):
+        previous_file = instance.__dict__.get(self.field.name)
+
+        # Saving a file sets it again by its new name, keep the information
+        # about the video it had so that it does not get probed again
+        if isinstance(previous_file, VideoFile) and hasattr(previous_file, '_info_cache') and \
+                isinstance(value, str) and value == previous_file.name:
+            value = self.field.attr_class(instance, self.field, value)
+            value.video_info = previous_file.video_info
+
+        super(VideoFileDescriptor, self).__set__(instance, value)
 
 
 class VideoFieldFile(VideoFile, FieldFile):
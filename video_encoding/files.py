@@ -54,3 +54,12 @@ class VideoFile(File):
             self._info_cache = info_cache
 
         return self._info_cache
+
+    def _set_video_info(self, info):
+        """
+        Sets the information about the video when it is already known,
+        so that it does not get probed again.
+        """
+        self._info_cache = info
+
+    video_info = property(_get_video_info, _set_video_info)
@@ -85,6 +85,6 @@ class Format(models.Model):
             self.save()
 
     def reset_progress(self, commit=True):
-        self.percent = 0
+        self.progress = 0
         if commit:
             self.save()
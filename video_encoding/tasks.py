@@ -1,5 +1,6 @@
 import os
 import tempfile
+import time
 
 from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
@@ -34,64 +35,147 @@ def convert_all_videos(app_label, model_name, object_pk):
             convert_video(fieldfile)
 
 
-def convert_video(fieldfile, force=False):
+def convert_video(fieldfile, force=False, media_info=None):
     """
     Converts a given video file into all defined formats.
+
+    The video gets probed once for all the formats, unless its `media_info`
+    is given.
     """
-    instance = fieldfile.instance
-    field = fieldfile.field
+    local_path, temp_file = get_fieldfile_local_path(fieldfile=fieldfile)
+
+    try:
+        if media_info is None:
+            media_info = get_backend().get_media_info(local_path)
+
+        for options in get_formats_options():
+            _convert_video_to_format(fieldfile, local_path, options,
+                                     force=force, media_info=media_info)
+    finally:
+        # the local copy of the video is used by all the formats
+        if temp_file:
+            os.unlink(temp_file.name)
+            temp_file.close()
+
+
+def convert_video_to_format(fieldfile, format_name, force=False,
+                            media_info=None):
+    """
+    Converts a given video file into the defined format with the given name,
+    so that the formats of a video can be converted in parallel.
+
+    Returns the format, None if the video could not be converted into it.
+    """
+    options = get_format_options(format_name)
 
     local_path, temp_file = get_fieldfile_local_path(fieldfile=fieldfile)
 
-    filename = os.path.basename(local_path)
-    source_path = local_path
+    try:
+        return _convert_video_to_format(fieldfile, local_path, options,
+                                        force=force, media_info=media_info)
+    finally:
+        if temp_file:
+            os.unlink(temp_file.name)
+            temp_file.close()
+
 
+def get_formats_options():
+    """
+    Returns the options of all defined formats of the encoding backend.
+    """
     encoding_backend = get_backend()
+    return settings.VIDEO_ENCODING_FORMATS[encoding_backend.name]
+
+
+def get_format_options(format_name):
+    for options in get_formats_options():
+        if options['name'] == format_name:
+            return options
+
+    raise ValueError("Undefined format: {}".format(format_name))
 
-    for options in settings.VIDEO_ENCODING_FORMATS[encoding_backend.name]:
-        video_format, created = Format.objects.get_or_create(
-            object_id=instance.pk,
-            content_type=ContentType.objects.get_for_model(instance),
-            field_name=field.name, format=options['name'])
-
-        # do not reencode if not requested
-        if video_format.file and not force:
-            continue
-        else:
-            # set progress to 0
-            video_format.reset_progress()
-
-        # TODO do not upscale videos
-
-        _, target_path = tempfile.mkstemp(
-            suffix='_{name}.{extension}'.format(**options))
-
-        try:
-            encoding = encoding_backend.encode(
-                source_path, target_path, options['params'])
-            while encoding:
-                try:
-                    progress = next(encoding)
-                except StopIteration:
-                    break
-                video_format.update_progress(progress)
-        except VideoEncodingError:
-            # TODO handle with more care
-            video_format.delete()
-            os.remove(target_path)
-            continue
-
-        # save encoded file
+
+def get_or_create_format(fieldfile, format_name):
+    instance = fieldfile.instance
+
+    return Format.objects.get_or_create(
+        object_id=instance.pk,
+        content_type=ContentType.objects.get_for_model(instance),
+        field_name=fieldfile.field.name, format=format_name)
+
+
+def _convert_video_to_format(fieldfile, source_path, options, force=False,
+                             media_info=None):
+    filename = os.path.basename(source_path)
+    encoding_backend = get_backend()
+
+    video_format, created = get_or_create_format(fieldfile,
+                                                 format_name=options['name'])
+
+    # do not reencode if not requested
+    if video_format.file and not force:
+        return video_format
+    else:
+        # set progress to 0
+        video_format.reset_progress()
+
+    # TODO do not upscale videos
+
+    _, target_path = tempfile.mkstemp(
+        suffix='_{name}.{extension}'.format(**options))
+
+    try:
+        encoding = encoding_backend.encode(
+            source_path, target_path, options['params'],
+            media_info=media_info)
+        progress_update = ProgressUpdate(video_format=video_format)
+        while encoding:
+            try:
+                progress = next(encoding)
+            except StopIteration:
+                break
+            progress_update.update(progress)
+    except VideoEncodingError:
+        # TODO handle with more care
+        video_format.delete()
+        os.remove(target_path)
+        return None
+
+    # now we are ready, saved along with the encoded file
+    video_format.update_progress(100, commit=False)
+
+    # save encoded file
+    with open(target_path, mode='rb') as target_file:
         video_format.file.save(
             '{filename}_{name}.{extension}'.format(filename=filename,
                                                    **options),
-            File(open(target_path, mode='rb')))
+            File(target_file))
 
-        video_format.update_progress(100)  # now we are ready
+    # remove temporary file
+    os.remove(target_path)
 
-        # remove temporary file
-        os.remove(target_path)
+    return video_format
 
-        if temp_file:
-            os.unlink(temp_file.name)
-            temp_file.close()
+
+class ProgressUpdate(object):
+    """
+    Saves the progress of a format only every `PROGRESS_UPDATE_STEP` percent
+    or every `PROGRESS_UPDATE` seconds, rather than on every progress reported
+    by the encoding backend.
+    """
+
+    def __init__(self, video_format):
+        self.video_format = video_format
+        self.saved_progress = video_format.progress
+        self.saved_at = time.monotonic()
+
+    def update(self, progress):
+        now = time.monotonic()
+
+        if progress - self.saved_progress < settings.VIDEO_ENCODING_PROGRESS_UPDATE_STEP and \
+                now - self.saved_at < settings.VIDEO_ENCODING_PROGRESS_UPDATE:
+            return
+
+        self.video_format.update_progress(progress)
+        self.saved_progress = progress
+        self.saved_at = now